@@ -1,84 +1,330 @@
 const initSqlJs = require('sql.js');
 const path = require('path');
 const fs = require('fs');
+const { SearchIndex } = require('./searchIndex.cjs');
+const { StandardsSearch } = require('./standardsSearch.cjs');
+
+// Keyset pagination specs: sortable columns map to the value used in place of
+// NULL (null = column is NOT NULL and needs no COALESCE). schema.sql has an
+// index on (sort expression, key) for each of them, so keep the two in sync.
+const CATALOG_PAGES = {
+  materiais: {
+    table: 'materiais',
+    key: 'sap',
+    search: ['sap', 'descricao'],
+    sortable: { sap: null, descricao: null, unidade: '', preco_unitario: 0 }
+  },
+  kits: {
+    table: 'kits',
+    key: 'codigo_kit',
+    search: ['codigo_kit', 'descricao_kit'],
+    sortable: { codigo_kit: null, descricao_kit: null, custo_servico: 0 }
+  },
+  servicos_cm: {
+    table: 'servicos_cm',
+    key: 'codigo',
+    search: ['codigo', 'descricao'],
+    sortable: { codigo: null, descricao: null, preco_bruto: 0 }
+  }
+};
+
+const MAX_PAGE_SIZE = 500;
+
+// Stored in PRAGMA user_version. Bump whenever schema.sql changes so existing
+// databases run the DDL once; matching databases open without any writes.
+const SCHEMA_VERSION = 2;
+
+const STATEMENT_CACHE_SIZE = 64;
+const SAVE_DEBOUNCE_MS = 250;
+
+// Columnar result sets (opt-in with { format: 'columnar' }): numeric columns are
+// Float64Arrays with NULL as NaN; text columns are Uint32Array indexes into one
+// string dictionary shared by every column, where index 0 is NULL.
+function toColumnar(names, records) {
+  const strings = [null];
+  const stringIndex = new Map();
+  const columns = {};
+  names.forEach((name, c) => {
+    const numeric = records.every(record => record[c] === null || typeof record[c] === 'number');
+    if (numeric) {
+      const column = new Float64Array(records.length);
+      records.forEach((record, i) => { column[i] = record[c] === null ? NaN : record[c]; });
+      columns[name] = column;
+      return;
+    }
+    const column = new Uint32Array(records.length);
+    records.forEach((record, i) => {
+      if (record[c] === null) return;
+      const text = String(record[c]);
+      let index = stringIndex.get(text);
+      if (index === undefined) {
+        index = strings.length;
+        strings.push(text);
+        stringIndex.set(text, index);
+      }
+      column[i] = index;
+    });
+    columns[name] = column;
+  });
+  return { format: 'columnar', length: records.length, names, columns, strings };
+}
+
+function toObjects(names, records) {
+  return records.map(record => {
+    const row = {};
+    names.forEach((name, c) => { row[name] = record[c]; });
+    return row;
+  });
+}
 
 class DatabaseService {
   constructor() {
     this.db = null;
     this.dbPath = path.join(process.cwd(), 'cqt_light.db');
+    this.searchIndexPath = path.join(process.cwd(), 'cqt_light.search.json');
+    this.searchIndex = null;
+    this.standardsPath = path.join(process.cwd(), 'cqt_light.standards.db');
+    this.standards = undefined;
+    this.SQL = null;
     this.initialized = false;
+    this.startupStats = null;
+    this._initPromise = null;
+    this.statements = new Map();
+    this.cacheStats = { hits: 0, misses: 0, evictions: 0, invalidations: 0 };
+    this._saveTimer = null;
+    this._totals = new Map();
   }
 
-  async init() {
-    if (this.initialized) return;
+  init() {
+    if (!this._initPromise) this._initPromise = this._open();
+    return this._initPromise;
+  }
 
+  /**
+   * Startup path: the DDL and the write-back only run when the stored schema
+   * version differs ("cold" start); otherwise the file is just read ("warm").
+   * Phase timings are kept in this.startupStats.
+   */
+  async _open() {
+    const t0 = performance.now();
     const SQL = await initSqlJs();
-
-    if (fs.existsSync(this.dbPath)) {
-      const buffer = fs.readFileSync(this.dbPath);
-      this.db = new SQL.Database(buffer);
-    } else {
-      this.db = new SQL.Database();
+    this.SQL = SQL;
+    const tWasm = performance.now();
+
+    const exists = fs.existsSync(this.dbPath);
+    const buffer = exists ? fs.readFileSync(this.dbPath) : null;
+    this.db = buffer ? new SQL.Database(buffer) : new SQL.Database();
+    const tRead = performance.now();
+
+    const storedVersion = this.db.exec('PRAGMA user_version')[0]?.values[0][0] || 0;
+    const cold = storedVersion !== SCHEMA_VERSION;
+    if (cold) {
+      const schemaPath = path.join(__dirname, 'schema.sql');
+      const schema = fs.readFileSync(schemaPath, 'utf-8');
+      this.db.run(schema);
+      this.db.run(`PRAGMA user_version = ${SCHEMA_VERSION}`);
     }
-
-    const schemaPath = path.join(__dirname, 'schema.sql');
-    const schema = fs.readFileSync(schemaPath, 'utf-8');
-    this.db.run(schema);
+    const tSchema = performance.now();
 
     this.initialized = true;
-    this.save();
+    if (cold) this.save();
+    const tSave = performance.now();
+
+    this.searchIndex = SearchIndex.load(this.searchIndexPath, this.getMeta('catalog_version'));
+    const tIndex = performance.now();
+
+    const ms = (v) => `${v.toFixed(0)}ms`;
+    this.startupStats = {
+      mode: cold ? 'cold' : 'warm',
+      schemaVersion: SCHEMA_VERSION,
+      previousSchemaVersion: storedVersion,
+      dbBytes: buffer ? buffer.length : 0,
+      searchIndex: !!this.searchIndex,
+      wasmMs: tWasm - t0,
+      readMs: tRead - tWasm,
+      schemaMs: tSchema - tRead,
+      saveMs: tSave - tSchema,
+      indexMs: tIndex - tSave,
+      totalMs: tIndex - t0
+    };
+    const st = this.startupStats;
+    console.log(
+      `Database ready (${st.mode}) in ${ms(st.totalMs)}: wasm ${ms(st.wasmMs)}, read ${ms(st.readMs)}, ` +
+      `schema ${ms(st.schemaMs)}, save ${ms(st.saveMs)}, search index ${ms(st.indexMs)}` +
+      (this.searchIndex ? '' : ' (unavailable, using SQL search)')
+    );
   }
 
   save() {
     if (!this.db) return;
+    clearTimeout(this._saveTimer);
+    this._saveTimer = null;
+    this._clearStatements();
     const data = this.db.export();
     fs.writeFileSync(this.dbPath, Buffer.from(data));
   }
 
+  // Writes within SAVE_DEBOUNCE_MS share one export; flush() persists on quit
+  scheduleSave() {
+    if (this._saveTimer) return;
+    this._saveTimer = setTimeout(() => this.save(), SAVE_DEBOUNCE_MS);
+  }
+
+  flush() {
+    if (this._saveTimer) this.save();
+  }
+
   run(sql, params = []) {
     this.db.run(sql, params);
-    this.save();
+    this._totals.clear();
+    this.scheduleSave();
     return { changes: this.db.getRowsModified() };
   }
 
   get(sql, params = []) {
-    const stmt = this.db.prepare(sql);
-    stmt.bind(params);
-    if (stmt.step()) {
-      const result = stmt.getAsObject();
-      stmt.free();
-      return result;
+    const stmt = this._statement(sql);
+    try {
+      stmt.bind(params);
+      return stmt.step() ? stmt.getAsObject() : null;
+    } finally {
+      stmt.reset();
     }
-    stmt.free();
-    return null;
   }
 
   all(sql, params = []) {
     const results = [];
-    const stmt = this.db.prepare(sql);
-    stmt.bind(params);
-    while (stmt.step()) {
-      results.push(stmt.getAsObject());
+    const stmt = this._statement(sql);
+    try {
+      stmt.bind(params);
+      while (stmt.step()) {
+        results.push(stmt.getAsObject());
+      }
+    } finally {
+      stmt.reset();
     }
-    stmt.free();
     return results;
   }
 
+  // Value arrays plus column names, without building a row object per record
+  _records(sql, params = []) {
+    const records = [];
+    const stmt = this._statement(sql);
+    try {
+      stmt.bind(params);
+      while (stmt.step()) {
+        records.push(stmt.get());
+      }
+      return { names: stmt.getColumnNames(), records };
+    } finally {
+      stmt.reset();
+    }
+  }
+
+  allColumnar(sql, params = []) {
+    const { names, records } = this._records(sql, params);
+    return toColumnar(names, records);
+  }
+
+  // ========== STATEMENT CACHE ==========
+
+  // Prepared statements keyed by SQL text; Map order doubles as LRU order
+  _statement(sql) {
+    let stmt = this.statements.get(sql);
+    if (stmt) {
+      this.statements.delete(sql);
+      this.cacheStats.hits++;
+    } else {
+      stmt = this.db.prepare(sql);
+      this.cacheStats.misses++;
+      if (this.statements.size >= STATEMENT_CACHE_SIZE) {
+        const [oldestSql, oldest] = this.statements.entries().next().value;
+        this.statements.delete(oldestSql);
+        oldest.free();
+        this.cacheStats.evictions++;
+      }
+    }
+    this.statements.set(sql, stmt);
+    return stmt;
+  }
+
+  // db.export() frees every prepared statement, so the cache goes with it
+  _clearStatements() {
+    if (this.statements.size === 0) return;
+    for (const stmt of this.statements.values()) stmt.free();
+    this.statements.clear();
+    this.cacheStats.invalidations++;
+  }
+
+  getStatementCacheStats() {
+    return { ...this.cacheStats, size: this.statements.size, capacity: STATEMENT_CACHE_SIZE };
+  }
+
+  getMeta(key) {
+    return this.get('SELECT value FROM meta WHERE key = ?', [key])?.value ?? null;
+  }
+
+  // Catalog edits invalidate the prebuilt search index (here and on next launch)
+  _touchCatalog() {
+    this.db.run(`
+      INSERT INTO meta (key, value) VALUES ('catalog_version', ?)
+      ON CONFLICT(key) DO UPDATE SET value = excluded.value
+    `, [`local-${Date.now()}`]);
+    this.searchIndex = null;
+  }
+
+  // The index only covers codes and descriptions (seed_v3.catalog_version), so
+  // price and service edits of an existing row keep it valid
+  _touchCatalogText(spec, keyValue, description) {
+    const descCol = spec.search[1];
+    const current = this.get(`SELECT ${descCol} AS text FROM ${spec.table} WHERE ${spec.key} = ?`, [keyValue]);
+    if (!current || current.text !== description) this._touchCatalog();
+  }
+
+  // Index hits (code and word prefixes) when there are any; the LIKE '%q%'
+  // scan only runs when the index finds nothing (or is not loaded), so
+  // typeahead stays off the table for every query the index can answer
+  _searchCatalog(spec, codes, query, limit) {
+    if (codes?.length) return this._rowsByKey(spec.table, spec.key, codes.slice(0, limit));
+    return this.all(`
+      SELECT * FROM ${spec.table}
+      WHERE ${spec.search.map(col => `${col} LIKE ?`).join(' OR ')}
+      ORDER BY ${spec.key} LIMIT ?
+    `, [...spec.search.map(() => `%${query}%`), limit]);
+  }
+
+  // Rows for the given primary keys, in the order of the keys
+  _rowsByKey(table, key, values) {
+    const rows = this.all(
+      `SELECT * FROM ${table} WHERE ${key} IN (SELECT value FROM json_each(?))`,
+      [JSON.stringify(values)]
+    );
+    const byKey = new Map(rows.map(row => [row[key], row]));
+    return values.map(value => byKey.get(value)).filter(Boolean);
+  }
+
   // ========== FAST COST CALCULATION (< 100ms) ==========
 
   /**
    * Get total cost for multiple kits in ONE query
    * Returns: { materiais: [], totalMaterial, totalServico, totalGeral }
+   * With { format: 'columnar' }, materiais and servicos are columnar tables.
    */
-  getCustoTotal(kitCodes) {
+  getCustoTotal(kitCodes, { format } = {}) {
+    const columnar = format === 'columnar';
     if (!kitCodes || kitCodes.length === 0) {
-      return { materiais: [], totalMaterial: 0, totalServico: 0, totalGeral: 0 };
+      const empty = columnar ? toColumnar([], []) : [];
+      return { materiais: empty, servicos: empty, totalMaterial: 0, totalServico: 0, totalGeral: 0 };
     }
+    const query = (sql, params) => columnar ? this.allColumnar(sql, params) : this.all(sql, params);
+    const sum = (rows, col) => columnar
+      ? (rows.columns[col] || []).reduce((total, value) => total + (value || 0), 0)
+      : rows.reduce((total, row) => total + (row[col] || 0), 0);
 
-    const placeholders = kitCodes.map(() => '?').join(',');
+    // One JSON parameter keeps the SQL text (and its cached statement) fixed
+    const codes = JSON.stringify(kitCodes);
 
     // Aggregated materials
-    const materiais = this.all(`
+    const materiais = query(`
       SELECT 
         m.sap,
         m.descricao,
@@ -88,19 +334,19 @@ class DatabaseService {
         SUM(kc.quantidade * m.preco_unitario) as subtotal
       FROM kit_composicao kc
       JOIN materiais m ON kc.sap = m.sap
-      WHERE kc.codigo_kit IN (${placeholders})
+      WHERE kc.codigo_kit IN (SELECT value FROM json_each(?))
       GROUP BY m.sap, m.descricao, m.unidade, m.preco_unitario
       ORDER BY m.descricao
-    `, kitCodes);
+    `, [codes]);
 
     // Service costs from kits
-    const servicos = this.all(`
+    const servicos = query(`
       SELECT codigo_kit, descricao_kit, codigo_servico, custo_servico
-      FROM kits WHERE codigo_kit IN (${placeholders})
-    `, kitCodes);
+      FROM kits WHERE codigo_kit IN (SELECT value FROM json_each(?))
+    `, [codes]);
 
-    const totalMaterial = materiais.reduce((sum, m) => sum + (m.subtotal || 0), 0);
-    const totalServico = servicos.reduce((sum, s) => sum + (s.custo_servico || 0), 0);
+    const totalMaterial = sum(materiais, 'subtotal');
+    const totalServico = sum(servicos, 'custo_servico');
 
     return {
       materiais,
@@ -111,20 +357,101 @@ class DatabaseService {
     };
   }
 
+  // ========== KEYSET PAGINATION ==========
+
+  /**
+   * One page of a catalog table ordered by (sort column, primary key).
+   * The cursor is the [sortValue, key] pair of the previous page's last row,
+   * so each page is a single range scan of the (sort, key) index no matter
+   * how deep the user scrolls; a filter is checked along that scan, which
+   * stops once the page is full.
+   * Returns: { rows, nextCursor, hasMore, total }. total is only set on the
+   * first page: the table size (counted once between writes) or, for a
+   * filtered list, the match count when it fits in that page, else null.
+   */
+  _keysetPage(spec, { cursor = null, limit = 100, sort, dir = 'asc', filter = '', format } = {}) {
+    const sortCol = Object.prototype.hasOwnProperty.call(spec.sortable, sort) ? sort : spec.key;
+    const fill = spec.sortable[sortCol];
+    const literal = typeof fill === 'string' ? `'${fill}'` : fill;
+    const sortExpr = fill === null ? sortCol : `COALESCE(${sortCol}, ${literal})`;
+    const desc = dir === 'desc';
+    const cmp = desc ? '<' : '>';
+    const order = desc ? 'DESC' : 'ASC';
+    const pageSize = Math.min(Math.max(parseInt(limit, 10) || 100, 1), MAX_PAGE_SIZE);
+
+    const conditions = [];
+    const params = [];
+    const query = (filter || '').trim();
+    if (query) {
+      conditions.push(`(${spec.search.map(col => `${col} LIKE ?`).join(' OR ')})`);
+      spec.search.forEach(() => params.push(`%${query}%`));
+    }
+
+    if (cursor) {
+      const [sortValue, keyValue] = cursor;
+      if (sortCol === spec.key) {
+        conditions.push(`${spec.key} ${cmp} ?`);
+        params.push(keyValue);
+      } else {
+        // The leading range lets the (sort, key) index seek to the cursor
+        conditions.push(`${sortExpr} ${cmp}= ? AND (${sortExpr} ${cmp} ? OR ${spec.key} ${cmp} ?)`);
+        params.push(sortValue, sortValue, keyValue);
+      }
+    }
+    const where = conditions.length ? `WHERE ${conditions.join(' AND ')}` : '';
+
+    const { names, records } = this._records(`
+      SELECT * FROM ${spec.table} ${where}
+      ORDER BY ${sortExpr} ${order}, ${spec.key} ${order}
+      LIMIT ?
+    `, [...params, pageSize + 1]);
+
+    const hasMore = records.length > pageSize;
+    if (hasMore) records.pop();
+    const last = records[records.length - 1];
+    const lastValue = (col) => last[names.indexOf(col)];
+    const nextCursor = hasMore
+      ? [fill === null ? lastValue(sortCol) : (lastValue(sortCol) ?? fill), lastValue(spec.key)]
+      : null;
+
+    const rows = format === 'columnar' ? toColumnar(names, records) : toObjects(names, records);
+    const page = { rows, nextCursor, hasMore };
+    if (!cursor) page.total = query ? (hasMore ? null : records.length) : this._tableTotal(spec.table);
+    return page;
+  }
+
+  // Row count per table, kept until the next write
+  _tableTotal(table) {
+    if (!this._totals.has(table)) {
+      this._totals.set(table, this.get(`SELECT COUNT(*) as count FROM ${table}`)?.count || 0);
+    }
+    return this._totals.get(table);
+  }
+
+  pageMaterials(options) {
+    return this._keysetPage(CATALOG_PAGES.materiais, options);
+  }
+
+  pageKits(options) {
+    return this._keysetPage(CATALOG_PAGES.kits, options);
+  }
+
+  pageServicos(options) {
+    return this._keysetPage(CATALOG_PAGES.servicos_cm, options);
+  }
+
   // ========== MATERIAIS ==========
   getAllMaterials() {
     return this.all('SELECT * FROM materiais ORDER BY sap LIMIT 200');
   }
 
   searchMaterials(query) {
-    return this.all(`
-      SELECT * FROM materiais 
-      WHERE sap LIKE ? OR descricao LIKE ?
-      ORDER BY sap LIMIT 50
-    `, [`%${query}%`, `%${query}%`]);
+    const codes = this.searchIndex?.searchMaterials(query, 50);
+    return this._searchCatalog(CATALOG_PAGES.materiais, codes, query, 50);
   }
 
   upsertMaterial(sap, descricao, unidade, preco_unitario) {
+    this._touchCatalogText(CATALOG_PAGES.materiais, sap, descricao);
     this.run(`
       INSERT INTO materiais (sap, descricao, unidade, preco_unitario)
       VALUES (?, ?, ?, ?)
@@ -141,11 +468,8 @@ class DatabaseService {
   }
 
   searchKits(query) {
-    return this.all(`
-      SELECT * FROM kits 
-      WHERE codigo_kit LIKE ? OR descricao_kit LIKE ?
-      ORDER BY codigo_kit LIMIT 30
-    `, [`%${query}%`, `%${query}%`]);
+    const codes = this.searchIndex?.searchKits(query, 30);
+    return this._searchCatalog(CATALOG_PAGES.kits, codes, query, 30);
   }
 
   getKit(codigoKit) {
@@ -153,6 +477,7 @@ class DatabaseService {
   }
 
   upsertKit(codigoKit, descricaoKit, codigoServico = null, custoServico = 0) {
+    this._touchCatalogText(CATALOG_PAGES.kits, codigoKit, descricaoKit);
     this.run(`
       INSERT INTO kits (codigo_kit, descricao_kit, codigo_servico, custo_servico)
       VALUES (?, ?, ?, ?)
@@ -165,6 +490,7 @@ class DatabaseService {
 
   // Create a new kit (explicit insert)
   createKit(codigoKit, descricaoKit) {
+    this._touchCatalog();
     this.run(`
       INSERT INTO kits (codigo_kit, descricao_kit, codigo_servico, custo_servico)
       VALUES (?, ?, NULL, 0)
@@ -174,6 +500,7 @@ class DatabaseService {
 
   // Update kit metadata (description only, don't touch composition)
   updateKitMetadata(codigoKit, descricaoKit) {
+    this._touchCatalogText(CATALOG_PAGES.kits, codigoKit, descricaoKit);
     return this.run(`
       UPDATE kits SET descricao_kit = ? WHERE codigo_kit = ?
     `, [descricaoKit, codigoKit]);
@@ -181,6 +508,7 @@ class DatabaseService {
 
   // Delete kit and its composition (cascade)
   deleteKit(codigoKit) {
+    this._touchCatalog();
     // Delete composition first
     this.run('DELETE FROM kit_composicao WHERE codigo_kit = ?', [codigoKit]);
     // Then delete kit
@@ -238,6 +566,35 @@ class DatabaseService {
     `, [codigo, descricao, precoBruto || 0]);
   }
 
+  // ========== STANDARDS ==========
+  // Full-text index of the Padrões PDFs (scripts/standards_search.py), opened on first use
+  _standardsIndex() {
+    if (this.standards === undefined) this.standards = StandardsSearch.load(this.SQL, this.standardsPath);
+    return this.standards;
+  }
+
+  searchStandards(query, options) {
+    return this._standardsIndex()?.search(query, options) ?? [];
+  }
+
+  // Standards pages citing each SAP, with the catalog description joined in
+  _materialReferences(saps) {
+    const refs = this._standardsIndex()?.references(saps) ?? [];
+    if (!refs.length) return refs;
+    const descricao = new Map(this._rowsByKey('materiais', 'sap', [...new Set(refs.map(r => r.sap))])
+      .map(m => [m.sap, m.descricao]));
+    return refs.map(r => ({ ...r, descricao: descricao.get(r.sap) ?? null }));
+  }
+
+  getMaterialStandards(sap) {
+    return this._materialReferences([sap]);
+  }
+
+  getKitStandards(codigoKit) {
+    const saps = this.all('SELECT sap FROM kit_composicao WHERE codigo_kit = ?', [codigoKit]).map(r => r.sap);
+    return saps.length ? this._materialReferences(saps) : [];
+  }
+
   // ========== STATS ==========
   getStats() {
     const materials = this.get('SELECT COUNT(*) as count FROM materiais');
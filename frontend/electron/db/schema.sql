@@ -31,6 +31,11 @@ CREATE TABLE IF NOT EXISTS kit_composicao (
   FOREIGN KEY (sap) REFERENCES materiais(sap) ON DELETE CASCADE,
   UNIQUE(codigo_kit, sap)
 );
+-- 5. meta (catalog_version stamps the prebuilt search index)
+CREATE TABLE IF NOT EXISTS meta (
+  key TEXT PRIMARY KEY,
+  value TEXT
+);
 -- Indexes for fast lookups
 CREATE INDEX IF NOT EXISTS idx_materiais_sap ON materiais(sap);
 CREATE INDEX IF NOT EXISTS idx_materiais_descricao ON materiais(descricao);
@@ -40,4 +45,12 @@ CREATE INDEX IF NOT EXISTS idx_kits_servico ON kits(codigo_servico);
 CREATE INDEX IF NOT EXISTS idx_servicos_codigo ON servicos_cm(codigo);
 CREATE INDEX IF NOT EXISTS idx_servicos_descricao ON servicos_cm(descricao);
 CREATE INDEX IF NOT EXISTS idx_kit_composicao_kit ON kit_composicao(codigo_kit);
-CREATE INDEX IF NOT EXISTS idx_kit_composicao_sap ON kit_composicao(sap);
\ No newline at end of file
+CREATE INDEX IF NOT EXISTS idx_kit_composicao_sap ON kit_composicao(sap);
+-- Keyset pages: (sort expression, key) for each sortable column in database.cjs CATALOG_PAGES
+CREATE INDEX IF NOT EXISTS idx_materiais_page_descricao ON materiais(descricao, sap);
+CREATE INDEX IF NOT EXISTS idx_materiais_page_unidade ON materiais(COALESCE(unidade, ''), sap);
+CREATE INDEX IF NOT EXISTS idx_materiais_page_preco ON materiais(COALESCE(preco_unitario, 0), sap);
+CREATE INDEX IF NOT EXISTS idx_kits_page_descricao ON kits(descricao_kit, codigo_kit);
+CREATE INDEX IF NOT EXISTS idx_kits_page_custo ON kits(COALESCE(custo_servico, 0), codigo_kit);
+CREATE INDEX IF NOT EXISTS idx_servicos_page_descricao ON servicos_cm(descricao, codigo);
+CREATE INDEX IF NOT EXISTS idx_servicos_page_preco ON servicos_cm(COALESCE(preco_bruto, 0), codigo);
\ No newline at end of file
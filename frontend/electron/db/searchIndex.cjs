@@ -0,0 +1,136 @@
+const fs = require('fs');
+
+// Must match SEARCH_INDEX_FORMAT in scripts/seed_v3.py
+const SEARCH_INDEX_FORMAT = 1;
+
+/**
+ * Uppercase, accent-free alphanumeric tokens (same rules as seed_v3.tokenize).
+ */
+function tokenize(text) {
+  return String(text || '')
+    .normalize('NFD')
+    .replace(/[\u0300-\u036f]/g, '')
+    .toUpperCase()
+    .match(/[A-Z0-9]+/g) || [];
+}
+
+// First index in a sorted array whose value is >= key
+function lowerBound(sorted, key) {
+  let lo = 0;
+  let hi = sorted.length;
+  while (lo < hi) {
+    const mid = (lo + hi) >>> 1;
+    if (sorted[mid] < key) lo = mid + 1;
+    else hi = mid;
+  }
+  return lo;
+}
+
+// [lo, hi) range of entries starting with prefix
+function prefixRange(sorted, prefix) {
+  return [lowerBound(sorted, prefix), lowerBound(sorted, prefix + '\uffff')];
+}
+
+class Collection {
+  constructor({ codes, tokens, postings }) {
+    this.codes = codes;
+    this.tokens = tokens;
+    // Postings are delta-encoded doc ids; decode once into typed arrays
+    this.postings = postings.map(deltas => {
+      const ids = new Uint32Array(deltas.length);
+      let acc = 0;
+      for (let i = 0; i < deltas.length; i++) {
+        acc += deltas[i];
+        ids[i] = acc;
+      }
+      return ids;
+    });
+    this.marks = new Uint8Array(codes.length);
+  }
+
+  /**
+   * Codes matching the query, in code order: code-prefix hits first, then docs
+   * whose tokens start with every query token.
+   */
+  search(query, limit) {
+    const results = [];
+    const seen = new Set();
+    const q = String(query || '').trim().toUpperCase();
+    if (!q) return results;
+
+    const [codeLo, codeHi] = prefixRange(this.codes, q);
+    for (let i = codeLo; i < codeHi && results.length < limit; i++) {
+      results.push(this.codes[i]);
+      seen.add(i);
+    }
+    if (results.length >= limit) return results;
+
+    const queryTokens = [...new Set(tokenize(q))];
+    if (queryTokens.length === 0) return results;
+
+    // marks[doc] counts how many query tokens the doc has matched so far
+    const marks = this.marks;
+    const touched = [];
+    queryTokens.forEach((qt, round) => {
+      const [lo, hi] = prefixRange(this.tokens, qt);
+      for (let t = lo; t < hi; t++) {
+        const ids = this.postings[t];
+        for (let k = 0; k < ids.length; k++) {
+          const doc = ids[k];
+          if (marks[doc] === round) {
+            marks[doc] = round + 1;
+            if (round === 0) touched.push(doc);
+          }
+        }
+      }
+    });
+
+    const hits = touched.filter(doc => marks[doc] === queryTokens.length).sort((a, b) => a - b);
+    touched.forEach(doc => { marks[doc] = 0; });
+
+    for (const doc of hits) {
+      if (results.length >= limit) break;
+      if (!seen.has(doc)) results.push(this.codes[doc]);
+    }
+    return results;
+  }
+}
+
+/**
+ * Prebuilt typeahead index emitted by scripts/seed_v3.py.
+ * Only valid for the catalog version it was built from.
+ */
+class SearchIndex {
+  constructor(artifact) {
+    this.catalogVersion = artifact.catalog_version;
+    this.materials = new Collection(artifact.materials);
+    this.kits = new Collection(artifact.kits);
+  }
+
+  /**
+   * Load the artifact if it exists and belongs to the given catalog version.
+   * Returns null (and the caller falls back to SQL search) otherwise.
+   */
+  static load(indexPath, catalogVersion) {
+    if (!catalogVersion || !fs.existsSync(indexPath)) return null;
+    try {
+      const artifact = JSON.parse(fs.readFileSync(indexPath, 'utf-8'));
+      if (artifact.format !== SEARCH_INDEX_FORMAT) return null;
+      if (artifact.catalog_version !== catalogVersion) return null;
+      return new SearchIndex(artifact);
+    } catch (err) {
+      console.warn(`Search index ignored (${err.message})`);
+      return null;
+    }
+  }
+
+  searchMaterials(query, limit) {
+    return this.materials.search(query, limit);
+  }
+
+  searchKits(query, limit) {
+    return this.kits.search(query, limit);
+  }
+}
+
+module.exports = { SearchIndex, tokenize };
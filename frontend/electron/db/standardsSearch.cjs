@@ -0,0 +1,116 @@
+const fs = require('fs');
+
+// Must match STANDARDS_INDEX_FORMAT in scripts/standards_search.py
+const STANDARDS_INDEX_FORMAT = 2;
+
+const BM25_K1 = 1.2;
+const BM25_B = 0.75;
+const SNIPPET_TOKENS = 12;
+
+// Same query as standards_search.SEARCH_SQL: rank every match, snippet only the top ones
+const SEARCH_SQL = `
+  SELECT d.path, d.title, pages.page, snippet(pages, '«', '»', '…', 0, ?) AS snippet, top.score
+  FROM (SELECT docid, bm25(matchinfo(pages, 'pcnalx')) AS score
+        FROM pages WHERE pages MATCH ? ORDER BY score DESC LIMIT ?) AS top
+  JOIN pages ON pages.docid = top.docid
+  JOIN documents d ON d.id = pages.document
+  WHERE pages MATCH ?
+  ORDER BY top.score DESC
+`;
+
+// SAP cross-reference rows for a JSON array of codes
+const REFERENCES_SQL = `
+  SELECT r.sap, d.path, d.title, r.page, r.context
+  FROM sap_references r
+  JOIN documents d ON d.id = r.document
+  WHERE r.sap IN (SELECT value FROM json_each(?))
+  ORDER BY r.sap, d.path, r.page
+`;
+
+/**
+ * BM25 score of one row from FTS4 matchinfo(..., 'pcnalx'), over the text
+ * column (same formula as standards_search.bm25).
+ */
+function bm25(info) {
+  const values = new Uint32Array(Uint8Array.from(info).buffer);
+  const [phrases, columns, rows] = values;
+  const average = values[3];
+  const length = values[3 + columns];
+  const hits = 3 + 2 * columns;
+  const norm = BM25_K1 * (1 - BM25_B + BM25_B * length / Math.max(average, 1));
+  let score = 0;
+  for (let i = 0; i < phrases; i++) {
+    const tf = values[hits + 3 * columns * i];
+    const df = values[hits + 3 * columns * i + 2];
+    if (tf) score += Math.log(1 + (rows - df + 0.5) / (df + 0.5)) * tf * (BM25_K1 + 1) / (tf + norm);
+  }
+  return score;
+}
+
+/**
+ * Free text to an FTS query: every word, as a prefix, must appear on the page.
+ */
+function matchQuery(text) {
+  return (String(text || '').match(/[\p{L}\p{N}_]+/gu) || []).map(word => `${word}*`).join(' ');
+}
+
+/**
+ * Page-level full-text index of the Padrões PDFs, built by
+ * scripts/standards_search.py and opened read-only in its own sql.js database.
+ */
+class StandardsSearch {
+  constructor(db) {
+    this.db = db;
+    this.db.create_function('bm25', bm25);
+    this.stmt = this.db.prepare(SEARCH_SQL);
+    this.referencesStmt = this.db.prepare(REFERENCES_SQL);
+  }
+
+  static load(SQL, indexPath) {
+    if (!SQL || !fs.existsSync(indexPath)) return null;
+    try {
+      const db = new SQL.Database(fs.readFileSync(indexPath));
+      const format = db.exec('PRAGMA user_version')[0]?.values[0][0];
+      if (format !== STANDARDS_INDEX_FORMAT) {
+        db.close();
+        return null;
+      }
+      return new StandardsSearch(db);
+    } catch (err) {
+      console.warn(`Standards index ignored (${err.message})`);
+      return null;
+    }
+  }
+
+  /**
+   * Ranked page hits: { path, title, page, snippet, score }, best first.
+   */
+  search(query, { limit = 20 } = {}) {
+    const ftsQuery = matchQuery(query);
+    if (!ftsQuery) return [];
+    const hits = [];
+    try {
+      this.stmt.bind([SNIPPET_TOKENS, ftsQuery, limit, ftsQuery]);
+      while (this.stmt.step()) hits.push(this.stmt.getAsObject());
+    } finally {
+      this.stmt.reset();
+    }
+    return hits;
+  }
+
+  /**
+   * Standards pages citing the given SAP codes: { sap, path, title, page, context }.
+   */
+  references(saps) {
+    const rows = [];
+    try {
+      this.referencesStmt.bind([JSON.stringify(saps.map(String))]);
+      while (this.referencesStmt.step()) rows.push(this.referencesStmt.getAsObject());
+    } finally {
+      this.referencesStmt.reset();
+    }
+    return rows;
+  }
+}
+
+module.exports = { StandardsSearch, bm25, matchQuery };
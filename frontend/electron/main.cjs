@@ -4,9 +4,24 @@ const isDev = require('electron-is-dev');
 const db = require('./db/database.cjs');
 
 let mainWindow;
+let dbReady = null;
+let windowShownMs = null;
 
-async function createWindow() {
-  await db.init();
+// The database loads in parallel with the window; IPC handlers wait for it.
+function startDatabase() {
+  if (!dbReady) dbReady = db.init();
+  return dbReady;
+}
+
+function handle(channel, fn) {
+  ipcMain.handle(channel, async (...args) => {
+    await startDatabase();
+    return fn(...args);
+  });
+}
+
+function createWindow() {
+  startDatabase();
 
   mainWindow = new BrowserWindow({
     width: 1400,
@@ -30,7 +45,13 @@ async function createWindow() {
     mainWindow.loadFile(path.join(__dirname, '../dist/index.html'));
   }
 
-  mainWindow.once('ready-to-show', () => mainWindow.show());
+  mainWindow.once('ready-to-show', () => {
+    mainWindow.show();
+    if (windowShownMs === null) {
+      windowShownMs = performance.now();
+      console.log(`Window shown ${windowShownMs.toFixed(0)}ms after process start`);
+    }
+  });
 
   mainWindow.webContents.setWindowOpenHandler(({ url }) => {
     shell.openExternal(url);
@@ -40,44 +61,55 @@ async function createWindow() {
 
 app.whenReady().then(createWindow);
 app.on('window-all-closed', () => { if (process.platform !== 'darwin') app.quit(); });
+app.on('before-quit', () => db.flush());
 app.on('activate', () => { if (BrowserWindow.getAllWindows().length === 0) createWindow(); });
 
 // ========== IPC HANDLERS ==========
 
 // Fast cost calculation (single query)
-ipcMain.handle('get-custo-total', (_, kitCodes) => db.getCustoTotal(kitCodes));
+handle('get-custo-total', (_, kitCodes, options) => db.getCustoTotal(kitCodes, options));
 
 // Materials
-ipcMain.handle('get-all-materials', () => db.getAllMaterials());
-ipcMain.handle('search-materials', (_, query) => db.searchMaterials(query));
-ipcMain.handle('upsert-material', (_, { sap, descricao, unidade, preco_unitario }) =>
+handle('get-all-materials', () => db.getAllMaterials());
+handle('page-materials', (_, options) => db.pageMaterials(options));
+handle('search-materials', (_, query) => db.searchMaterials(query));
+handle('upsert-material', (_, { sap, descricao, unidade, preco_unitario }) =>
   db.upsertMaterial(sap, descricao, unidade, preco_unitario));
 
 // Kits
-ipcMain.handle('get-all-kits', () => db.getAllKits());
-ipcMain.handle('search-kits', (_, query) => db.searchKits(query));
-ipcMain.handle('get-kit', (_, codigoKit) => db.getKit(codigoKit));
-ipcMain.handle('upsert-kit', (_, { codigoKit, descricaoKit, codigoServico, custoServico }) =>
+handle('get-all-kits', () => db.getAllKits());
+handle('page-kits', (_, options) => db.pageKits(options));
+handle('search-kits', (_, query) => db.searchKits(query));
+handle('get-kit', (_, codigoKit) => db.getKit(codigoKit));
+handle('upsert-kit', (_, { codigoKit, descricaoKit, codigoServico, custoServico }) =>
   db.upsertKit(codigoKit, descricaoKit, codigoServico, custoServico));
-ipcMain.handle('create-kit', (_, { codigo_kit, descricao_kit }) =>
+handle('create-kit', (_, { codigo_kit, descricao_kit }) =>
   db.createKit(codigo_kit, descricao_kit));
-ipcMain.handle('update-kit-metadata', (_, { codigo_kit, descricao_kit }) =>
+handle('update-kit-metadata', (_, { codigo_kit, descricao_kit }) =>
   db.updateKitMetadata(codigo_kit, descricao_kit));
-ipcMain.handle('delete-kit', (_, codigo_kit) =>
+handle('delete-kit', (_, codigo_kit) =>
   db.deleteKit(codigo_kit));
 
 // Kit Composition
-ipcMain.handle('get-kit-composition', (_, codigoKit) => db.getKitComposition(codigoKit));
-ipcMain.handle('add-material-to-kit', (_, { codigoKit, sap, quantidade }) =>
+handle('get-kit-composition', (_, codigoKit) => db.getKitComposition(codigoKit));
+handle('add-material-to-kit', (_, { codigoKit, sap, quantidade }) =>
   db.addMaterialToKit(codigoKit, sap, quantidade));
-ipcMain.handle('update-kit-material-qty', (_, { id, quantidade }) => db.updateKitMaterialQty(id, quantidade));
-ipcMain.handle('remove-material-from-kit', (_, id) => db.removeMaterialFromKit(id));
+handle('update-kit-material-qty', (_, { id, quantidade }) => db.updateKitMaterialQty(id, quantidade));
+handle('remove-material-from-kit', (_, id) => db.removeMaterialFromKit(id));
 
 // Servicos CM
-ipcMain.handle('get-all-servicos', () => db.getAllServicos());
-ipcMain.handle('search-servicos', (_, query) => db.searchServicos(query));
-ipcMain.handle('upsert-servico', (_, { codigo, descricao, precoBruto }) =>
+handle('get-all-servicos', () => db.getAllServicos());
+handle('page-servicos', (_, options) => db.pageServicos(options));
+handle('search-servicos', (_, query) => db.searchServicos(query));
+handle('upsert-servico', (_, { codigo, descricao, precoBruto }) =>
   db.upsertServico(codigo, descricao, precoBruto));
 
+// Standards library
+handle('search-standards', (_, query, options) => db.searchStandards(query, options));
+handle('get-material-standards', (_, sap) => db.getMaterialStandards(sap));
+handle('get-kit-standards', (_, codigoKit) => db.getKitStandards(codigoKit));
+
 // Stats
-ipcMain.handle('get-stats', () => db.getStats());
+handle('get-stats', () => db.getStats());
+handle('get-startup-stats', () => ({ ...db.startupStats, windowShownMs }));
+handle('get-statement-cache-stats', () => db.getStatementCacheStats());
@@ -2,15 +2,17 @@ const { contextBridge, ipcRenderer } = require('electron');
 
 contextBridge.exposeInMainWorld('api', {
   // Fast cost calculation
-  getCustoTotal: (kitCodes) => ipcRenderer.invoke('get-custo-total', kitCodes),
+  getCustoTotal: (kitCodes, options) => ipcRenderer.invoke('get-custo-total', kitCodes, options),
 
   // Materials
   getAllMaterials: () => ipcRenderer.invoke('get-all-materials'),
+  pageMaterials: (options) => ipcRenderer.invoke('page-materials', options),
   searchMaterials: (query) => ipcRenderer.invoke('search-materials', query),
   upsertMaterial: (data) => ipcRenderer.invoke('upsert-material', data),
 
   // Kits
   getAllKits: () => ipcRenderer.invoke('get-all-kits'),
+  pageKits: (options) => ipcRenderer.invoke('page-kits', options),
   searchKits: (query) => ipcRenderer.invoke('search-kits', query),
   getKit: (codigoKit) => ipcRenderer.invoke('get-kit', codigoKit),
   upsertKit: (data) => ipcRenderer.invoke('upsert-kit', data),
@@ -26,9 +28,17 @@ contextBridge.exposeInMainWorld('api', {
 
   // Servicos CM
   getAllServicos: () => ipcRenderer.invoke('get-all-servicos'),
+  pageServicos: (options) => ipcRenderer.invoke('page-servicos', options),
   searchServicos: (query) => ipcRenderer.invoke('search-servicos', query),
   upsertServico: (data) => ipcRenderer.invoke('upsert-servico', data),
 
+  // Standards library
+  searchStandards: (query, options) => ipcRenderer.invoke('search-standards', query, options),
+  getMaterialStandards: (sap) => ipcRenderer.invoke('get-material-standards', sap),
+  getKitStandards: (codigoKit) => ipcRenderer.invoke('get-kit-standards', codigoKit),
+
   // Stats
   getStats: () => ipcRenderer.invoke('get-stats'),
+  getStartupStats: () => ipcRenderer.invoke('get-startup-stats'),
+  getStatementCacheStats: () => ipcRenderer.invoke('get-statement-cache-stats'),
 });
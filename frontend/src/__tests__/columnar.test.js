@@ -0,0 +1,32 @@
+import { describe, it, expect } from 'vitest';
+import { cell, rowAt, toRows, fromRows, concatTables } from '../utils/columnar';
+
+const NAMES = ['sap', 'descricao', 'quantidade', 'subtotal'];
+
+describe('Columnar Table Tests', () => {
+  it('should store numbers in typed arrays and text in a shared dictionary', () => {
+    const table = fromRows([
+      { sap: '100', descricao: 'CABO', quantidade: 2, subtotal: 10 },
+      { sap: '200', descricao: 'CABO', quantidade: 1, subtotal: null }
+    ], NAMES);
+    expect(table.length).toBe(2);
+    expect(table.columns.quantidade).toBeInstanceOf(Float64Array);
+    expect(table.columns.descricao).toBeInstanceOf(Uint32Array);
+    expect(table.columns.descricao[0]).toBe(table.columns.descricao[1]);
+    expect(cell(table, 'subtotal', 1)).toBeNull();
+  });
+
+  it('should round-trip rows', () => {
+    const rows = [{ sap: '100', descricao: 'POSTE', quantidade: 1, subtotal: 900 }];
+    expect(toRows(fromRows(rows, NAMES))).toEqual(rows);
+    expect(toRows([])).toEqual([]);
+  });
+
+  it('should concatenate tables and fill missing columns', () => {
+    const kits = fromRows([{ sap: '100', descricao: 'A', quantidade: 1, subtotal: 5 }], NAMES);
+    const loose = fromRows([{ sap: '300', descricao: 'B', quantidade: 3, subtotal: 6 }], NAMES);
+    const all = concatTables([kits, loose], [...NAMES, 'categoria'], { categoria: 'MATERIAL' });
+    expect(all.length).toBe(2);
+    expect(rowAt(all, 1)).toEqual({ sap: '300', descricao: 'B', quantidade: 3, subtotal: 6, categoria: 'MATERIAL' });
+  });
+});
@@ -0,0 +1,70 @@
+// @vitest-environment node
+import { describe, it, expect, beforeAll } from 'vitest';
+import fs from 'fs';
+import initSqlJs from 'sql.js';
+import db from '../../electron/db/database.cjs';
+
+// sap, preco_unitario, unidade: ties on price and unit, NULLs in both
+const MATERIALS = [
+  ['001', 5, 'UN'], ['002', null, 'M'], ['003', 5, null], ['004', 0, 'UN'], ['005', 5, 'KG'],
+  ['006', null, null], ['007', 2, 'UN'], ['008', 5, 'M'], ['009', 0, 'UN'], ['010', 2, null]
+];
+
+const descricao = (sap) => (Number(sap) % 2 ? 'CABO ' : 'POSTE ') + sap;
+
+// Every page of a list, following nextCursor
+function walk(options) {
+  const saps = [];
+  let cursor = null;
+  do {
+    const page = db.pageMaterials({ ...options, cursor });
+    saps.push(...page.rows.map(row => row.sap));
+    cursor = page.nextCursor;
+  } while (cursor);
+  return saps;
+}
+
+// Expected order: NULL as the fill value, then sap to break ties
+function expected(column, fill, dir) {
+  const value = (m) => m[column] ?? fill;
+  const sorted = MATERIALS
+    .map(([sap, preco_unitario, unidade]) => ({ sap, preco_unitario, unidade }))
+    .sort((a, b) => (value(a) < value(b) ? -1 : value(a) > value(b) ? 1 : a.sap < b.sap ? -1 : 1))
+    .map(m => m.sap);
+  return dir === 'desc' ? sorted.reverse() : sorted;
+}
+
+describe('Keyset Pagination Tests', () => {
+  beforeAll(async () => {
+    const SQL = await initSqlJs();
+    db.db = new SQL.Database();
+    db.db.run(fs.readFileSync(new URL('../../electron/db/schema.sql', import.meta.url), 'utf-8'));
+    db.initialized = true;
+    MATERIALS.forEach(([sap, preco, unidade]) => {
+      db.db.run('INSERT INTO materiais (sap, descricao, unidade, preco_unitario) VALUES (?, ?, ?, ?)',
+        [sap, descricao(sap), unidade, preco]);
+    });
+  });
+
+  it('should continue across ties and NULLs in both directions', () => {
+    for (const dir of ['asc', 'desc']) {
+      expect(walk({ sort: 'preco_unitario', dir, limit: 2 })).toEqual(expected('preco_unitario', 0, dir));
+      expect(walk({ sort: 'unidade', dir, limit: 3 })).toEqual(expected('unidade', '', dir));
+      expect(walk({ sort: 'sap', dir, limit: 4 })).toEqual(expected('sap', null, dir));
+    }
+  });
+
+  it('should return the fill value in the cursor of a NULL row', () => {
+    const page = db.pageMaterials({ sort: 'unidade', limit: 1 });
+    expect(page.rows[0].unidade).toBeNull();
+    expect(page.nextCursor).toEqual(['', page.rows[0].sap]);
+  });
+
+  it('should filter every page and only count what the first page can tell', () => {
+    expect(walk({ sort: 'preco_unitario', dir: 'desc', filter: 'cabo', limit: 2 }))
+      .toEqual(expected('preco_unitario', 0, 'desc').filter(sap => Number(sap) % 2));
+    expect(db.pageMaterials({ limit: 2 }).total).toBe(MATERIALS.length);
+    expect(db.pageMaterials({ filter: 'poste', limit: 2 }).total).toBeNull();
+    expect(db.pageMaterials({ filter: 'poste', limit: 5 }).total).toBe(5);
+  });
+});
@@ -0,0 +1,31 @@
+import { describe, it, expect } from 'vitest';
+import { visibleRange, shouldLoadMore } from '../utils/virtualList';
+
+describe('Virtual List Window Tests', () => {
+  it('should render only the rows inside the viewport plus overscan', () => {
+    const range = visibleRange(0, 400, 40, 10000, 5);
+    expect(range.start).toBe(0);
+    expect(range.end).toBe(15);
+    expect(range.padTop).toBe(0);
+    expect(range.padBottom).toBe((10000 - 15) * 40);
+  });
+
+  it('should keep the window size constant deep in the list', () => {
+    const shallow = visibleRange(4000, 400, 40, 100000, 5);
+    const deep = visibleRange(3000000, 400, 40, 100000, 5);
+    expect(deep.end - deep.start).toBe(shallow.end - shallow.start);
+    expect(deep.padTop + (deep.end - deep.start) * 40 + deep.padBottom).toBe(100000 * 40);
+  });
+
+  it('should clamp the window to the loaded rows', () => {
+    const range = visibleRange(10000, 400, 40, 20, 5);
+    expect(range.end).toBe(20);
+    expect(range.start).toBeLessThanOrEqual(range.end);
+    expect(range.padBottom).toBe(0);
+  });
+
+  it('should request the next page near the end of loaded rows', () => {
+    expect(shouldLoadMore(85, 100, 20)).toBe(true);
+    expect(shouldLoadMore(50, 100, 20)).toBe(false);
+  });
+});
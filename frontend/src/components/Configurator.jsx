@@ -1,6 +1,7 @@
 import React, { useState, useEffect, useRef } from 'react';
 import { Search, Package, Layers, X, Calculator, Zap, Plus, ChevronDown, Wrench, Save, FileText, Trash2, Pencil, Download } from 'lucide-react';
 import { exportMaterialsToExcel } from '../utils/excelExporter';
+import { cell, rowAt, toRows, fromRows, concatTables } from '../utils/columnar';
 
 // Conductor options
 const CONDUTORES_MT = [
@@ -22,6 +23,8 @@ const CONDUTORES_BT = [
   { id: 'cab_1_0awg', label: 'Cabo 1/0 AWG', tipo: 'Nua' },
 ];
 
+const MATERIAL_COLUMNS = ['sap', 'descricao', 'unidade', 'preco_unitario', 'quantidade', 'subtotal', 'categoria'];
+
 // Persistence
 const loadState = () => {
   try {
@@ -243,15 +246,12 @@ const Configurator = () => {
 
     const start = performance.now();
 
-    // Get kit materials
-    let kitData = { materiais: [], totalMaterial: 0, totalServico: 0 };
+    // Get kit materials (columnar: no row objects are built for them)
+    let kitData = { materiais: fromRows([], []), totalMaterial: 0, totalServico: 0 };
     if (kitList.length > 0) {
-      kitData = await window.api.getCustoTotal(kitList) || kitData;
+      kitData = await window.api.getCustoTotal(kitList, { format: 'columnar' }) || kitData;
     }
 
-    // Build consolidated materials with categories
-    const allMaterials = [];
-
     // 1. Add POSTES (from materiaisAvulsos that contain "POSTE")
     const postes = [];
     materiaisAvulsos.forEach(mat => {
@@ -295,48 +295,43 @@ const Configurator = () => {
     });
 
     // 3. CONSOLIDATE ALL MATERIALS BY SAP (kit materials + loose materials)
-    // This prevents duplicates when same material appears in kit and as loose item
-    const consolidatedMaterials = new Map();
-
-    // Add kit materials
-    kitData.materiais.forEach(mat => {
-      const key = mat.sap;
-      if (consolidatedMaterials.has(key)) {
-        const existing = consolidatedMaterials.get(key);
-        existing.quantidade += mat.quantidade || 0;
-        existing.subtotal += mat.subtotal || 0;
-      } else {
-        consolidatedMaterials.set(key, {
-          ...mat,
-          categoria: 'MATERIAL'
-        });
-      }
-    });
+    // This prevents duplicates when same material appears in kit and as loose item.
+    // Loose quantities are added straight into copies of the kit columns.
+    const kitMaterials = kitData.materiais;
+    const quantidade = Float64Array.from(kitMaterials.columns.quantidade || []);
+    const subtotal = Float64Array.from(kitMaterials.columns.subtotal || []);
+    const rowBySap = new Map();
+    for (let i = 0; i < kitMaterials.length; i++) rowBySap.set(cell(kitMaterials, 'sap', i), i);
 
     // Add loose materials (excluding postes, merge by SAP)
     let looseTotal = 0;
+    const looseMaterials = new Map();
     materiaisAvulsos.forEach(mat => {
       if (!mat.descricao?.toUpperCase().includes('POSTE')) {
         const key = mat.sap;
         const qty = mat.quantidade || 1;
         const price = mat.preco_unitario || 0;
-        const subtotal = qty * price;
-        looseTotal += subtotal;
+        const lineTotal = qty * price;
+        looseTotal += lineTotal;
 
-        if (consolidatedMaterials.has(key)) {
+        if (rowBySap.has(key)) {
           // Merge with existing (from kits)
-          const existing = consolidatedMaterials.get(key);
+          const i = rowBySap.get(key);
+          quantidade[i] = (quantidade[i] || 0) + qty;
+          subtotal[i] = (subtotal[i] || 0) + lineTotal;
+        } else if (looseMaterials.has(key)) {
+          const existing = looseMaterials.get(key);
           existing.quantidade += qty;
-          existing.subtotal += subtotal;
+          existing.subtotal += lineTotal;
         } else {
           // New material
-          consolidatedMaterials.set(key, {
+          looseMaterials.set(key, {
             sap: mat.sap,
             descricao: mat.descricao,
             unidade: mat.unidade,
             preco_unitario: price,
             quantidade: qty,
-            subtotal: subtotal,
+            subtotal: lineTotal,
             categoria: 'MATERIAL'
           });
         }
@@ -344,9 +339,15 @@ const Configurator = () => {
     });
 
     // Combine all in order: Postes, Kits, Consolidated Materials
-    allMaterials.push(...postes);
-    allMaterials.push(...Array.from(kitsMap.values()));
-    allMaterials.push(...Array.from(consolidatedMaterials.values()));
+    const allMaterials = concatTables(
+      [
+        fromRows([...postes, ...kitsMap.values()], MATERIAL_COLUMNS),
+        { ...kitMaterials, columns: { ...kitMaterials.columns, quantidade, subtotal } }
+      ],
+      MATERIAL_COLUMNS,
+      { categoria: 'MATERIAL' },
+      Array.from(looseMaterials.values())
+    );
 
     const totalMaterial = kitData.totalMaterial + looseTotal +
       postes.reduce((sum, p) => sum + p.subtotal, 0) +
@@ -379,7 +380,7 @@ const Configurator = () => {
       `Mão de Obra: R$ ${custoData.totalServico.toLocaleString('pt-BR', { minimumFractionDigits: 2 })}\n` +
       `TOTAL: R$ ${custoData.totalGeral.toLocaleString('pt-BR', { minimumFractionDigits: 2 })}\n\n` +
       `Materiais (${custoData.materiais.length}):\n` +
-      custoData.materiais.map(m =>
+      toRows(custoData.materiais).map(m =>
         `${m.sap} - ${m.descricao} (${m.quantidade} ${m.unidade}) - R$ ${m.subtotal.toFixed(2)}`
       ).join('\n');
 
@@ -526,7 +527,7 @@ const Configurator = () => {
         {/* Export Button */}
         {custoData.materiais.length > 0 && (
           <button
-            onClick={() => exportMaterialsToExcel(custoData.materiais, custoData)}
+            onClick={() => exportMaterialsToExcel(toRows(custoData.materiais), custoData)}
             className="w-full flex items-center justify-center gap-1 px-2 py-1.5 text-xs rounded-lg border border-purple-200 text-purple-600 hover:bg-purple-50 transition"
           >
             <Download className="w-3 h-3" /> Exportar Excel
@@ -726,34 +727,38 @@ const Configurator = () => {
                 </tr>
               </thead>
               <tbody className="divide-y divide-gray-100">
-                {custoData.materiais.map((mat, idx) => (
-                  <tr key={mat.sap || idx} className="hover:bg-blue-50/50 group">
-                    <td className="px-2 py-1.5 font-mono text-blue-700 font-bold text-xs">{mat.sap}</td>
-                    <td className="px-2 py-1.5 text-gray-700 text-xs truncate max-w-[200px]">{mat.descricao}</td>
-                    <td className="px-2 py-1.5 text-center text-gray-400 text-xs">{mat.unidade}</td>
-                    <td className="px-2 py-1.5 text-right text-xs">{mat.quantidade?.toFixed(2)}</td>
-                    <td className="px-2 py-1.5 text-right text-gray-400 text-xs">{mat.preco_unitario?.toFixed(2)}</td>
-                    <td className="px-2 py-1.5 text-right font-bold text-emerald-700 text-xs">{mat.subtotal?.toFixed(2)}</td>
-                    <td className="px-2 py-1.5 text-center">
-                      <div className="flex items-center justify-center gap-1 opacity-0 group-hover:opacity-100 transition">
-                        <button
-                          onClick={() => editConsolidatedMaterial(mat)}
-                          className="p-1 rounded hover:bg-blue-100 text-blue-500"
-                          title="Alterar quantidade"
-                        >
-                          <Pencil className="w-3 h-3" />
-                        </button>
-                        <button
-                          onClick={() => deleteConsolidatedMaterial(mat.sap)}
-                          className="p-1 rounded hover:bg-red-100 text-red-500"
-                          title="Excluir material"
-                        >
-                          <Trash2 className="w-3 h-3" />
-                        </button>
-                      </div>
-                    </td>
-                  </tr>
-                ))}
+                {Array.from({ length: custoData.materiais.length }, (_, idx) => {
+                  const materiais = custoData.materiais;
+                  const sap = cell(materiais, 'sap', idx);
+                  return (
+                    <tr key={sap || idx} className="hover:bg-blue-50/50 group">
+                      <td className="px-2 py-1.5 font-mono text-blue-700 font-bold text-xs">{sap}</td>
+                      <td className="px-2 py-1.5 text-gray-700 text-xs truncate max-w-[200px]">{cell(materiais, 'descricao', idx)}</td>
+                      <td className="px-2 py-1.5 text-center text-gray-400 text-xs">{cell(materiais, 'unidade', idx)}</td>
+                      <td className="px-2 py-1.5 text-right text-xs">{cell(materiais, 'quantidade', idx)?.toFixed(2)}</td>
+                      <td className="px-2 py-1.5 text-right text-gray-400 text-xs">{cell(materiais, 'preco_unitario', idx)?.toFixed(2)}</td>
+                      <td className="px-2 py-1.5 text-right font-bold text-emerald-700 text-xs">{cell(materiais, 'subtotal', idx)?.toFixed(2)}</td>
+                      <td className="px-2 py-1.5 text-center">
+                        <div className="flex items-center justify-center gap-1 opacity-0 group-hover:opacity-100 transition">
+                          <button
+                            onClick={() => editConsolidatedMaterial(rowAt(materiais, idx))}
+                            className="p-1 rounded hover:bg-blue-100 text-blue-500"
+                            title="Alterar quantidade"
+                          >
+                            <Pencil className="w-3 h-3" />
+                          </button>
+                          <button
+                            onClick={() => deleteConsolidatedMaterial(sap)}
+                            className="p-1 rounded hover:bg-red-100 text-red-500"
+                            title="Excluir material"
+                          >
+                            <Trash2 className="w-3 h-3" />
+                          </button>
+                        </div>
+                      </td>
+                    </tr>
+                  );
+                })}
               </tbody>
             </table>
           </div>
@@ -1,12 +1,26 @@
 import React, { useState, useEffect } from 'react';
 import { Wrench, Search, Plus, Trash2, Package, Layers, Edit2 } from 'lucide-react';
+import { useKeysetList } from '../hooks/useKeysetList';
+import { useVirtualRows } from '../hooks/useVirtualRows';
+import { shouldLoadMore } from '../utils/virtualList';
+
+const KIT_ROW_HEIGHT = 64;
 
 const KitEditor = () => {
-  const [kits, setKits] = useState([]);
   const [searchQuery, setSearchQuery] = useState('');
+  const [filter, setFilter] = useState('');
   const [selectedKit, setSelectedKit] = useState(null);
   const [composition, setComposition] = useState([]);
-  const [loading, setLoading] = useState(false);
+
+  // Kit list: keyset pages sorted by code, only visible rows rendered
+  const { rows: kits, setRows: setKits, hasMore, loading, loadMore, reload: loadKits } =
+    useKeysetList('pageKits', { sort: 'codigo_kit', filter });
+  const { containerRef, onScroll, scrollToTop, start, end, padTop, padBottom } =
+    useVirtualRows(kits.length, KIT_ROW_HEIGHT);
+
+  useEffect(() => {
+    if (hasMore && !loading && shouldLoadMore(end, kits.length)) loadMore();
+  }, [end, kits.length, hasMore, loading, loadMore]);
 
   // Material search for adding to kit
   const [materialQuery, setMaterialQuery] = useState('');
@@ -29,32 +43,22 @@ const KitEditor = () => {
     const saved = localStorage.getItem('kitEditor_state');
     if (saved) {
       const { selectedKitCode, searchQuery: savedQuery } = JSON.parse(saved);
-      if (savedQuery) setSearchQuery(savedQuery);
+      if (savedQuery) {
+        setSearchQuery(savedQuery);
+        setFilter(savedQuery.trim());
+      }
       if (selectedKitCode) {
         window.api?.getKit(selectedKitCode).then(kit => {
           if (kit) handleSelectKit(kit);
         });
       }
     }
-    loadKits();
   }, []);
 
-  const loadKits = async () => {
-    if (!window.api) return;
-    setLoading(true);
-    const data = await window.api.getAllKits();
-    setKits(data?.slice(0, 100) || []);
-    setLoading(false);
-  };
-
-  const handleSearch = async () => {
-    if (!window.api) return;
-    if (searchQuery.trim()) {
-      const results = await window.api.searchKits(searchQuery);
-      setKits(results || []);
-    } else {
-      await loadKits();
-    }
+  const handleSearch = () => {
+    scrollToTop();
+    if (searchQuery.trim() === filter) loadKits();
+    else setFilter(searchQuery.trim());
   };
 
   const handleSelectKit = async (kit) => {
@@ -285,11 +289,13 @@ const KitEditor = () => {
             </div>
           </div>
 
-          <div className="flex-1 overflow-y-auto custom-scrollbar">
-            {kits.map((kit) => (
+          <div ref={containerRef} onScroll={onScroll} className="flex-1 overflow-y-auto custom-scrollbar">
+            {padTop > 0 && <div style={{ height: padTop }} />}
+            {kits.slice(start, end).map((kit) => (
               <button
                 key={kit.codigo_kit}
                 onClick={() => handleSelectKit(kit)}
+                style={{ height: KIT_ROW_HEIGHT }}
                 className={`w-full text-left px-4 py-3 border-b border-gray-100 hover:bg-gray-50 ${selectedKit?.codigo_kit === kit.codigo_kit ? 'bg-orange-50' : ''
                   }`}
               >
@@ -297,6 +303,7 @@ const KitEditor = () => {
                 <p className="text-sm text-gray-600 truncate">{kit.descricao_kit}</p>
               </button>
             ))}
+            {padBottom > 0 && <div style={{ height: padBottom }} />}
           </div>
         </div>
 
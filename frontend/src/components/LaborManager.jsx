@@ -1,35 +1,45 @@
 import React, { useState, useEffect } from 'react';
-import { DollarSign, Search, Edit2, Save, X, Plus } from 'lucide-react';
+import { DollarSign, Search, Edit2, Save, X, Plus, ChevronUp, ChevronDown } from 'lucide-react';
+import { useKeysetList } from '../hooks/useKeysetList';
+import { useVirtualRows } from '../hooks/useVirtualRows';
+import { shouldLoadMore } from '../utils/virtualList';
+
+const ROW_HEIGHT = 41;
 
 const LaborManager = () => {
-  const [servicos, setServicos] = useState([]);
-  const [searchQuery, setSearchQuery] = useState('');
+  const [searchQuery, setSearchQuery] = useState(() => localStorage.getItem('laborManager_searchQuery') || '');
+  const [filter, setFilter] = useState(searchQuery);
+  const [sort, setSort] = useState({ column: 'codigo', dir: 'asc' });
   const [editingId, setEditingId] = useState(null);
   const [editData, setEditData] = useState({});
   const [showAddForm, setShowAddForm] = useState(false);
   const [newServico, setNewServico] = useState({ codigo: '', descricao: '', preco_bruto: 0 });
 
+  const { rows: servicos, setRows: setServicos, total, hasMore, loading, loadMore, reload } =
+    useKeysetList('pageServicos', { sort: sort.column, dir: sort.dir, filter });
+  const { containerRef, onScroll, scrollToTop, start, end, padTop, padBottom } =
+    useVirtualRows(servicos.length, ROW_HEIGHT);
+
   useEffect(() => {
-    const saved = localStorage.getItem('laborManager_searchQuery');
-    if (saved) setSearchQuery(saved);
-    loadServicos();
-  }, []);
+    if (hasMore && !loading && shouldLoadMore(end, servicos.length)) loadMore();
+  }, [end, servicos.length, hasMore, loading, loadMore]);
 
-  const loadServicos = async () => {
-    if (!window.api) return;
-    const data = await window.api.getAllServicos();
-    setServicos(data || []);
+  const handleSearch = () => {
+    localStorage.setItem('laborManager_searchQuery', searchQuery);
+    scrollToTop();
+    if (searchQuery.trim() === filter) reload();
+    else setFilter(searchQuery.trim());
   };
 
-  const handleSearch = async () => {
-    if (!window.api) return;
-    if (searchQuery.trim()) {
-      const results = await window.api.searchServicos(searchQuery);
-      setServicos(results || []);
-    } else {
-      await loadServicos();
-    }
-    localStorage.setItem('laborManager_searchQuery', searchQuery);
+  const toggleSort = (column) => {
+    scrollToTop();
+    setSort(prev => ({ column, dir: prev.column === column && prev.dir === 'asc' ? 'desc' : 'asc' }));
+  };
+
+  const sortIcon = (column) => {
+    if (sort.column !== column) return null;
+    const Icon = sort.dir === 'asc' ? ChevronUp : ChevronDown;
+    return <Icon className="w-3 h-3 inline ml-1" />;
   };
 
   const startEdit = (item) => { setEditingId(item.codigo); setEditData({ ...item }); };
@@ -38,8 +48,8 @@ const LaborManager = () => {
   const saveEdit = async () => {
     if (!window.api) return;
     await window.api.upsertServico({ codigo: editData.codigo, descricao: editData.descricao, precoBruto: editData.preco_bruto });
+    setServicos(prev => prev.map(s => s.codigo === editData.codigo ? { ...s, ...editData } : s));
     setEditingId(null);
-    handleSearch();
   };
 
   const handleAddNew = async () => {
@@ -47,7 +57,7 @@ const LaborManager = () => {
     await window.api.upsertServico({ codigo: newServico.codigo, descricao: newServico.descricao, precoBruto: newServico.preco_bruto });
     setNewServico({ codigo: '', descricao: '', preco_bruto: 0 });
     setShowAddForm(false);
-    loadServicos();
+    reload();
   };
 
   return (
@@ -84,14 +94,21 @@ const LaborManager = () => {
       </div>
 
       <div className="bg-white rounded-2xl border shadow-sm overflow-hidden">
+        <div ref={containerRef} onScroll={onScroll} className="max-h-[calc(100vh-22rem)] overflow-y-auto custom-scrollbar">
         {servicos.length > 0 ? (
           <table className="w-full text-sm">
-            <thead className="bg-gray-50 text-xs uppercase text-gray-500">
-              <tr><th className="px-4 py-3 text-left">Código</th><th className="px-4 py-3 text-left">Descrição</th><th className="px-4 py-3 text-right">Preço (R$)</th><th className="px-4 py-3 w-20"></th></tr>
+            <thead className="bg-gray-50 text-xs uppercase text-gray-500 sticky top-0 z-10">
+              <tr>
+                <th className="px-4 py-3 text-left cursor-pointer select-none" onClick={() => toggleSort('codigo')}>Código{sortIcon('codigo')}</th>
+                <th className="px-4 py-3 text-left cursor-pointer select-none" onClick={() => toggleSort('descricao')}>Descrição{sortIcon('descricao')}</th>
+                <th className="px-4 py-3 text-right cursor-pointer select-none" onClick={() => toggleSort('preco_bruto')}>Preço (R$){sortIcon('preco_bruto')}</th>
+                <th className="px-4 py-3 w-20"></th>
+              </tr>
             </thead>
             <tbody className="divide-y divide-gray-100">
-              {servicos.map((item) => (
-                <tr key={item.codigo} className="hover:bg-gray-50">
+              {padTop > 0 && <tr style={{ height: padTop }} />}
+              {servicos.slice(start, end).map((item) => (
+                <tr key={item.codigo} className="hover:bg-gray-50" style={{ height: ROW_HEIGHT }}>
                   {editingId === item.codigo ? (
                     <>
                       <td className="px-4 py-2 font-mono text-purple-600">{item.codigo}</td>
@@ -109,12 +126,14 @@ const LaborManager = () => {
                   )}
                 </tr>
               ))}
+              {padBottom > 0 && <tr style={{ height: padBottom }} />}
             </tbody>
           </table>
         ) : (
-          <div className="text-center py-16"><DollarSign className="w-16 h-16 mx-auto text-gray-300 mb-4" /><p className="text-gray-400">Nenhum serviço encontrado</p></div>
+          <div className="text-center py-16"><DollarSign className="w-16 h-16 mx-auto text-gray-300 mb-4" /><p className="text-gray-400">{loading ? 'Carregando...' : 'Nenhum serviço encontrado'}</p></div>
         )}
-        <div className="px-4 py-3 bg-gray-50 text-sm text-gray-500 border-t">{servicos.length} serviços</div>
+        </div>
+        <div className="px-4 py-3 bg-gray-50 text-sm text-gray-500 border-t">{servicos.length.toLocaleString('pt-BR')} de {(total ?? servicos.length).toLocaleString('pt-BR')} serviços</div>
       </div>
     </div>
   );
@@ -1,41 +1,46 @@
 import React, { useState, useEffect } from 'react';
-import { Layers, Search, Edit2, Save, X, Plus, Trash2 } from 'lucide-react';
+import { Layers, Search, Edit2, Save, X, Plus, Trash2, ChevronUp, ChevronDown } from 'lucide-react';
+import { useKeysetList } from '../hooks/useKeysetList';
+import { useVirtualRows } from '../hooks/useVirtualRows';
+import { shouldLoadMore } from '../utils/virtualList';
+
+const ROW_HEIGHT = 41;
 
 const MaterialManager = () => {
-  const [materials, setMaterials] = useState([]);
-  const [searchQuery, setSearchQuery] = useState('');
-  const [loading, setLoading] = useState(false);
+  const [searchQuery, setSearchQuery] = useState(() => localStorage.getItem('materialManager_searchQuery') || '');
+  const [filter, setFilter] = useState(searchQuery);
+  const [sort, setSort] = useState({ column: 'sap', dir: 'asc' });
   const [editingId, setEditingId] = useState(null);
   const [editData, setEditData] = useState({});
   const [showAddForm, setShowAddForm] = useState(false);
   const [newMaterial, setNewMaterial] = useState({ sap: '', descricao: '', unidade: 'UN', preco_unitario: 0 });
 
-  // Load materials on mount
+  // Server-side sort/filter, pages fetched as the table scrolls
+  const { rows: materials, setRows: setMaterials, total, hasMore, loading, loadMore, reload } =
+    useKeysetList('pageMaterials', { sort: sort.column, dir: sort.dir, filter });
+  const { containerRef, onScroll, scrollToTop, start, end, padTop, padBottom } =
+    useVirtualRows(materials.length, ROW_HEIGHT);
+
   useEffect(() => {
-    const saved = localStorage.getItem('materialManager_searchQuery');
-    if (saved) setSearchQuery(saved);
-    loadMaterials();
-  }, []);
+    if (hasMore && !loading && shouldLoadMore(end, materials.length)) loadMore();
+  }, [end, materials.length, hasMore, loading, loadMore]);
 
-  const loadMaterials = async () => {
-    if (!window.api) return;
-    setLoading(true);
-    const data = await window.api.getAllMaterials();
-    setMaterials(data?.slice(0, 100) || []); // Limit for performance
-    setLoading(false);
+  const handleSearch = () => {
+    localStorage.setItem('materialManager_searchQuery', searchQuery);
+    scrollToTop();
+    if (searchQuery.trim() === filter) reload();
+    else setFilter(searchQuery.trim());
   };
 
-  const handleSearch = async () => {
-    if (!window.api) return;
-    setLoading(true);
-    if (searchQuery.trim()) {
-      const results = await window.api.searchMaterials(searchQuery);
-      setMaterials(results || []);
-    } else {
-      await loadMaterials();
-    }
-    localStorage.setItem('materialManager_searchQuery', searchQuery);
-    setLoading(false);
+  const toggleSort = (column) => {
+    scrollToTop();
+    setSort(prev => ({ column, dir: prev.column === column && prev.dir === 'asc' ? 'desc' : 'asc' }));
+  };
+
+  const sortIcon = (column) => {
+    if (sort.column !== column) return null;
+    const Icon = sort.dir === 'asc' ? ChevronUp : ChevronDown;
+    return <Icon className="w-3 h-3 inline ml-1" />;
   };
 
   const handleKeyDown = (e) => {
@@ -57,15 +62,15 @@ const MaterialManager = () => {
   const saveEdit = async () => {
     if (!window.api) return;
     await window.api.upsertMaterial(editData);
+    setMaterials(prev => prev.map(m => m.sap === editData.sap ? { ...m, ...editData } : m));
     setEditingId(null);
     setEditData({});
-    handleSearch();
   };
 
   const handleDelete = async (sap) => {
     if (!window.api || !confirm('Excluir este material?')) return;
     await window.api.deleteMaterial(sap);
-    handleSearch();
+    reload();
   };
 
   const handleAddNew = async () => {
@@ -73,7 +78,7 @@ const MaterialManager = () => {
     await window.api.upsertMaterial(newMaterial);
     setNewMaterial({ sap: '', descricao: '', unidade: 'UN', preco_unitario: 0 });
     setShowAddForm(false);
-    handleSearch();
+    reload();
   };
 
   return (
@@ -171,19 +176,21 @@ const MaterialManager = () => {
 
       {/* Table */}
       <div className="glass-panel rounded-2xl overflow-hidden">
+        <div ref={containerRef} onScroll={onScroll} className="max-h-[calc(100vh-22rem)] overflow-y-auto custom-scrollbar">
         <table className="w-full text-sm">
-          <thead className="bg-gray-50 text-xs uppercase text-gray-500">
+          <thead className="bg-gray-50 text-xs uppercase text-gray-500 sticky top-0 z-10">
             <tr>
-              <th className="px-4 py-3 text-left">SAP</th>
-              <th className="px-4 py-3 text-left">Descrição</th>
-              <th className="px-4 py-3 text-center">Unidade</th>
-              <th className="px-4 py-3 text-right">Preço (R$)</th>
+              <th className="px-4 py-3 text-left cursor-pointer select-none" onClick={() => toggleSort('sap')}>SAP{sortIcon('sap')}</th>
+              <th className="px-4 py-3 text-left cursor-pointer select-none" onClick={() => toggleSort('descricao')}>Descrição{sortIcon('descricao')}</th>
+              <th className="px-4 py-3 text-center cursor-pointer select-none" onClick={() => toggleSort('unidade')}>Unidade{sortIcon('unidade')}</th>
+              <th className="px-4 py-3 text-right cursor-pointer select-none" onClick={() => toggleSort('preco_unitario')}>Preço (R$){sortIcon('preco_unitario')}</th>
               <th className="px-4 py-3 text-center">Ações</th>
             </tr>
           </thead>
           <tbody className="divide-y divide-gray-100">
-            {materials.map((mat) => (
-              <tr key={mat.sap} className="hover:bg-gray-50">
+            {padTop > 0 && <tr style={{ height: padTop }} />}
+            {materials.slice(start, end).map((mat) => (
+              <tr key={mat.sap} className="hover:bg-gray-50" style={{ height: ROW_HEIGHT }}>
                 {editingId === mat.sap ? (
                   <>
                     <td className="px-4 py-2 font-mono text-blue-600">{mat.sap}</td>
@@ -242,10 +249,13 @@ const MaterialManager = () => {
                 )}
               </tr>
             ))}
+            {padBottom > 0 && <tr style={{ height: padBottom }} />}
           </tbody>
         </table>
+        </div>
         <div className="px-4 py-3 bg-gray-50 text-sm text-gray-500 border-t">
-          Mostrando {materials.length} materiais • Total no banco: 26.636
+          Carregados {materials.length.toLocaleString('pt-BR')} de {(total ?? materials.length).toLocaleString('pt-BR')} materiais
+          {loading && ' • carregando...'}
         </div>
       </div>
     </div>
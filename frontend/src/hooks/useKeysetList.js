@@ -0,0 +1,53 @@
+import { useState, useEffect, useRef, useCallback } from 'react';
+
+/**
+ * Keyset-paginated catalog list backed by a `window.api.page*` endpoint.
+ * Pages are appended on demand; changing sort, direction or filter restarts
+ * from the first page. Responses of superseded queries are discarded.
+ * @param {string} endpoint - Name of the API method (e.g. 'pageMaterials')
+ */
+export function useKeysetList(endpoint, { sort, dir = 'asc', filter = '', pageSize = 100 } = {}) {
+  const [rows, setRows] = useState([]);
+  const [total, setTotal] = useState(null);
+  const [hasMore, setHasMore] = useState(false);
+  const [loading, setLoading] = useState(false);
+
+  const cursorRef = useRef(null);
+  const queryRef = useRef(0);
+  const inFlightRef = useRef(false);
+
+  const fetchPage = useCallback(async (reset) => {
+    if (!window.api?.[endpoint]) return;
+    if (!reset && (inFlightRef.current || !cursorRef.current)) return;
+
+    const queryId = reset ? ++queryRef.current : queryRef.current;
+    inFlightRef.current = true;
+    setLoading(true);
+    try {
+      const page = await window.api[endpoint]({
+        cursor: reset ? null : cursorRef.current,
+        limit: pageSize,
+        sort,
+        dir,
+        filter
+      });
+      if (queryId !== queryRef.current) return;
+      cursorRef.current = page?.nextCursor || null;
+      setRows(prev => reset ? (page?.rows || []) : prev.concat(page?.rows || []));
+      if (reset) setTotal(page?.total ?? null);
+      setHasMore(!!page?.hasMore);
+    } finally {
+      if (queryId === queryRef.current) {
+        inFlightRef.current = false;
+        setLoading(false);
+      }
+    }
+  }, [endpoint, sort, dir, filter, pageSize]);
+
+  const reload = useCallback(() => fetchPage(true), [fetchPage]);
+  const loadMore = useCallback(() => fetchPage(false), [fetchPage]);
+
+  useEffect(() => { reload(); }, [reload]);
+
+  return { rows, setRows, total, hasMore, loading, loadMore, reload };
+}
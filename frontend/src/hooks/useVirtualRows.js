@@ -0,0 +1,37 @@
+import { useState, useEffect, useRef, useCallback } from 'react';
+import { visibleRange } from '../utils/virtualList';
+
+/**
+ * Windowed rendering for fixed-height rows: only the rows inside the scroll
+ * viewport (plus overscan) are rendered, spacers stand in for the rest.
+ */
+export function useVirtualRows(count, rowHeight, overscan = 10) {
+  const containerRef = useRef(null);
+  const [scrollTop, setScrollTop] = useState(0);
+  const [viewportHeight, setViewportHeight] = useState(600);
+
+  useEffect(() => {
+    const el = containerRef.current;
+    if (!el) return;
+    const update = () => setViewportHeight(el.clientHeight || 600);
+    update();
+    if (typeof ResizeObserver === 'undefined') return;
+    const observer = new ResizeObserver(update);
+    observer.observe(el);
+    return () => observer.disconnect();
+  }, []);
+
+  const onScroll = useCallback((e) => setScrollTop(e.currentTarget.scrollTop), []);
+
+  const scrollToTop = useCallback(() => {
+    if (containerRef.current) containerRef.current.scrollTop = 0;
+    setScrollTop(0);
+  }, []);
+
+  return {
+    containerRef,
+    onScroll,
+    scrollToTop,
+    ...visibleRange(scrollTop, viewportHeight, rowHeight, count, overscan)
+  };
+}
@@ -0,0 +1,87 @@
+/**
+ * Columnar result sets, as returned by the database with { format: 'columnar' }.
+ *
+ * Shape: { format: 'columnar', length, names, columns, strings }. Numeric
+ * columns are Float64Arrays (NULL as NaN); text columns are Uint32Array indexes
+ * into `strings`, a dictionary shared by every column where index 0 is NULL.
+ * Read cells in place with cell(); build row objects only for export or copy.
+ */
+
+export const isColumnar = (data) => data?.format === 'columnar';
+
+/**
+ * Value of one cell, or null for NULL.
+ * @param {object} table - Columnar table
+ * @param {string} name - Column name
+ * @param {number} i - Row index
+ */
+export function cell(table, name, i) {
+  const column = table.columns[name];
+  if (!column) return undefined;
+  if (column instanceof Uint32Array) return table.strings[column[i]];
+  return Number.isNaN(column[i]) ? null : column[i];
+}
+
+export function rowAt(table, i) {
+  const row = {};
+  table.names.forEach(name => { row[name] = cell(table, name, i); });
+  return row;
+}
+
+/** Row objects for a columnar table; plain row arrays are returned as-is. */
+export function toRows(table) {
+  if (!isColumnar(table)) return table || [];
+  return Array.from({ length: table.length }, (_, i) => rowAt(table, i));
+}
+
+/**
+ * Columnar table from row objects. A column is numeric when every non-null
+ * value is a number.
+ * @param {object[]} rows
+ * @param {string[]} names - Columns to keep, in order
+ */
+export function fromRows(rows, names) {
+  return concatTables([], names, {}, rows);
+}
+
+/**
+ * Concatenates tables into one with the given columns. Columns a table lacks
+ * take the value from `defaults` (or NULL). Row objects in `extraRows` are
+ * appended last.
+ */
+export function concatTables(tables, names, defaults = {}, extraRows = []) {
+  const length = tables.reduce((sum, t) => sum + t.length, 0) + extraRows.length;
+  const values = (name) => {
+    const out = [];
+    tables.forEach(t => {
+      for (let i = 0; i < t.length; i++) {
+        out.push(t.columns[name] ? cell(t, name, i) : (defaults[name] ?? null));
+      }
+    });
+    extraRows.forEach(row => out.push(row[name] ?? null));
+    return out;
+  };
+
+  const strings = [null];
+  const stringIndex = new Map();
+  const columns = {};
+  names.forEach(name => {
+    const column = values(name);
+    if (column.every(v => v === null || typeof v === 'number')) {
+      columns[name] = Float64Array.from(column, v => (v === null ? NaN : v));
+      return;
+    }
+    columns[name] = Uint32Array.from(column, v => {
+      if (v === null) return 0;
+      const text = String(v);
+      let index = stringIndex.get(text);
+      if (index === undefined) {
+        index = strings.length;
+        strings.push(text);
+        stringIndex.set(text, index);
+      }
+      return index;
+    });
+  });
+  return { format: 'columnar', length, names, columns, strings };
+}
@@ -0,0 +1,33 @@
+/**
+ * Computes which rows of a fixed-row-height list are visible.
+ * @param {number} scrollTop - Scroll offset of the container (px)
+ * @param {number} viewportHeight - Visible height of the container (px)
+ * @param {number} rowHeight - Height of every row (px)
+ * @param {number} count - Number of loaded rows
+ * @param {number} overscan - Extra rows rendered above and below the viewport
+ * @returns {{start: number, end: number, padTop: number, padBottom: number}}
+ */
+export function visibleRange(scrollTop, viewportHeight, rowHeight, count, overscan = 10) {
+  const first = Math.floor(Math.max(scrollTop, 0) / rowHeight);
+  const last = Math.ceil((Math.max(scrollTop, 0) + viewportHeight) / rowHeight);
+  const span = last - first + 2 * overscan;
+  const end = Math.min(count, last + overscan);
+  const start = Math.max(0, Math.min(first - overscan, end - span));
+  return {
+    start,
+    end,
+    padTop: start * rowHeight,
+    padBottom: Math.max(0, (count - end) * rowHeight)
+  };
+}
+
+/**
+ * True when the rendered window is close enough to the end of the loaded
+ * rows that the next page should be requested.
+ * @param {number} end - Exclusive end index of the rendered window
+ * @param {number} count - Number of loaded rows
+ * @param {number} threshold - Rows before the end that trigger a fetch
+ */
+export function shouldLoadMore(end, count, threshold = 20) {
+  return end >= count - threshold;
+}
@@ -0,0 +1,230 @@
+"""
+CQT Light V3 - Catalog Coverage Engine
+Which materials the kits need but the catalog cannot price, and which kits
+they block.
+
+The kit compositions are flattened once into edge arrays (kit, SAP)
+sorted by SAP, so the edges of one SAP are a contiguous range: a
+SAP -> kits reverse index in CSR form. Everything else is bincounts over the
+edges:
+
+    blocking   per kit, how many of its materials are unpriced
+    impact     per SAP, the kits (and their usage weight) it blocks
+    unlocks    per SAP, the kits it is the last blocker of
+
+A material is priced when it is in the catalog with a price above zero.
+update_prices() takes new prices (or new catalog entries) and only touches
+the edges of the SAPs that changed, so coverage can follow a price import
+item by item. Kit usage (how often each kit is budgeted) weights the
+impact; kits without a usage count weigh 1.
+
+Usage:
+    python catalog_coverage.py [--kits kits.json] [--catalog catalog.json|cqt_light.db]
+                               [--usage usage.json] [--top N]
+"""
+
+import argparse
+import json
+import sqlite3
+import time
+from pathlib import Path
+
+import numpy as np
+
+BASE_DIR = Path(__file__).parent.parent
+DATA_DIR = BASE_DIR / "data"
+KITS_PATH = DATA_DIR / "kits" / "kits.json"
+TEMPLATES_PATH = DATA_DIR / "standards" / "structure_templates.json"
+CATALOG_PATH = DATA_DIR / "catalog" / "material_catalog.json"
+DB_PATH = BASE_DIR / "frontend" / "cqt_light.db"
+
+# Material status codes
+PRICED, ZERO_PRICE, NOT_IN_CATALOG = 0, 1, 2
+STATUS_LABELS = ("priced", "price 0.0", "not in catalog")
+
+
+def load_kits(path=KITS_PATH):
+    """Kit compositions {kit: {"name", "materials": [{"sap", "description", "qty"}]}}."""
+    with open(path, "r", encoding="utf-8") as f:
+        return json.load(f)
+
+
+def load_catalog(path=CATALOG_PATH):
+    """
+    Catalog as {sap: (description, price)}, from material_catalog.json or
+    from the materiais table of a cqt_light.db (opened read-only, so a wrong
+    path never leaves an empty database behind).
+    """
+    if Path(path).suffix == ".db":
+        if not Path(path).is_file():
+            raise FileNotFoundError(f"Catalog database not found: {path}")
+        conn = sqlite3.connect(f"{Path(path).resolve().as_uri()}?mode=ro", uri=True)
+        try:
+            rows = conn.execute("SELECT sap, descricao, preco_unitario FROM materiais").fetchall()
+        finally:
+            conn.close()
+        return {str(sap): (desc, float(price or 0)) for sap, desc, price in rows}
+    with open(path, "r", encoding="utf-8") as f:
+        catalog = json.load(f)
+    return {str(sap): (item.get("description", ""), float(item.get("price", 0) or 0))
+            for sap, item in catalog.items()}
+
+
+def default_catalog_path():
+    """material_catalog.json when it has been exported, else the app database."""
+    return CATALOG_PATH if CATALOG_PATH.exists() else DB_PATH
+
+
+class CoverageIndex:
+    """Kit/material edge arrays with a SAP -> kits reverse index and per-kit blocking counts."""
+
+    def __init__(self, kits, catalog, usage=None):
+        self.kits = list(kits)
+        kit_sap, kit_idx, descriptions = [], [], {}
+        for k, code in enumerate(self.kits):
+            for mat in kits[code].get("materials", []):
+                if not isinstance(mat, dict) or mat.get("sap") in (None, ""):
+                    continue
+                sap = str(mat["sap"]).strip()
+                kit_sap.append(sap)
+                kit_idx.append(k)
+                descriptions.setdefault(sap, mat.get("description", ""))
+
+        self.saps, sap_idx = np.unique(np.array(kit_sap, dtype=str), return_inverse=True)
+        sap_idx = sap_idx.astype(np.intp)
+        order = np.argsort(sap_idx, kind="stable")
+        self.edge_sap = sap_idx[order]
+        self.edge_kit = np.asarray(kit_idx, dtype=np.intp)[order]
+        self.starts = np.searchsorted(self.edge_sap, np.arange(len(self.saps) + 1))
+        self.position = {sap: i for i, sap in enumerate(self.saps.tolist())}
+        self.descriptions = [descriptions[sap] for sap in self.saps.tolist()]
+
+        by_code = {code: k for k, code in enumerate(self.kits)}
+        self.usage = np.ones(len(self.kits))
+        for code, count in (usage or {}).items():
+            if code in by_code:
+                self.usage[by_code[code]] = count
+
+        self.status = np.full(len(self.saps), NOT_IN_CATALOG, dtype=np.int8)
+        self.price = np.zeros(len(self.saps))
+        self._set_prices({sap: price for sap, (_, price) in catalog.items()})
+        self.blocking = np.bincount(self.edge_kit, weights=self.status[self.edge_sap] != PRICED,
+                                    minlength=len(self.kits)).astype(np.intp)
+
+    def _set_prices(self, prices):
+        """Update price and status of the SAPs the kits use; returns their indexes."""
+        known = [(self.position[str(sap)], float(price or 0)) for sap, price in prices.items()
+                 if str(sap) in self.position]
+        if not known:
+            return np.empty(0, dtype=np.intp)
+        idx, values = np.array([i for i, _ in known], dtype=np.intp), np.array([v for _, v in known])
+        self.price[idx] = values
+        self.status[idx] = np.where(values > 0, PRICED, ZERO_PRICE)
+        return idx
+
+    def edges_of(self, sap_indexes):
+        """Edge positions of some SAPs (their ranges in the reverse index)."""
+        sap_indexes = np.asarray(sap_indexes, dtype=np.intp)
+        lo, hi = self.starts[sap_indexes], self.starts[sap_indexes + 1]
+        counts = hi - lo
+        return np.repeat(lo - np.cumsum(counts) + counts, counts) + np.arange(counts.sum())
+
+    def kits_blocked_by(self, sap):
+        """Kit codes that use a SAP."""
+        i = self.position.get(str(sap))
+        if i is None:
+            return []
+        return [self.kits[k] for k in self.edge_kit[self.starts[i]:self.starts[i + 1]]]
+
+    def update_prices(self, prices):
+        """
+        Apply new prices {sap: price} (0 marks a catalogued but unpriced item).
+        Only the edges of those SAPs are revisited. Returns the number of kits
+        that became fully priced.
+        """
+        was = self.status.copy()
+        idx = np.unique(self._set_prices(prices))
+        changed = idx[(was[idx] != PRICED) != (self.status[idx] != PRICED)]
+        if not len(changed):
+            return 0
+        edges = self.edges_of(changed)
+        delta = np.where(self.status[self.edge_sap[edges]] == PRICED, -1, 1)
+        before = self.blocking == 0
+        np.add.at(self.blocking, self.edge_kit[edges], delta)
+        return int(((self.blocking == 0) & ~before).sum())
+
+    def report(self):
+        """
+        Coverage summary plus the unpriced SAPs, most impactful first:
+        dict with required, priced, coverage, kits_complete, weighted_coverage
+        and missing (list of dicts: sap, description, status, kits,
+        weighted_kits, unlocks).
+        """
+        unpriced = self.status[self.edge_sap] != PRICED
+        n = len(self.saps)
+        kits = np.bincount(self.edge_sap, weights=unpriced, minlength=n)
+        weighted = np.bincount(self.edge_sap, weights=unpriced * self.usage[self.edge_kit], minlength=n)
+        last = unpriced & (self.blocking[self.edge_kit] == 1)
+        unlocks = np.bincount(self.edge_sap, weights=last * self.usage[self.edge_kit], minlength=n)
+
+        missing = np.flatnonzero(self.status != PRICED)
+        missing = missing[np.lexsort((self.saps[missing], -unlocks[missing], -weighted[missing]))]
+        used = np.bincount(self.edge_kit, minlength=len(self.kits)) > 0
+        complete = used & (self.blocking == 0)
+        return {
+            "required": n,
+            "priced": int((self.status == PRICED).sum()),
+            "coverage": float((self.status == PRICED).mean()) if n else 0.0,
+            "kits": int(used.sum()),
+            "kits_complete": int(complete.sum()),
+            "weighted_coverage": float(self.usage[complete].sum() / self.usage[used].sum()) if used.any() else 0.0,
+            "missing": [{"sap": str(self.saps[i]), "description": self.descriptions[i],
+                         "status": STATUS_LABELS[self.status[i]], "kits": int(kits[i]),
+                         "weighted_kits": float(weighted[i]), "unlocks": float(unlocks[i])} for i in missing],
+        }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Catalog coverage of the kit compositions")
+    parser.add_argument("--kits", default=str(KITS_PATH))
+    parser.add_argument("--catalog", default=None, help=f"Catalog JSON or cqt_light.db (default: {CATALOG_PATH})")
+    parser.add_argument("--usage", help="JSON {kit: times used} to weight the kits")
+    parser.add_argument("--top", type=int, default=20)
+    args = parser.parse_args()
+
+    print("=" * 60)
+    print("📦 CQT Light V3 - Catalog Coverage")
+    print("=" * 60)
+
+    catalog_path = args.catalog or default_catalog_path()
+    start = time.perf_counter()
+    kits = load_kits(args.kits)
+    try:
+        catalog = load_catalog(catalog_path)
+    except (OSError, sqlite3.Error) as e:
+        print(f"⚠️ Catalog not available ({e}), reporting every material as missing")
+        catalog = {}
+    usage = None
+    if args.usage:
+        with open(args.usage, "r", encoding="utf-8") as f:
+            usage = json.load(f)
+    loaded = time.perf_counter()
+    index = CoverageIndex(kits, catalog, usage)
+    result = index.report()
+    elapsed = time.perf_counter() - loaded
+
+    print(f"✅ {len(index.edge_kit):,} kit materials indexed and reported in {elapsed * 1000:.0f} ms "
+          f"(+{(loaded - start) * 1000:.0f} ms loading)")
+    print(f"   Unique SAPs required: {result['required']:,}, priced: {result['priced']:,} "
+          f"({result['coverage']:.1%})")
+    print(f"   Kits fully priced: {result['kits_complete']:,} of {result['kits']:,} "
+          f"({result['weighted_coverage']:.1%} by usage)")
+
+    print(f"\n{'SAP':<10}{'Kits':>7}{'Peso':>9}{'Libera':>8}  Situação        Descrição")
+    for m in result["missing"][:args.top]:
+        print(f"{m['sap']:<10}{m['kits']:>7}{m['weighted_kits']:>9.0f}{m['unlocks']:>8.0f}  "
+              f"{m['status']:<15} {m['description'][:40]}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,216 @@
+"""
+CQT Light V3 - Conductor Optimizer
+Chooses a conductor per segment of a radial secondary network that minimizes
+material cost while keeping every node within the voltage-drop limit.
+
+Candidates are the multiplexed conductors of calculation_logic.json that map
+to a cable of technical_data.json (R/X) and to a SAP code in the materiais
+table (price per metre). The search is a tree dynamic program over a
+discretized drop budget:
+
+    F(v, b) = min over c of  price(c) * length(v) + sum F(child, b - drop(v, c))
+
+with candidates pruned per segment by ampacity (through current) and by
+dominance (never cheaper and never lower drop). Drops are rounded up to the
+budget grid, so every returned solution meets the limit exactly.
+
+The limit is the secondary_network drop of calculation_logic.json. The
+service_drop limit (1.5%) is out of scope here: it applies to the ramal from
+the pole to each consumer, a separate conductor that does not share this
+budget and is checked by service_drop.check_service_drops.
+
+Without a price for every candidate the search refuses to run; --relative-cost
+uses ampacity as the cost instead, which only finds the thinnest feasible
+cables, not the cheapest.
+
+Usage:
+    python conductor_optimizer.py [--relative-cost]
+"""
+
+import argparse
+import json
+import sqlite3
+import time
+from pathlib import Path
+
+import numpy as np
+
+from network_solver import RadialNetwork, solve_network
+from qdt_engine import (DEFAULT_VOLTAGE, base_current_kva, drop_coefficient,
+                        load_cable_table, phase_factor)
+
+BASE_DIR = Path(__file__).parent.parent
+DATA_DIR = BASE_DIR / "data"
+DB_PATH = BASE_DIR / "frontend" / "cqt_light.db"
+RULES_PATH = DATA_DIR / "rules" / "calculation_logic.json"
+
+# Budget grid: the drop limit is split into this many steps
+DEFAULT_BUDGET_STEPS = 250
+
+
+def load_candidates(rules_path=RULES_PATH, db_path=DB_PATH, prices=None, relative_cost=False):
+    """
+    Conductor candidates: [{name, cable, sap, ampacity, price}].
+    `prices` ({sap: price per metre}) overrides the materiais table. A
+    candidate without a price raises ValueError unless `relative_cost`, which
+    uses ampacity as the cost instead.
+    """
+    with open(rules_path, "r", encoding="utf-8") as f:
+        rules = json.load(f)
+    table = load_cable_table()
+    candidates = [
+        {"name": c["name"], "cable": c["cable"], "sap": c.get("sap"), "ampacity": c["capacity_a"]}
+        for c in rules["bt_conductors_multiplexed"]
+        if c.get("cable") in table.index
+    ]
+
+    prices = dict(prices or {})
+    missing = [c["sap"] for c in candidates if c["sap"] not in prices]
+    if missing and Path(db_path).is_file():
+        conn = sqlite3.connect(f"{Path(db_path).resolve().as_uri()}?mode=ro", uri=True)
+        placeholders = ",".join("?" * len(missing))
+        try:
+            for sap, price in conn.execute(
+                f"SELECT sap, preco_unitario FROM materiais WHERE sap IN ({placeholders})", missing
+            ):
+                if price:
+                    prices[sap] = price
+        except sqlite3.Error as e:
+            print(f"⚠️ Could not read prices from {db_path}: {e}")
+        finally:
+            conn.close()
+    elif missing:
+        print(f"⚠️ Price database not found: {db_path}")
+
+    unpriced = [c["name"] for c in candidates if c["sap"] not in prices]
+    if not unpriced:
+        for c in candidates:
+            c["price"] = float(prices[c["sap"]])
+    elif relative_cost:
+        print("⚠️ Conductor prices not found; using ampacity as relative cost")
+        for c in candidates:
+            c["price"] = float(c["ampacity"])
+    else:
+        raise ValueError(f"No price for conductor(s) {', '.join(unpriced)}")
+    return candidates
+
+
+def drop_limit_pct(rules_path=RULES_PATH):
+    """Secondary network drop limit (%); service drops have their own (see above)."""
+    with open(rules_path, "r", encoding="utf-8") as f:
+        return json.load(f)["voltage_drop_limits"]["secondary_network"] * 100
+
+
+def optimize_conductors(network, loads, length, candidates, drop_limit, phases=3,
+                        voltage=DEFAULT_VOLTAGE, budget_steps=DEFAULT_BUDGET_STEPS):
+    """
+    Cost-optimal conductor per segment.
+
+    Returns {choice (candidate index per segment, -1 if infeasible), cost,
+    feasible, pruned (candidate options removed before the search)}.
+    """
+    table = load_cable_table()
+    n = len(network)
+    k = len(candidates)
+    length = np.broadcast_to(np.asarray(length, dtype=float), (n,))
+    phases = np.broadcast_to(np.asarray(phases), (n,))
+
+    through = network.accumulate(np.broadcast_to(np.asarray(loads, dtype=float), (n,)))
+    current = through / base_current_kva(phases, voltage)
+    cable_idx = table.lookup([c["cable"] for c in candidates])
+    ampacity = np.array([c["ampacity"] for c in candidates], dtype=float)
+    price = np.array([c["price"] for c in candidates], dtype=float)
+
+    # Segment x candidate cost, drop (in budget steps) and admissibility
+    step = drop_limit / budget_steps
+    per_kva = drop_coefficient(table, cable_idx, voltage)[None, :] * (length * phase_factor(phases))[:, None]
+    steps = np.ceil(through[:, None] * per_kva / step - 1e-9).astype(np.int64)
+    cost = price[None, :] * length[:, None]
+    allowed = (ampacity[None, :] >= current[:, None]) & (steps <= budget_steps)
+    # Dominance: drop a candidate if another is no dearer and no worse on drop
+    for a in range(k):
+        for b in range(k):
+            if a != b:
+                dominated = (allowed[:, b] & (cost[:, b] <= cost[:, a]) & (steps[:, b] <= steps[:, a])
+                             & ((cost[:, b] < cost[:, a]) | (steps[:, b] < steps[:, a]) | (b < a)))
+                allowed[:, a] &= ~dominated
+    pruned = int(n * k - allowed.sum())
+
+    # Post-order DP; choice[v, b] is the best candidate with budget b left above v
+    size = budget_steps + 1
+    children_cost = np.zeros((n, size))
+    choice = np.full((n, size), -1, dtype=np.int8)
+    root_cost = {}
+    for v in network.order[::-1]:
+        best = np.full(size, np.inf)
+        for c in np.flatnonzero(allowed[v]):
+            s = steps[v, c]
+            option = np.full(size, np.inf)
+            option[s:] = cost[v, c] + children_cost[v, :size - s]
+            better = option < best
+            best[better] = option[better]
+            choice[v, better] = c
+        parent = network.parent[v]
+        if parent >= 0:
+            children_cost[parent] += best
+        else:
+            root_cost[v] = best[budget_steps]
+
+    # Top-down reconstruction from each root with the full budget
+    picked = np.full(n, -1, dtype=np.intp)
+    remaining = np.full(n, budget_steps, dtype=np.int64)
+    feasible = all(np.isfinite(c) for c in root_cost.values())
+    if feasible:
+        for v in network.order:
+            parent = network.parent[v]
+            budget = budget_steps if parent < 0 else remaining[parent]
+            c = choice[v, budget]
+            picked[v] = c
+            remaining[v] = budget - steps[v, c]
+    total = float(cost[np.arange(n), picked].sum()) if feasible else float("inf")
+    return {"choice": picked, "cost": total, "feasible": feasible, "pruned": pruned}
+
+
+def main():
+    """Optimize a synthetic feeder and compare with the all-largest design."""
+    parser = argparse.ArgumentParser(description="Cost-optimal conductor selection")
+    parser.add_argument("--relative-cost", action="store_true",
+                        help="Use ampacity as the cost when conductor prices are missing")
+    args = parser.parse_args()
+
+    print("=" * 60)
+    print("🧮 CQT Light V3 - Conductor Optimizer")
+    print("=" * 60)
+
+    try:
+        candidates = load_candidates(relative_cost=args.relative_cost)
+    except ValueError as e:
+        print(f"❌ {e} (seed the materiais table, or run with --relative-cost)")
+        return
+    limit = drop_limit_pct()
+    for c in candidates:
+        print(f"   {c['name']:<12} {c['cable']:<8} SAP {c['sap']}  {c['ampacity']} A  {c['price']:.2f}/m")
+
+    rng = np.random.default_rng(0)
+    for n in (30, 3_000, 30_000):
+        network = RadialNetwork(np.where(np.arange(n) > 0, (np.arange(n) - 1) // 3, -1))
+        loads = rng.uniform(0, 220 / n, n)
+        length = rng.uniform(15, 35, n)
+
+        start = time.perf_counter()
+        result = optimize_conductors(network, loads, length, candidates, limit)
+        elapsed = time.perf_counter() - start
+        if not result["feasible"]:
+            print(f"⚠️ {n:,} segments: no assignment meets {limit:.1f}%")
+            continue
+        cables = [candidates[c]["cable"] for c in result["choice"]]
+        check = solve_network(network, loads, cables, length)
+        largest = max(range(len(candidates)), key=lambda c: candidates[c]["ampacity"])
+        baseline = candidates[largest]["price"] * length.sum()
+        print(f"📊 {n:>6,} segments: cost {result['cost']:,.0f} vs {baseline:,.0f} all-"
+              f"{candidates[largest]['cable']}, max drop {check['max_drop']:.2f}%, "
+              f"{result['pruned']:,} options pruned, {elapsed * 1000:.0f} ms")
+
+
+if __name__ == "__main__":
+    main()
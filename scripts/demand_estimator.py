@@ -0,0 +1,173 @@
+"""
+CQT Light V3 - Consumer Demand Estimator
+Per-trecho demand with diversity, from individual consumers.
+
+Each consumer has the trecho (node) it hangs off, a category and optionally a
+built area. Installed load is area x va_per_m2 (default_consumption in
+calculation_logic.json; residential consumers without an area get the
+default 70 m²). Consumer counts and installed kVA are bincounted per
+(node, category) and accumulated downstream over the network.
+
+Diversity comes from one of two sources, and there is no built-in default:
+
+    fdiv              the sheet's FDIV (column G), one value for the circuit
+                      or one per trecho; demand = E x G
+    demand_diversity  the utility's coincidence table in
+                      calculation_logic.json ({category: {"consumers": [...],
+                      "factor": [...]}}), interpolated on each category's
+                      downstream consumer count
+
+Without either, estimate_demand() raises instead of guessing a curve.
+
+The result is the QDT load inputs per trecho:
+
+    consumers  D  consumers at or beyond the end of the trecho
+    kva        E  installed kVA at or beyond the end of the trecho
+    fdiv       G  effective diversity factor, so that E x G is the demand
+
+so compute_qdt(r["consumers"], r["kva"], r["fdiv"], ...) and
+solve_network(network, r["demand"], ...) take them directly.
+"""
+
+import argparse
+import json
+import time
+from functools import lru_cache
+from pathlib import Path
+
+import numpy as np
+
+from network_solver import RadialNetwork, random_feeder
+
+BASE_DIR = Path(__file__).parent.parent
+DATA_DIR = BASE_DIR / "data"
+RULES_PATH = DATA_DIR / "rules" / "calculation_logic.json"
+
+CATEGORIES = ("residential", "non_residential")
+
+
+@lru_cache(maxsize=None)
+def load_demand_rules(path=RULES_PATH):
+    """Default areas, VA/m² and diversity tables per consumer category."""
+    with open(path, "r", encoding="utf-8") as f:
+        rules = json.load(f)
+    consumption = rules["default_consumption"]
+    diversity = rules.get("demand_diversity")
+    return {
+        "area": np.array([consumption[c].get("area_m2", np.nan) for c in CATEGORIES], dtype=float),
+        "va_per_m2": np.array([consumption[c]["va_per_m2"] for c in CATEGORIES], dtype=float),
+        "diversity": None if diversity is None else [
+            (np.array(diversity[c]["consumers"], dtype=float), np.array(diversity[c]["factor"], dtype=float))
+            for c in CATEGORIES],
+    }
+
+
+def diversity_factor(consumers, category=0, rules=None):
+    """Diversity factor for consumer counts of one category (flat beyond the table)."""
+    rules = rules or load_demand_rules()
+    if rules["diversity"] is None:
+        raise ValueError("calculation_logic.json has no demand_diversity table; add the utility's "
+                         "coincidence table or pass the sheet's FDIV (column G) as fdiv")
+    counts, factors = rules["diversity"][category]
+    return np.interp(np.asarray(consumers, dtype=float), counts, factors)
+
+
+def installed_kva(category, area=None, rules=None):
+    """Installed load (kVA) per consumer; a missing area takes the category default."""
+    rules = rules or load_demand_rules()
+    category = np.asarray(category, dtype=np.intp)
+    area = rules["area"][category] if area is None else np.asarray(area, dtype=float)
+    area = np.where(np.isnan(area), rules["area"][category], area)
+    kva = area * rules["va_per_m2"][category] / 1000
+    if np.isnan(kva).any():
+        raise ValueError(f"{np.isnan(kva).sum()} consumers without an area and no default for their category")
+    return kva
+
+
+def estimate_demand(node, category=0, area=None, network=None, n_nodes=None, fdiv=None, rules=None):
+    """
+    Per-trecho QDT load inputs from consumer arrays.
+
+    `node` is the trecho each consumer hangs off; `category` indexes
+    CATEGORIES; `network` defaults to a single chain of trechos in QDT order
+    (transformer outwards). `fdiv` is the sheet's FDIV (scalar or per
+    trecho); when omitted the demand_diversity table is required. Returns a
+    dict of (n,) arrays: consumers (D), kva (E), fdiv (G) and demand (E x G, kVA).
+    """
+    rules = rules or load_demand_rules()
+    node = np.asarray(node, dtype=np.intp)
+    category = np.broadcast_to(np.asarray(category, dtype=np.intp), node.shape)
+    if network is None:
+        n = int(n_nodes if n_nodes is not None else (node.max() + 1 if node.size else 0))
+        network = RadialNetwork(np.arange(n) - 1)
+    n, k = len(network), len(CATEGORIES)
+
+    cell = node * k + category
+    counts = np.bincount(cell, minlength=n * k).reshape(n, k)
+    kva = np.bincount(cell, weights=installed_kva(category, area, rules), minlength=n * k).reshape(n, k)
+
+    downstream = network.accumulate(np.hstack([counts, kva]).astype(float))
+    counts, kva = downstream[:, :k], downstream[:, k:]
+    total = kva.sum(axis=1)
+    if fdiv is not None:
+        fdiv = np.broadcast_to(np.asarray(fdiv, dtype=float), (n,)).copy()
+        demand = total * fdiv
+    else:
+        demand = sum(kva[:, c] * diversity_factor(counts[:, c], c, rules) for c in range(k))
+        fdiv = np.divide(demand, total, out=np.ones(n), where=total > 0)
+
+    return {
+        "consumers": counts.sum(axis=1).astype(np.int64),
+        "kva": total,
+        "fdiv": fdiv,
+        "demand": demand,
+    }
+
+
+def main():
+    """Demand on a small circuit and timing for a large consumer base."""
+    parser = argparse.ArgumentParser(description="Consumer demand estimator")
+    parser.add_argument("--fdiv", type=float, default=None,
+                        help="Sheet FDIV (column G) to use instead of the demand_diversity table")
+    args = parser.parse_args()
+
+    print("=" * 60)
+    print("🏘️ CQT Light V3 - Consumer Demand Estimator")
+    print("=" * 60)
+
+    rules = load_demand_rules()
+    fdiv = args.fdiv
+    if fdiv is None and rules["diversity"] is None:
+        print("⚠️ No demand_diversity table in calculation_logic.json and no --fdiv given")
+        return
+    if fdiv is None:
+        counts = [1, 2, 5, 10, 20, 50]
+        print("Diversity (residential): " + ", ".join(
+            f"{n}: {f:.2f}" for n, f in zip(counts, diversity_factor(counts, 0, rules))))
+    else:
+        print(f"FDIV (column G): {fdiv}")
+
+    node = [0, 0, 1, 1, 1, 2, 2, 3, 3, 3, 3, 4]
+    category = [0, 0, 0, 0, 1, 0, 0, 0, 0, 0, 0, 1]
+    area = [None, 90, None, None, 250, None, 120, None, None, None, None, 400]
+    result = estimate_demand(node, category, [np.nan if a is None else a for a in area], fdiv=fdiv, rules=rules)
+    print(f"\n{'Trecho':<8}{'D':>5}{'E kVA':>9}{'G':>7}{'Demanda kVA':>13}")
+    for i in range(len(result["kva"])):
+        print(f"P-{i + 1:<6}{result['consumers'][i]:>5}{result['kva'][i]:>9.2f}"
+              f"{result['fdiv'][i]:>7.3f}{result['demand'][i]:>13.2f}")
+
+    rng = np.random.default_rng(0)
+    n_nodes, n_consumers = 100_000, 2_000_000
+    feeder = random_feeder(n_nodes, rng)
+    node = rng.integers(0, n_nodes, n_consumers)
+    category = (rng.random(n_consumers) < 0.1).astype(np.intp)
+    area = np.where((category == 0) & (rng.random(n_consumers) < 0.5), np.nan, rng.uniform(40, 300, n_consumers))
+    start = time.perf_counter()
+    big = estimate_demand(node, category, area, network=feeder, fdiv=fdiv, rules=rules)
+    elapsed = time.perf_counter() - start
+    print(f"\n📊 {n_consumers:,} consumers on {n_nodes:,} trechos in {elapsed * 1000:.0f} ms, "
+          f"transformer demand {big['demand'][feeder.parent < 0].sum():,.0f} kVA")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,8 +1,9 @@
-import pypdf
 import re
 import json
 import os
 
+from pdf_pages import extract_pages
+
 def extract_from_pdf():
     pdf_path = r'c:\myworld\cqt_light\Padrões\Padrões\Padrão RCSN\Padrão Rede RCSN - REVISÃO 04 - 2016.pdf'
     output_path = r'c:\myworld\cqt_light\data\standards\pdf_extracted.json'
@@ -12,8 +13,10 @@ def extract_from_pdf():
         return
 
     print(f"Processing {pdf_path}...")
-    reader = pypdf.PdfReader(pdf_path)
-    print(f"Pages: {len(reader.pages)}")
+    pages = extract_pages([pdf_path]).get(pdf_path)
+    if pages is None:
+        return
+    print(f"Pages: {len(pages)}")
     
     extracted_items = []
     
@@ -23,8 +26,7 @@ def extract_from_pdf():
     # We will look for lines containing a 6-digit number.
     sap_pattern = re.compile(r'\b\d{6}\b')
     
-    for i, page in enumerate(reader.pages):
-        text = page.extract_text()
+    for i, text in enumerate(pages):
         if not text: continue
         
         lines = text.split('\n')
@@ -1,6 +1,7 @@
-import pypdf
 import os
-import re
+
+from pdf_pages import document_text, extract_pages
+from standards_parameters import parse_parameters
 
 def extract_standards():
     base_dir = r'c:\myworld\cqt_light\Padrões'
@@ -25,21 +26,17 @@ def extract_standards():
     
     keywords = ['VÃO', 'TRAÇÃO', 'POTÊNCIA', 'AFASTAMENTO', 'CARGA', 'TENSÃO', 'CABO']
     
+    # Page texts come from the page cache; only new or changed PDFs are read
+    pages = extract_pages(files_to_scan)
+    
     for full_path in files_to_scan:
         print(f"\n--- Scanning {os.path.basename(full_path)} ---")
         
-        # if not os.path.exists(full_path): ... (Redundant now since we found it)
+        if full_path not in pages:
+            continue
             
         try:
-            reader = pypdf.PdfReader(full_path)
-            text_content = ""
-            for i, page in enumerate(reader.pages):
-                try:
-                    text = page.extract_text()
-                    if text:
-                        text_content += text + "\n"
-                except Exception as page_e:
-                    print(f"  Error on page {i}: {page_e}")
+            text_content = document_text(pages[full_path])
             
             print(f"Extracted {len(text_content)} characters.")
             if len(text_content) < 100:
@@ -64,24 +61,12 @@ def extract_standards():
                         if len(context) > 20: 
                              print(f"  [KEYWORD {key}]: {context}")
             
-            # Specific logic extraction attempts using Regex
-            
-            # Max Span (Vão Máximo)
-            # Pattern: "Vão" ... number ... "m"
-            spans = re.findall(r'VÃO.*?(\d{2,3}).*?m', text_content, re.IGNORECASE)
-            if spans:
-                print(f"  Potential Max Spans found: {spans[:5]}...")
-                
-            # Transformer kVA
-            kvas = re.findall(r'(\d{2,3})[ ]?kVA', text_content, re.IGNORECASE)
-            if kvas:
-                unique_kvas = sorted(list(set(kvas)), key=lambda x: int(x))
-                print(f"  Transformer ratings found: {unique_kvas}")
-                
-            # Voltage
-            voltages = re.findall(r'(\d{2})[.,]?(\d{1})?[ ]?kV', text_content, re.IGNORECASE)
-            if voltages:
-                print(f"  Voltages found: {voltages[:5]}...")
+            # Typed parameters (span, kVA, kV, ...), same patterns as standards_parameters.py
+            found = {}
+            for name, value, unit, page, _ in parse_parameters(pages[full_path]):
+                found.setdefault((name, unit), set()).add(value)
+            for (name, unit), values in found.items():
+                print(f"  {name} ({unit}): {sorted(values)[:10]}")
 
         except Exception as e:
             print(f"Error reading PDF: {e}")
@@ -0,0 +1,948 @@
+"""
+CQT Light V3 - Excel Formula Compiler
+Recalculates the QDT / CM workbooks headlessly.
+
+Formulas are parsed (the subset these sheets use: arithmetic, comparisons,
+&, IF/AND/OR/IFERROR, SUM/MAX/MIN, lookups, IM* complex functions, cell,
+range and cross-sheet references) and compiled to Python callables. Each
+formula is first normalized to relative (R1C1-style) form, so a formula filled
+down 20 rows compiles once and is shared by every row.
+
+A Workbook is a cell store: values and compiled formulas keyed by
+(sheet, row, col). calculate() sets inputs, clears the memo and evaluates the
+requested outputs, which is what bulk input-variant runs need.
+
+Usage:
+    python formula_compiler.py [workbook.xlsx|xlsm]
+"""
+
+import cmath
+import json
+import math
+import re
+import sys
+import time
+from functools import lru_cache
+from pathlib import Path
+
+BASE_DIR = Path(__file__).parent.parent
+DATA_DIR = BASE_DIR / "data"
+QDT_LOGIC_PATH = DATA_DIR / "qdt_deep_logic.json"
+WORKFLOW_PATH = DATA_DIR / "workflow_research.json"
+
+
+# ========== ERRORS AND ADDRESSES ==========
+
+class ExcelError:
+    """An Excel error value (#VALUE!, #DIV/0!, #N/A, #NAME?, #NUM!, #REF!)."""
+
+    __slots__ = ("code",)
+
+    def __init__(self, code):
+        self.code = code
+
+    def __eq__(self, other):
+        return isinstance(other, ExcelError) and other.code == self.code
+
+    def __hash__(self):
+        return hash(self.code)
+
+    def __repr__(self):
+        return self.code
+
+
+class FormulaError(Exception):
+    """Raised while evaluating; carries the Excel error code."""
+
+    def __init__(self, code):
+        super().__init__(code)
+        self.code = code
+
+
+class CircularReference(ValueError):
+    pass
+
+
+def col_index(letters):
+    """'A' -> 1, 'AB' -> 28."""
+    n = 0
+    for ch in letters.upper():
+        n = n * 26 + ord(ch) - 64
+    return n
+
+
+def col_letters(index):
+    """28 -> 'AB'."""
+    out = ""
+    while index:
+        index, rem = divmod(index - 1, 26)
+        out = chr(65 + rem) + out
+    return out
+
+
+_ADDRESS = re.compile(r"^(?:(?:'((?:[^']|'')+)'|([^!]+))!)?\$?([A-Za-z]{1,3})\$?(\d+)$")
+
+
+def parse_address(address, default_sheet=None):
+    """'Sheet'!B7 / Sheet!B7 / B7 -> (sheet, row, col)."""
+    m = _ADDRESS.match(address.strip())
+    if not m:
+        raise ValueError(f"Invalid cell address: {address}")
+    sheet = m.group(1).replace("''", "'") if m.group(1) else (m.group(2) or default_sheet)
+    return sheet, int(m.group(4)), col_index(m.group(3))
+
+
+# ========== TOKENIZER ==========
+
+_SHEET = r"(?:'(?:[^']|'')+'|[A-Za-z_À-ſ][\w\.À-ſ]*)!"
+_CELL = r"\$?[A-Za-z]{1,3}\$?\d+"
+_TOKEN = re.compile(
+    r"\s*(?:"
+    r"(?P<str>\"(?:[^\"]|\"\")*\")"
+    rf"|(?P<ref>(?:{_SHEET})?{_CELL}(?::{_CELL})?)(?![\w(])"
+    r"|(?P<num>(?:\d+\.?\d*|\.\d+)(?:[eE][+-]?\d+)?)"
+    r"|(?P<err>#(?:DIV/0!|N/A|NAME\?|NULL!|NUM!|REF!|VALUE!))"
+    r"|(?P<func>[A-Za-z_][\w\.]*)(?=\s*\()"
+    r"|(?P<bool>TRUE|FALSE)(?![\w(])"
+    r"|(?P<op><=|>=|<>|[-+*/^&=<>%(),;])"
+    r")"
+)
+_REF_PARTS = re.compile(rf"^(?:({_SHEET}))?(\$?)([A-Za-z]{{1,3}})(\$?)(\d+)(?::(\$?)([A-Za-z]{{1,3}})(\$?)(\d+))?$")
+
+
+def tokenize(formula):
+    text = formula[1:] if formula.startswith("=") else formula
+    pos, tokens = 0, []
+    while pos < len(text):
+        if text[pos:].strip() == "":
+            break
+        m = _TOKEN.match(text, pos)
+        if not m or m.end() == pos:
+            raise SyntaxError(f"Cannot parse formula at {text[pos:pos + 20]!r}: {formula}")
+        kind = m.lastgroup
+        value = m.group(kind)
+        if kind == "op" and value == ";":
+            value = ","
+        tokens.append((kind, value))
+        pos = m.end()
+    return tokens
+
+
+def _parse_ref(text):
+    m = _REF_PARTS.match(text)
+    sheet = m.group(1)
+    if sheet:
+        sheet = sheet[:-1]
+        if sheet.startswith("'"):
+            sheet = sheet[1:-1].replace("''", "'")
+    first = (int(m.group(5)), col_index(m.group(3)), bool(m.group(4)), bool(m.group(2)))
+    if m.group(7) is None:
+        return ("ref", sheet, first)
+    second = (int(m.group(9)), col_index(m.group(7)), bool(m.group(8)), bool(m.group(6)))
+    return ("range", sheet, first, second)
+
+
+# ========== PARSER (AST as tuples) ==========
+
+class _Parser:
+    COMPARE = {"=", "<>", "<", ">", "<=", ">="}
+
+    def __init__(self, tokens, formula):
+        self.tokens = tokens
+        self.i = 0
+        self.formula = formula
+
+    def peek(self):
+        return self.tokens[self.i] if self.i < len(self.tokens) else (None, None)
+
+    def take(self, value=None):
+        kind, tok = self.peek()
+        if value is not None and tok != value:
+            raise SyntaxError(f"Expected {value!r}, got {tok!r} in {self.formula}")
+        self.i += 1
+        return kind, tok
+
+    def parse(self):
+        node = self.compare()
+        if self.i != len(self.tokens):
+            raise SyntaxError(f"Unexpected {self.peek()[1]!r} in {self.formula}")
+        return node
+
+    def _binary(self, operand, ops):
+        node = operand()
+        while self.peek()[0] == "op" and self.peek()[1] in ops:
+            op = self.take()[1]
+            node = ("bin", op, node, operand())
+        return node
+
+    def compare(self):
+        return self._binary(self.concat, self.COMPARE)
+
+    def concat(self):
+        return self._binary(self.additive, {"&"})
+
+    def additive(self):
+        return self._binary(self.multiplicative, {"+", "-"})
+
+    def multiplicative(self):
+        return self._binary(self.power, {"*", "/"})
+
+    def power(self):
+        return self._binary(self.unary, {"^"})
+
+    def unary(self):
+        kind, tok = self.peek()
+        if kind == "op" and tok in ("-", "+"):
+            self.take()
+            operand = self.unary()
+            return ("neg", operand) if tok == "-" else ("pos", operand)
+        return self.percent()
+
+    def percent(self):
+        node = self.primary()
+        while self.peek() == ("op", "%"):
+            self.take()
+            node = ("pct", node)
+        return node
+
+    def primary(self):
+        kind, tok = self.take()
+        if kind == "num":
+            return ("num", float(tok))
+        if kind == "str":
+            return ("str", tok[1:-1].replace('""', '"'))
+        if kind == "bool":
+            return ("bool", tok == "TRUE")
+        if kind == "err":
+            return ("err", tok)
+        if kind == "ref":
+            return _parse_ref(tok)
+        if kind == "func":
+            name = tok.upper()
+            self.take("(")
+            args = []
+            if self.peek() != ("op", ")"):
+                while True:
+                    if self.peek() in (("op", ","), ("op", ")")):
+                        args.append(("empty",))
+                    else:
+                        args.append(self.compare())
+                    if self.peek() == ("op", ","):
+                        self.take()
+                        continue
+                    break
+            self.take(")")
+            return ("call", name, args)
+        if (kind, tok) == ("op", "("):
+            node = self.compare()
+            self.take(")")
+            return node
+        raise SyntaxError(f"Unexpected {tok!r} in {self.formula}")
+
+
+def parse(formula):
+    return _Parser(tokenize(formula), formula).parse()
+
+
+# ========== NORMALIZATION (relative form) ==========
+
+def _normalize_point(point, row, col):
+    r, c, r_abs, c_abs = point
+    return (r if r_abs else r - row, c if c_abs else c - col, r_abs, c_abs)
+
+
+def normalize(node, row, col):
+    """Rewrite relative references as offsets from the host cell."""
+    kind = node[0]
+    if kind == "ref":
+        return ("ref", node[1], _normalize_point(node[2], row, col))
+    if kind == "range":
+        return ("range", node[1], _normalize_point(node[2], row, col), _normalize_point(node[3], row, col))
+    if kind in ("neg", "pos", "pct"):
+        return (kind, normalize(node[1], row, col))
+    if kind == "bin":
+        return ("bin", node[1], normalize(node[2], row, col), normalize(node[3], row, col))
+    if kind == "call":
+        return ("call", node[1], tuple(normalize(a, row, col) for a in node[2]))
+    return node
+
+
+# ========== RUNTIME HELPERS ==========
+
+def _raise_if_error(v):
+    if isinstance(v, ExcelError):
+        raise FormulaError(v.code)
+    return v
+
+
+def _scalar(v):
+    """A range used as a single value: its only cell, else #VALUE!."""
+    if isinstance(v, Range):
+        if len(v.rows) == 1 and len(v.rows[0]) == 1:
+            return v.rows[0][0]
+        raise FormulaError("#VALUE!")
+    return v
+
+
+def to_number(v):
+    v = _scalar(v)
+    if v is None:
+        return 0.0
+    if isinstance(v, bool):
+        return 1.0 if v else 0.0
+    if isinstance(v, (int, float)):
+        return v
+    if isinstance(v, ExcelError):
+        raise FormulaError(v.code)
+    try:
+        return float(str(v).strip().replace(",", "."))
+    except ValueError:
+        raise FormulaError("#VALUE!") from None
+
+
+def to_text(v):
+    v = _raise_if_error(_scalar(v))
+    if v is None:
+        return ""
+    if isinstance(v, bool):
+        return "TRUE" if v else "FALSE"
+    if isinstance(v, float):
+        return str(int(v)) if v.is_integer() else f"{v:.15g}"
+    return str(v)
+
+
+def to_bool(v):
+    v = _raise_if_error(_scalar(v))
+    if v is None:
+        return False
+    if isinstance(v, str):
+        if v.upper() in ("TRUE", "FALSE"):
+            return v.upper() == "TRUE"
+        raise FormulaError("#VALUE!")
+    return bool(to_number(v))
+
+
+def _rank(v):
+    if isinstance(v, bool):
+        return 2
+    if isinstance(v, str):
+        return 1
+    return 0
+
+
+def compare(op, a, b):
+    """Excel comparison: blanks match "" / 0 / FALSE; numbers < text < booleans."""
+    a = _raise_if_error(_scalar(a))
+    b = _raise_if_error(_scalar(b))
+    if a is None:
+        a = "" if isinstance(b, str) else (False if isinstance(b, bool) else 0.0)
+    if b is None:
+        b = "" if isinstance(a, str) else (False if isinstance(a, bool) else 0.0)
+    ra, rb = _rank(a), _rank(b)
+    if ra != rb:
+        a, b = ra, rb
+    elif ra == 1:
+        a, b = a.lower(), b.lower()
+    if op == "=":
+        return a == b
+    if op == "<>":
+        return a != b
+    if op == "<":
+        return a < b
+    if op == ">":
+        return a > b
+    if op == "<=":
+        return a <= b
+    return a >= b
+
+
+def arith(op, a, b):
+    x, y = to_number(a), to_number(b)
+    if op == "+":
+        return x + y
+    if op == "-":
+        return x - y
+    if op == "*":
+        return x * y
+    if op == "/":
+        if y == 0:
+            raise FormulaError("#DIV/0!")
+        return x / y
+    try:
+        result = x ** y
+    except (OverflowError, ZeroDivisionError):
+        raise FormulaError("#NUM!") from None
+    if isinstance(result, complex):
+        raise FormulaError("#NUM!")
+    return result
+
+
+def concat(a, b):
+    return to_text(a) + to_text(b)
+
+
+def flatten(args):
+    for a in args:
+        if isinstance(a, Range):
+            yield from a.values()
+        else:
+            yield a
+
+
+class Range:
+    """2-D block of cell values passed to functions."""
+
+    __slots__ = ("rows",)
+
+    def __init__(self, rows):
+        self.rows = rows
+
+    def values(self):
+        for row in self.rows:
+            yield from row
+
+    def column(self, index):
+        return [row[index] for row in self.rows]
+
+
+# ========== COMPLEX NUMBERS (IM* functions) ==========
+
+# Sign that starts the imaginary part of "a+bi" (not the one of an exponent)
+_IMAG_SIGN = re.compile(r"(?<=[\d.])[+-]")
+
+
+def _complex_part(text, unit):
+    if text in ("", "+", "-") and unit:
+        return -1.0 if text == "-" else 1.0
+    try:
+        return float(text)
+    except ValueError:
+        raise FormulaError("#NUM!") from None
+
+
+def to_complex(v):
+    if isinstance(v, complex):
+        return v
+    if v is None:
+        return 0j
+    if isinstance(v, (int, float)) and not isinstance(v, bool):
+        return complex(v, 0)
+    if isinstance(v, ExcelError):
+        raise FormulaError(v.code)
+    text = to_text(v).strip().replace(" ", "")
+    if not text:
+        raise FormulaError("#NUM!")
+    if text[-1] not in "ij":
+        return complex(_complex_part(text, False), 0)
+    body = text[:-1]
+    split = [m.start() for m in _IMAG_SIGN.finditer(body)]
+    k = split[-1] if split else 0
+    real = _complex_part(body[:k], False) if k else 0.0
+    return complex(real, _complex_part(body[k:], True))
+
+
+def format_complex(z, suffix="i"):
+    """Excel's text form of a complex number: '3+4i', '-i', '2'."""
+    def fmt(x):
+        return str(int(x)) if float(x).is_integer() else f"{x:.15g}"
+    if z.imag == 0:
+        return fmt(z.real)
+    imag = "" if abs(z.imag) == 1 else fmt(abs(z.imag))
+    sign = "-" if z.imag < 0 else "+"
+    if z.real == 0:
+        return f"{'-' if z.imag < 0 else ''}{imag}{suffix}"
+    return f"{fmt(z.real)}{sign}{imag}{suffix}"
+
+
+# ========== FUNCTIONS ==========
+
+def _numbers(args):
+    """Numeric arguments the way SUM/MAX/MIN read them (text and blanks in ranges skipped)."""
+    out = []
+    for a in args:
+        if isinstance(a, Range):
+            for v in a.values():
+                _raise_if_error(v)
+                if isinstance(v, (int, float)) and not isinstance(v, bool):
+                    out.append(v)
+        else:
+            out.append(to_number(a))
+    return out
+
+
+def _lookup_match(value, candidates, approximate):
+    """Index of the match in candidates (exact, or last <= value when sorted)."""
+    _raise_if_error(value)
+    if not approximate:
+        for i, c in enumerate(candidates):
+            if c is not None and compare("=", c, value):
+                return i
+        raise FormulaError("#N/A")
+    best = None
+    for i, c in enumerate(candidates):
+        if c is None or _rank(c) != _rank(value):
+            continue
+        if compare("<=", c, value):
+            best = i
+        else:
+            break
+    if best is None:
+        raise FormulaError("#N/A")
+    return best
+
+
+def fn_vlookup(value, table, col, approximate=True):
+    col = int(to_number(col))
+    if col < 1 or col > len(table.rows[0]):
+        raise FormulaError("#REF!")
+    i = _lookup_match(value, table.column(0), to_bool(approximate))
+    return table.rows[i][col - 1]
+
+
+def fn_hlookup(value, table, row, approximate=True):
+    row = int(to_number(row))
+    if row < 1 or row > len(table.rows):
+        raise FormulaError("#REF!")
+    i = _lookup_match(value, table.rows[0], to_bool(approximate))
+    return table.rows[row - 1][i]
+
+
+def fn_match(value, lookup, match_type=1):
+    cells = list(lookup.values())
+    match_type = int(to_number(match_type))
+    return float(_lookup_match(value, cells, match_type != 0) + 1)
+
+
+def fn_index(table, row, col=None):
+    r = int(to_number(row))
+    c = int(to_number(col)) if col is not None else 1
+    if len(table.rows) == 1 and col is None:
+        r, c = 1, r
+    if r < 1 or c < 1:
+        raise FormulaError("#VALUE!")
+    try:
+        return table.rows[r - 1][c - 1]
+    except IndexError:
+        raise FormulaError("#REF!") from None
+
+
+def fn_round(x, digits=0, mode="half"):
+    x, d = to_number(x), int(to_number(digits))
+    factor = 10.0 ** d
+    # Excel works to 15 significant digits, so 0.1*3*10 is 3, not 3.0000000000000004
+    scaled = float(f"{abs(x) * factor:.15g}")
+    if mode == "up":
+        r = math.ceil(scaled)
+    elif mode == "down":
+        r = math.floor(scaled)
+    else:
+        r = math.floor(scaled + 0.5)
+    return math.copysign(r / factor, x)
+
+
+def fn_sqrt(x):
+    x = to_number(x)
+    if x < 0:
+        raise FormulaError("#NUM!")
+    return math.sqrt(x)
+
+
+def fn_average(*args):
+    nums = _numbers(args)
+    if not nums:
+        raise FormulaError("#DIV/0!")
+    return sum(nums) / len(nums)
+
+
+def fn_complex(re_, im, suffix="i"):
+    suffix = to_text(suffix) or "i"
+    if suffix not in ("i", "j"):
+        raise FormulaError("#VALUE!")
+    return format_complex(complex(to_number(re_), to_number(im)), suffix)
+
+
+def fn_imdiv(a, b):
+    divisor = to_complex(b)
+    if not divisor:
+        raise FormulaError("#NUM!")
+    return format_complex(to_complex(a) / divisor)
+
+
+def fn_mod(x, y):
+    x, y = to_number(x), to_number(y)
+    if y == 0:
+        raise FormulaError("#DIV/0!")
+    return x - y * math.floor(x / y)
+
+
+FUNCTIONS = {
+    "SUM": lambda *a: float(sum(_numbers(a))),
+    "MAX": lambda *a: float(max(_numbers(a), default=0.0)),
+    "MIN": lambda *a: float(min(_numbers(a), default=0.0)),
+    "AVERAGE": fn_average,
+    "COUNT": lambda *a: float(sum(1 for v in flatten(a) if isinstance(v, (int, float)) and not isinstance(v, bool))),
+    "COUNTA": lambda *a: float(sum(1 for v in flatten(a) if v is not None)),
+    "ABS": lambda x: abs(to_number(x)),
+    "SQRT": fn_sqrt,
+    "POWER": lambda x, y: arith("^", x, y),
+    "ROUND": lambda x, d=0: fn_round(x, d),
+    "ROUNDUP": lambda x, d=0: fn_round(x, d, "up"),
+    "ROUNDDOWN": lambda x, d=0: fn_round(x, d, "down"),
+    "INT": lambda x: float(math.floor(to_number(x))),
+    "MOD": fn_mod,
+    "PI": lambda: math.pi,
+    "AND": lambda *a: all(to_bool(v) for v in flatten(a) if v is not None),
+    "OR": lambda *a: any(to_bool(v) for v in flatten(a) if v is not None),
+    "NOT": lambda x: not to_bool(x),
+    "ISBLANK": lambda x: x is None,
+    "ISNUMBER": lambda x: isinstance(x, (int, float)) and not isinstance(x, bool),
+    "ISTEXT": lambda x: isinstance(x, str),
+    "CONCATENATE": lambda *a: "".join(to_text(v) for v in a),
+    "LEN": lambda x: float(len(to_text(x))),
+    "UPPER": lambda x: to_text(x).upper(),
+    "LOWER": lambda x: to_text(x).lower(),
+    "TRIM": lambda x: " ".join(to_text(x).split()),
+    "LEFT": lambda x, n=1: to_text(x)[:int(to_number(n))],
+    "RIGHT": lambda x, n=1: to_text(x)[-int(to_number(n)):] if int(to_number(n)) else "",
+    "VALUE": lambda x: to_number(x),
+    "VLOOKUP": fn_vlookup,
+    "HLOOKUP": fn_hlookup,
+    "MATCH": fn_match,
+    "INDEX": fn_index,
+    "COMPLEX": fn_complex,
+    "IMSUM": lambda *a: format_complex(sum((to_complex(v) for v in flatten(a)), 0j)),
+    "IMSUB": lambda a, b: format_complex(to_complex(a) - to_complex(b)),
+    "IMPRODUCT": lambda *a: format_complex(math.prod((to_complex(v) for v in flatten(a)), start=1 + 0j)),
+    "IMDIV": fn_imdiv,
+    "IMABS": lambda z: abs(to_complex(z)),
+    "IMREAL": lambda z: to_complex(z).real,
+    "IMAGINARY": lambda z: to_complex(z).imag,
+    "IMARGUMENT": lambda z: cmath.phase(to_complex(z)),
+}
+
+# Functions that take (and must receive) ranges as Range objects
+RANGE_ARGS = {"VLOOKUP": (1,), "HLOOKUP": (1,), "MATCH": (1,), "INDEX": (0,)}
+
+
+# ========== CODE GENERATION ==========
+
+class _CodeGen:
+    def __init__(self):
+        self.consts = []
+
+    def const(self, value):
+        self.consts.append(value)
+        return f"_k[{len(self.consts) - 1}]"
+
+    def point(self, point):
+        r, c, r_abs, c_abs = point
+        row = str(r) if r_abs else f"(row + {r})"
+        col = str(c) if c_abs else f"(col + {c})"
+        return row, col
+
+    def sheet(self, sheet):
+        return "sheet" if sheet is None else self.const(sheet)
+
+    def emit(self, node, as_range=False):
+        kind = node[0]
+        if kind == "num":
+            return repr(node[1])
+        if kind == "str":
+            return self.const(node[1])
+        if kind == "bool":
+            return repr(node[1])
+        if kind == "err":
+            return self.const(ExcelError(node[1]))
+        if kind == "empty":
+            return "None"
+        if kind == "ref":
+            row, col = self.point(node[2])
+            if as_range:
+                return f"ctx.range({self.sheet(node[1])}, {row}, {col}, {row}, {col})"
+            return f"ctx.value({self.sheet(node[1])}, {row}, {col})"
+        if kind == "range":
+            r1, c1 = self.point(node[2])
+            r2, c2 = self.point(node[3])
+            return f"ctx.range({self.sheet(node[1])}, {r1}, {c1}, {r2}, {c2})"
+        if kind == "neg":
+            return f"(-_num({self.emit(node[1])}))"
+        if kind == "pos":
+            return self.emit(node[1])
+        if kind == "pct":
+            return f"(_num({self.emit(node[1])}) / 100.0)"
+        if kind == "bin":
+            op, a, b = node[1], self.emit(node[2]), self.emit(node[3])
+            if op in _Parser.COMPARE:
+                return f"_cmp({op!r}, {a}, {b})"
+            if op == "&":
+                return f"_cat({a}, {b})"
+            return f"_arith({op!r}, {a}, {b})"
+        if kind == "call":
+            return self.call(node[1], node[2])
+        raise SyntaxError(f"Unknown node {kind}")
+
+    def call(self, name, args):
+        if name == "IF":
+            cond = self.emit(args[0])
+            yes = self.emit(args[1]) if len(args) > 1 else "True"
+            no = self.emit(args[2]) if len(args) > 2 else "False"
+            return f"({yes} if _bool({cond}) else {no})"
+        if name == "IFERROR":
+            return f"_iferror(lambda: {self.emit(args[0])}, lambda: {self.emit(args[1])})"
+        if name == "ISERROR":
+            return f"_iserror(lambda: {self.emit(args[0])})"
+        if name not in FUNCTIONS:
+            return f"_raise({self.const('#NAME?')})"
+        range_positions = RANGE_ARGS.get(name, ())
+        parts = []
+        for i, arg in enumerate(args):
+            wants_range = i in range_positions or arg[0] == "range"
+            parts.append(self.emit(arg, as_range=wants_range))
+        return f"_fn[{name!r}]({', '.join(parts)})"
+
+
+def _iferror(value, fallback):
+    try:
+        v = value()
+    except CircularReference:
+        raise
+    except (FormulaError, ZeroDivisionError, ValueError, TypeError):
+        return fallback()
+    return fallback() if isinstance(v, ExcelError) else v
+
+
+def _iserror(value):
+    try:
+        return isinstance(value(), ExcelError)
+    except CircularReference:
+        raise
+    except (FormulaError, ZeroDivisionError, ValueError, TypeError):
+        return True
+
+
+def _raise(code):
+    raise FormulaError(code)
+
+
+_RUNTIME = {
+    "_num": to_number, "_bool": to_bool, "_cmp": compare, "_arith": arith,
+    "_cat": concat, "_fn": FUNCTIONS, "_iferror": _iferror, "_iserror": _iserror,
+    "_raise": _raise,
+}
+
+
+@lru_cache(maxsize=None)
+def _compile_normalized(node):
+    gen = _CodeGen()
+    body = gen.emit(node)
+    source = f"def _formula(ctx, sheet, row, col):\n    return {body}\n"
+    namespace = dict(_RUNTIME, _k=tuple(gen.consts))
+    exec(compile(source, "<formula>", "exec"), namespace)
+    return namespace["_formula"]
+
+
+def compile_formula(formula, row=1, col=1):
+    """Compiled callable (ctx, sheet, row, col) for a formula hosted at (row, col)."""
+    return _compile_normalized(normalize(parse(formula), row, col))
+
+
+def compile_stats():
+    info = _compile_normalized.cache_info()
+    return {"compiled": info.currsize, "reused": info.hits}
+
+
+# ========== WORKBOOK (cell store) ==========
+
+class Workbook:
+    """Values and compiled formulas keyed by (sheet, row, col), evaluated on demand."""
+
+    def __init__(self, default_sheet="Sheet1"):
+        self.default_sheet = default_sheet
+        self.values = {}
+        self.formulas = {}
+        self.sources = {}
+        self._memo = {}
+        self._active = set()
+
+    def _key(self, address):
+        if isinstance(address, tuple):
+            return address
+        return parse_address(address, self.default_sheet)
+
+    def set_value(self, address, value):
+        key = self._key(address)
+        self.formulas.pop(key, None)
+        self.sources.pop(key, None)
+        self.values[key] = float(value) if isinstance(value, int) and not isinstance(value, bool) else value
+        self._memo.clear()
+
+    def set_formula(self, address, formula):
+        key = self._key(address)
+        self.formulas[key] = compile_formula(formula, key[1], key[2])
+        self.sources[key] = formula
+        self.values.pop(key, None)
+        self._memo.clear()
+
+    def set(self, address, content):
+        if isinstance(content, str) and content.startswith("="):
+            self.set_formula(address, content)
+        else:
+            self.set_value(address, content)
+
+    def fill(self, address, formula, rows):
+        """Copy a formula written for `address` down `rows` rows (relative refs shift)."""
+        sheet, row, col = self._key(address)
+        fn = compile_formula(formula, row, col)
+        for r in range(row, row + rows):
+            self.formulas[(sheet, r, col)] = fn
+            self.sources[(sheet, r, col)] = formula
+            self.values.pop((sheet, r, col), None)
+        self._memo.clear()
+
+    # --- evaluation context used by compiled formulas ---
+
+    def value(self, sheet, row, col):
+        key = (sheet, row, col)
+        if key in self._memo:
+            return self._memo[key]
+        fn = self.formulas.get(key)
+        if fn is None:
+            return self.values.get(key)
+        if key in self._active:
+            raise CircularReference(f"Circular reference at {sheet}!{col_letters(col)}{row}")
+        self._active.add(key)
+        try:
+            result = _scalar(fn(self, sheet, row, col))
+            if isinstance(result, int) and not isinstance(result, bool):
+                result = float(result)
+        except FormulaError as e:
+            result = ExcelError(e.code)
+        except RecursionError:
+            raise CircularReference(f"Dependency chain too deep at {sheet}!{col_letters(col)}{row}") from None
+        finally:
+            self._active.discard(key)
+        self._memo[key] = result
+        return result
+
+    def range(self, sheet, r1, c1, r2, c2):
+        rows = range(min(r1, r2), max(r1, r2) + 1)
+        cols = range(min(c1, c2), max(c1, c2) + 1)
+        return Range([[self.value(sheet, r, c) for c in cols] for r in rows])
+
+    def get(self, address):
+        return self.value(*self._key(address))
+
+    def recalc(self):
+        self._memo.clear()
+
+    def calculate(self, inputs, outputs):
+        """
+        Set input values, recalculate and return the output values in order.
+        An input on a formula cell replaces the formula, as set_value() does.
+        """
+        for address, value in inputs.items():
+            self.set_value(address, value)
+        return [self.value(*self._key(a)) for a in outputs]
+
+    @classmethod
+    def from_openpyxl(cls, path, sheets=None):
+        """Load values and formulas of an .xlsx/.xlsm file (requires openpyxl)."""
+        import openpyxl
+
+        wb = openpyxl.load_workbook(path, data_only=False, keep_vba=str(path).endswith(".xlsm"))
+        book = cls(default_sheet=wb.sheetnames[0])
+        errors = []
+        for ws in wb.worksheets:
+            if sheets and ws.title not in sheets:
+                continue
+            for row in ws.iter_rows():
+                for cell in row:
+                    if cell.value is None:
+                        continue
+                    key = (ws.title, cell.row, cell.column)
+                    if isinstance(cell.value, str) and cell.value.startswith("="):
+                        try:
+                            book.formulas[key] = compile_formula(cell.value, cell.row, cell.column)
+                            book.sources[key] = cell.value
+                        except SyntaxError as e:
+                            errors.append((key, str(e)))
+                    else:
+                        v = cell.value
+                        book.values[key] = float(v) if isinstance(v, int) and not isinstance(v, bool) else v
+        book.load_errors = errors
+        return book
+
+
+# ========== CLI ==========
+
+def _collect_formulas(obj):
+    if isinstance(obj, dict):
+        for v in obj.values():
+            yield from _collect_formulas(v)
+    elif isinstance(obj, list):
+        for v in obj:
+            yield from _collect_formulas(v)
+    elif isinstance(obj, str) and obj.startswith("="):
+        yield obj
+
+
+def main():
+    """Compile every formula we have on record, then time a bulk recalculation."""
+    print("=" * 60)
+    print("📐 CQT Light V3 - Excel Formula Compiler")
+    print("=" * 60)
+
+    if len(sys.argv) > 1:
+        start = time.perf_counter()
+        book = Workbook.from_openpyxl(sys.argv[1])
+        print(f"✅ {len(book.formulas):,} formulas, {len(book.values):,} values loaded "
+              f"in {time.perf_counter() - start:.1f}s ({compile_stats()['compiled']:,} distinct)")
+        for key, error in book.load_errors[:10]:
+            print(f"⚠️ {key}: {error}")
+        start = time.perf_counter()
+        errors = sum(isinstance(book.value(*key), ExcelError) for key in book.formulas)
+        print(f"📊 Full recalculation in {(time.perf_counter() - start) * 1000:.0f} ms, {errors:,} error cells")
+        return
+
+    with open(QDT_LOGIC_PATH, "r", encoding="utf-8") as f:
+        logic = json.load(f)
+    for path, data in ((QDT_LOGIC_PATH, logic), (WORKFLOW_PATH, None)):
+        if data is None:
+            if not path.exists():
+                continue
+            with open(path, "r", encoding="utf-8") as f:
+                data = json.load(f)
+        formulas = list(_collect_formulas(data))
+        failed = []
+        for formula in formulas:
+            try:
+                compile_formula(formula, 15, 1)
+            except SyntaxError as e:
+                failed.append(str(e))
+        print(f"✅ {len(formulas) - len(failed)}/{len(formulas)} formulas from {path.name} compile")
+        for error in failed[:5]:
+            print(f"⚠️ {error[:120]}")
+
+    # Row-15 load formulas filled down 20 rows, recalculated for many inputs
+    row15 = logic["row_15_logic"]
+    book = Workbook("QDT")
+    book.set_value("CH5", "NÃO")
+    for col in ("K", "L", "M", "N"):
+        book.fill(f"{col}15", row15[col]["val"], 20)
+    for r in range(15, 35):
+        for col, v in (("C", f"P-{r - 14}"), ("D", 35 - r), ("E", 2.0 * (35 - r)), ("G", 1.0),
+                       ("H", 3.0), ("AM", "185 Al - MX"), ("AR", 30.0)):
+            book.set_value(f"{col}{r}", v)
+    variants = 2_000
+    start = time.perf_counter()
+    for i in range(variants):
+        book.calculate({"E15": 40.0 + i % 10, "CH5": "SIM" if i % 2 else "NÃO"},
+                       [f"M{r}" for r in range(15, 35)])
+    elapsed = time.perf_counter() - start
+    stats = compile_stats()
+    print(f"📊 {variants:,} variants of 20 rows in {elapsed:.2f}s "
+          f"({variants / elapsed * 60:,.0f} per minute); {stats['compiled']} distinct compiled formulas")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,204 @@
+"""
+CQT Light V3 - Monte Carlo Load Uncertainty
+Voltage drop and cable loading percentiles per trecho under uncertain demand
+and conductor temperature.
+
+Each scenario draws, for every node, a lognormal multiplier (mean 1) on the
+load connected there, with the per-consumer coefficient of variation shrunk
+by sqrt(consumers at the node) since independent consumers partly cancel,
+and one conductor temperature for the whole network (R corrected from
+20 °C, like column AX). All scenarios of a chunk run as (nodes x scenarios)
+arrays through the same downstream-accumulate / upstream-propagate passes
+as network_solver.py; on large networks (POOL_MIN_CELLS nodes x scenarios)
+chunks go to a process pool, each with its own SeedSequence child, so results
+depend on the seed and not on the pool size or whether one is used.
+
+Reported per trecho: percentiles of the accumulated drop and of the
+loading (current / ampacity), the probability of exceeding the drop limit
+and of overloading, and `marginal` trechos that pass with the deterministic
+demand but exceed the drop limit at the highest percentile.
+
+Usage:
+    python monte_carlo.py [circuit.json] [--scenarios N] [--workers N] [--seed S]
+
+circuit.json is one QDT circuit (consumers, kva, fdiv, phases, cables,
+length[, parallel]) in sheet order, transformer outwards.
+"""
+
+import argparse
+import json
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+
+from demand_estimator import estimate_demand
+from network_solver import RadialNetwork
+from qdt_engine import (DEFAULT_VOLTAGE, base_current_kva, drop_coefficient, load_cable_table,
+                        phase_factor, trecho_loads)
+from qdt_validator import load_validation_rules
+
+PERCENTILES = (50, 90, 95, 99)
+
+# Nodes x scenarios below which the chunks run inline: about a second of
+# work, less than a process pool takes to start and ship the chunks
+POOL_MIN_CELLS = 5_000_000
+
+
+def local_values(network, downstream):
+    """Undo a downstream accumulation: each node's own value."""
+    downstream = np.asarray(downstream, dtype=float)
+    children = np.bincount(network.parent[network.parent >= 0],
+                           weights=downstream[network.parent >= 0], minlength=len(network))
+    return downstream - children
+
+
+def circuit_inputs(circuit):
+    """QDT circuit dict to (chain network, load per node, consumers per node)."""
+    n = len(circuit["cables"])
+    network = RadialNetwork(np.arange(n) - 1)
+    load = trecho_loads(circuit["consumers"], circuit["kva"], circuit["fdiv"],
+                        circuit.get("small_load_rule", False))[2]
+    load = np.broadcast_to(load, (n,))
+    consumers = np.broadcast_to(np.asarray(circuit["consumers"], dtype=float), (n,))
+    return network, local_values(network, load), local_values(network, consumers)
+
+
+def _simulate_chunk(task):
+    (network, load, consumers, idx, length, parallel, phases, ampacity,
+     demand_cv, temperature, voltage, seed, count) = task
+    table = load_cable_table()
+    rng = np.random.default_rng(seed)
+
+    sigma = np.sqrt(np.log1p((demand_cv / np.sqrt(np.maximum(consumers, 1))) ** 2))
+    multiplier = rng.lognormal(-sigma[:, None] ** 2 / 2, sigma[:, None], (len(network), count))
+    conductor = rng.normal(temperature[0], temperature[1], count)
+
+    through = network.accumulate(load[:, None] * multiplier)
+    k_drop = drop_coefficient(table, idx[:, None], voltage, conductor[None, :])
+    per_kva = k_drop * (length / parallel * phase_factor(phases))[:, None]
+    accumulated = network.propagate(through * per_kva)
+    loading = through / (base_current_kva(phases, voltage) * ampacity * parallel)[:, None]
+    return accumulated.astype(np.float32), loading.astype(np.float32)
+
+
+def simulate(network, load, cables, length, consumers=1, phases=3, parallel=1, ampacity=None,
+             scenarios=10_000, demand_cv=0.3, temperature=(50.0, 10.0), percentiles=PERCENTILES,
+             drop_limit=None, voltage=DEFAULT_VOLTAGE, seed=0, workers=None, chunk_size=1_000):
+    """
+    Monte Carlo voltage drop over a radial network.
+
+    `load` is the deterministic kVA connected at each node and `consumers`
+    how many consumers it stands for; `demand_cv` is the per-consumer
+    coefficient of variation and `temperature` the (mean, std) conductor
+    temperature in °C. `ampacity` (A per trecho) defaults to capacity_a in
+    bt_conductors_multiplexed. Returns a dict: percentiles, drop and loading
+    ((percentiles x nodes)), exceed_probability, overload_probability,
+    deterministic_drop and marginal (per node). `workers` None uses a pool
+    only from POOL_MIN_CELLS nodes x scenarios; 1 always runs inline.
+    """
+    table = load_cable_table()
+    rules = load_validation_rules()
+    drop_limit = rules["drop_limit"] if drop_limit is None else drop_limit
+    n = len(network)
+    idx = np.broadcast_to(table.lookup(cables), (n,))
+    if ampacity is None:
+        ampacity = np.array([rules["ampacity"].get(table.names[i], np.nan) for i in idx])
+
+    def per_node(value, dtype=float):
+        return np.ascontiguousarray(np.broadcast_to(np.asarray(value, dtype=dtype), (n,)))
+
+    common = (network, per_node(load), per_node(consumers), idx, per_node(length), per_node(parallel),
+              per_node(phases, np.intp), per_node(ampacity), demand_cv, temperature, voltage)
+    sizes = [min(chunk_size, scenarios - start) for start in range(0, scenarios, chunk_size)]
+    seeds = np.random.SeedSequence(seed).spawn(len(sizes))
+    tasks = [common + (s, size) for s, size in zip(seeds, sizes)]
+
+    small = workers is None and n * scenarios < POOL_MIN_CELLS
+    if len(tasks) == 1 or workers == 1 or small:
+        chunks = [_simulate_chunk(task) for task in tasks]
+    else:
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            chunks = list(pool.map(_simulate_chunk, tasks))
+    accumulated = np.concatenate([c[0] for c in chunks], axis=1)
+    loading = np.concatenate([c[1] for c in chunks], axis=1)
+
+    per_kva = (drop_coefficient(table, idx, voltage, temperature[0]) * per_node(length) / per_node(parallel)
+               * phase_factor(per_node(phases, np.intp)))
+    deterministic = network.propagate(network.accumulate(per_node(load)) * per_kva)
+    drop = np.percentile(accumulated, percentiles, axis=1)
+    return {
+        "percentiles": list(percentiles),
+        "drop": drop,
+        "loading": np.percentile(loading, percentiles, axis=1),
+        "exceed_probability": (accumulated > drop_limit).mean(axis=1),
+        "overload_probability": (loading > 1).mean(axis=1),
+        "deterministic_drop": deterministic,
+        "marginal": (deterministic <= drop_limit) & (drop[-1] > drop_limit),
+    }
+
+
+def simulate_circuit(circuit, **kwargs):
+    """simulate() for a QDT circuit dict (chain of trechos in sheet order)."""
+    network, load, consumers = circuit_inputs(circuit)
+    return simulate(network, load, circuit["cables"], circuit["length"], consumers=consumers,
+                    phases=circuit["phases"], parallel=circuit.get("parallel", 1), **kwargs)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Monte Carlo load uncertainty")
+    parser.add_argument("circuit", nargs="?", help="QDT circuit JSON (demo data if omitted)")
+    parser.add_argument("--scenarios", type=int, default=10_000)
+    parser.add_argument("--cv", type=float, default=0.3, help="Per-consumer demand coefficient of variation")
+    parser.add_argument("--workers", type=int, default=None)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    print("=" * 60)
+    print("🎲 CQT Light V3 - Monte Carlo Load Uncertainty")
+    print("=" * 60)
+
+    if args.circuit:
+        with open(args.circuit, "r", encoding="utf-8") as f:
+            circuit = json.load(f)
+    else:
+        circuit = {
+            "consumers": [24, 20, 15, 11, 7, 4],
+            "kva": [52.0, 45.0, 35.0, 26.0, 17.0, 10.0],
+            "fdiv": 1.0,
+            "phases": 3,
+            "cables": ["185 MMX", "185 MMX", "70 MMX", "70 MMX", "70 MMX", "70 MMX"],
+            "length": [35, 35, 30, 30, 35, 30],
+        }
+        print("⚠️ No input file, simulating a sample circuit")
+
+    start = time.perf_counter()
+    result = simulate_circuit(circuit, scenarios=args.scenarios, demand_cv=args.cv,
+                              workers=args.workers, seed=args.seed)
+    elapsed = time.perf_counter() - start
+    print(f"✅ {args.scenarios:,} scenarios in {elapsed * 1000:.0f} ms")
+
+    header = "".join(f"{'P' + str(p):>8}" for p in result["percentiles"])
+    print(f"\n{'Trecho':<8}{'Determ.':>9}{header}{'P(>lim)':>9}{'Carreg.':>9}")
+    for i in range(len(circuit["cables"])):
+        flag = "  ⚠️ marginal" if result["marginal"][i] else ""
+        print(f"P-{i + 1:<6}{result['deterministic_drop'][i]:>9.2f}"
+              + "".join(f"{v:>8.2f}" for v in result["drop"][:, i])
+              + f"{result['exceed_probability'][i]:>9.1%}{result['loading'][-1, i]:>9.2f}{flag}")
+
+    rng = np.random.default_rng(args.seed)
+    n, scenarios = 300, 10 * args.scenarios
+    feeder = RadialNetwork(np.where(np.arange(n) > 0, (np.arange(n) - 1) // 3, -1))
+    demand = estimate_demand(rng.integers(0, n, 80), network=feeder, fdiv=1.0)
+    start = time.perf_counter()
+    big = simulate(feeder, local_values(feeder, demand["demand"]), "185 MMX", rng.uniform(5, 15, n),
+                   consumers=local_values(feeder, demand["consumers"]), scenarios=scenarios,
+                   demand_cv=args.cv, workers=args.workers, seed=args.seed)
+    elapsed = time.perf_counter() - start
+    over = (big["deterministic_drop"] > load_validation_rules()["drop_limit"]).sum()
+    print(f"\n📊 {n:,} trechos x {scenarios:,} scenarios in {elapsed * 1000:.0f} ms: "
+          f"{over:,} over the limit, {big['marginal'].sum():,} marginal")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,252 @@
+"""
+CQT Light V3 - PDF Page Extraction Service
+Page-cached, parallel text extraction for the Padrões library.
+
+Every page's text is stored in data/standards/page_cache.db keyed by
+(SHA-256 of the file, page number), so a PDF is only read again when its
+content changes, and identical copies under different folders share their
+pages. File hashes are remembered per path with size and mtime, so a re-run
+over an unchanged library only stats the files and reads the cache.
+
+New or changed files are hashed and counted, and their missing pages
+extracted, in a process pool: pages are split into batches, each worker opens
+the PDF once per batch, and finished batches are committed as they arrive so
+an interrupted run keeps its progress.
+
+Usage:
+    python pdf_pages.py [folder or PDF ...] [--workers N] [--batch-pages N]
+"""
+
+import argparse
+import hashlib
+import os
+import sqlite3
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from pathlib import Path
+
+import pypdf
+
+BASE_DIR = Path(__file__).parent.parent
+DATA_DIR = BASE_DIR / "data"
+PADROES_DIR = BASE_DIR / "Padrões"
+CACHE_PATH = DATA_DIR / "standards" / "page_cache.db"
+
+BATCH_PAGES = 16
+
+SCHEMA = """
+    CREATE TABLE IF NOT EXISTS files (
+        path TEXT PRIMARY KEY, size INTEGER, mtime_ns INTEGER, file_hash TEXT
+    );
+    CREATE TABLE IF NOT EXISTS documents (
+        file_hash TEXT PRIMARY KEY, pages INTEGER
+    );
+    CREATE TABLE IF NOT EXISTS pages (
+        file_hash TEXT, page INTEGER, text TEXT, error TEXT,
+        PRIMARY KEY (file_hash, page)
+    ) WITHOUT ROWID;
+"""
+
+
+def open_cache(cache_path=CACHE_PATH):
+    """Open (creating if needed) the page cache database."""
+    Path(cache_path).parent.mkdir(parents=True, exist_ok=True)
+    conn = sqlite3.connect(cache_path)
+    conn.executescript(SCHEMA)
+    return conn
+
+
+def file_hash(path, chunk_size=1 << 20):
+    """SHA-256 of a file's content."""
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(chunk_size), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def find_pdfs(folder=PADROES_DIR):
+    """Every PDF below a folder, sorted."""
+    return sorted(str(p) for p in Path(folder).rglob("*") if p.suffix.lower() == ".pdf")
+
+
+def _inspect(path):
+    """Worker: content hash and page count of one file."""
+    return file_hash(path), len(pypdf.PdfReader(path).pages)
+
+
+def _extract_batch(task):
+    """Worker: text of some pages of one PDF, as (page, text, error) rows."""
+    path, pages = task
+    reader = pypdf.PdfReader(path)
+    rows = []
+    for i in pages:
+        try:
+            rows.append((i, reader.pages[i].extract_text() or "", None))
+        except Exception as e:
+            rows.append((i, "", str(e)))
+    return rows
+
+
+def _run(pool, fn, items):
+    """Map in the pool when there is one, else inline; yields (item, result or exception)."""
+    if pool is None:
+        for item in items:
+            try:
+                yield item, fn(item)
+            except Exception as e:
+                yield item, e
+        return
+    futures = {pool.submit(fn, item): item for item in items}
+    for future in as_completed(futures):
+        try:
+            yield futures[future], future.result()
+        except Exception as e:
+            yield futures[future], e
+
+
+def _update_cache(conn, paths, workers, batch_pages):
+    """Hash new or changed files and extract their missing pages; returns (hashes, counts, extracted)."""
+    known = {path: (size, mtime, digest) for path, size, mtime, digest in
+             conn.execute("SELECT path, size, mtime_ns, file_hash FROM files")}
+    counts = dict(conn.execute("SELECT file_hash, pages FROM documents"))
+
+    hashes, stale = {}, []
+    for path in paths:
+        st = os.stat(path)
+        entry = known.get(path)
+        if entry and entry[0] == st.st_size and entry[1] == st.st_mtime_ns and entry[2] in counts:
+            hashes[path] = entry[2]
+        else:
+            stale.append((path, st.st_size, st.st_mtime_ns))
+
+    pool = None
+
+    def executor(items):
+        nonlocal pool
+        if pool is None and workers != 1 and len(items) > 1:
+            pool = ProcessPoolExecutor(max_workers=workers)
+        return pool
+
+    extracted = errors = 0
+    try:
+        sizes = {path: (size, mtime) for path, size, mtime in stale}
+        for path, result in _run(executor(stale), _inspect, list(sizes)):
+            if isinstance(result, Exception):
+                print(f"⚠️ Could not read {path}: {result}")
+                continue
+            digest, n_pages = result
+            hashes[path] = digest
+            counts[digest] = n_pages
+            conn.execute("INSERT OR REPLACE INTO documents VALUES (?, ?)", (digest, n_pages))
+            conn.execute("INSERT OR REPLACE INTO files VALUES (?, ?, ?, ?)", (path, *sizes[path], digest))
+        conn.commit()
+
+        # Missing pages of each distinct document, in batches
+        have = {}
+        for digest, page in conn.execute("SELECT file_hash, page FROM pages"):
+            have.setdefault(digest, set()).add(page)
+        tasks, source = [], set()
+        for path, digest in hashes.items():
+            if digest in source:
+                continue
+            source.add(digest)
+            missing = [i for i in range(counts[digest]) if i not in have.get(digest, ())]
+            tasks += [(path, tuple(missing[i:i + batch_pages])) for i in range(0, len(missing), batch_pages)]
+
+        for (path, _), rows in _run(executor(tasks), _extract_batch, tasks):
+            if isinstance(rows, Exception):
+                print(f"⚠️ Could not extract from {path}: {rows}")
+                continue
+            conn.executemany("INSERT OR REPLACE INTO pages VALUES (?, ?, ?, ?)",
+                             [(hashes[path], page, text, error) for page, text, error in rows])
+            conn.commit()
+            extracted += len(rows)
+            errors += sum(1 for _, _, error in rows if error)
+    finally:
+        if pool is not None:
+            pool.shutdown()
+    if errors:
+        print(f"⚠️ {errors} pages could not be extracted (stored empty, see pages.error)")
+    return hashes, counts, extracted
+
+
+def load_pages(conn, digest, count=None):
+    """Cached page texts of one document (by content hash)."""
+    if count is None:
+        count = conn.execute("SELECT pages FROM documents WHERE file_hash = ?", (digest,)).fetchone()[0]
+    pages = [""] * count
+    for page, text in conn.execute("SELECT page, text FROM pages WHERE file_hash = ?", (digest,)):
+        pages[page] = text
+    return pages
+
+
+def file_hashes(paths, cache_path=CACHE_PATH, workers=None, batch_pages=BATCH_PAGES):
+    """
+    Bring the cache up to date for `paths` without reading texts back:
+    {path: content hash}, unreadable files left out.
+    """
+    paths = [str(p) for p in paths]
+    conn = open_cache(cache_path)
+    try:
+        hashes = _update_cache(conn, paths, workers, batch_pages)[0]
+    finally:
+        conn.close()
+    return {path: hashes[path] for path in paths if path in hashes}
+
+
+def extract_pages(paths, cache_path=CACHE_PATH, workers=None, batch_pages=BATCH_PAGES, stats=None):
+    """
+    Page texts of many PDFs: {path: [text of page 1, page 2, ...]}.
+
+    Cached pages are read back; the rest are extracted in a process pool
+    (workers=1 runs inline). Unreadable files are reported and left out of
+    the result. `stats`, when a dict, receives files/pages/extracted counts.
+    """
+    paths = [str(p) for p in paths]
+    conn = open_cache(cache_path)
+    hashes, counts, extracted = _update_cache(conn, paths, workers, batch_pages)
+    texts = {digest: load_pages(conn, digest, counts[digest]) for digest in set(hashes.values())}
+    conn.close()
+
+    if stats is not None:
+        stats.update(files=len(hashes), pages=sum(counts[d] for d in set(hashes.values())), extracted=extracted)
+    return {path: texts[hashes[path]] for path in paths if path in hashes}
+
+
+def document_text(pages):
+    """Whole-document text: the non-empty pages, one line break after each."""
+    return "".join(text + "\n" for text in pages if text)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Page-cached PDF text extraction")
+    parser.add_argument("inputs", nargs="*", help=f"Folders or PDFs (default: {PADROES_DIR})")
+    parser.add_argument("--workers", type=int, default=None)
+    parser.add_argument("--batch-pages", type=int, default=BATCH_PAGES)
+    parser.add_argument("--cache", default=str(CACHE_PATH))
+    args = parser.parse_args()
+
+    print("=" * 60)
+    print("📄 CQT Light V3 - PDF Page Extraction")
+    print("=" * 60)
+
+    paths = []
+    for item in args.inputs or [PADROES_DIR]:
+        paths += find_pdfs(item) if Path(item).is_dir() else [str(item)]
+    if not paths:
+        print(f"⚠️ No PDFs found in {', '.join(map(str, args.inputs or [PADROES_DIR]))}")
+        return
+
+    stats = {}
+    start = time.perf_counter()
+    pages = extract_pages(paths, args.cache, args.workers, args.batch_pages, stats)
+    elapsed = time.perf_counter() - start
+    chars = sum(len(text) for texts in pages.values() for text in texts)
+    print(f"✅ {stats['files']} files, {stats['pages']:,} pages ({stats['extracted']:,} extracted, "
+          f"{stats['pages'] - stats['extracted']:,} cached) in {elapsed:.1f} s")
+    print(f"📊 {chars:,} characters of text")
+
+
+if __name__ == "__main__":
+    main()
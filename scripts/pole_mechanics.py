@@ -0,0 +1,170 @@
+"""
+CQT Light V3 - Pole Mechanics
+Batch mechanical check of pole routes, from the `mechanical` section of
+data/rules/calculation_logic.json:
+
+    resultant   2 T sin(θ / 2) for a deflection θ; full T at route ends
+    traction    poles deflecting more than angle_limit_without_traction_check,
+                and terminal poles
+    pole        smallest catalog pole (data/kits/poles.json) at least as tall
+                as required whose nominal resistance covers the resultant
+    foundation  foundation_depth_formula ("L/10 + 0.60") of the chosen pole
+
+Inputs are arrays over every pole of one or many routes (a `route` id array
+separates them), so a whole project is checked in one call.
+"""
+
+import json
+import re
+import time
+from functools import lru_cache
+from pathlib import Path
+
+import numpy as np
+
+BASE_DIR = Path(__file__).parent.parent
+DATA_DIR = BASE_DIR / "data"
+RULES_PATH = DATA_DIR / "rules" / "calculation_logic.json"
+POLES_PATH = DATA_DIR / "kits" / "poles.json"
+
+POLE_NAME = re.compile(r"(\d+(?:[.,]\d+)?)\s*M\s*/\s*(\d+)\s*DAN", re.IGNORECASE)
+DEPTH_FORMULA = re.compile(r"^\s*L\s*/\s*([\d.]+)\s*\+\s*([\d.]+)\s*$")
+
+
+@lru_cache(maxsize=None)
+def load_mechanical_rules(path=RULES_PATH):
+    """Standard lengths/resistances, traction angle limit and the depth formula terms."""
+    with open(path, "r", encoding="utf-8") as f:
+        mechanical = json.load(f)["mechanical"]
+    m = DEPTH_FORMULA.match(mechanical["foundation_depth_formula"])
+    if not m:
+        raise ValueError(f"Unsupported foundation_depth_formula: {mechanical['foundation_depth_formula']}")
+    return {
+        "lengths": sorted(mechanical["pole_standard_lengths"]),
+        "resistances": sorted(mechanical["pole_standard_resistance"]),
+        "angle_limit": mechanical["angle_limit_without_traction_check"],
+        "depth_divisor": float(m.group(1)),
+        "depth_offset": float(m.group(2)),
+    }
+
+
+@lru_cache(maxsize=None)
+def load_pole_catalog(path=POLES_PATH):
+    """
+    Catalog poles with standard length and resistance, as arrays sorted by
+    (length, resistance): {id, name, length, resistance}.
+    """
+    rules = load_mechanical_rules()
+    with open(path, "r", encoding="utf-8") as f:
+        poles = json.load(f)
+    rows = []
+    for pole in poles:
+        m = POLE_NAME.search(pole["name"])
+        if not m:
+            continue
+        length, resistance = float(m.group(1).replace(",", ".")), float(m.group(2))
+        if length in rules["lengths"] and resistance in rules["resistances"]:
+            rows.append((length, resistance, pole["id"], pole["name"]))
+    rows.sort()
+    return {
+        "id": [r[2] for r in rows],
+        "name": [r[3] for r in rows],
+        "length": np.array([r[0] for r in rows]),
+        "resistance": np.array([r[1] for r in rows]),
+    }
+
+
+def foundation_depth(length, rules=None):
+    """Foundation depth (m) for pole lengths (m)."""
+    rules = rules or load_mechanical_rules()
+    return np.asarray(length, dtype=float) / rules["depth_divisor"] + rules["depth_offset"]
+
+
+def route_ends(route):
+    """True for the first and last pole of each route in a concatenated route array."""
+    route = np.asarray(route)
+    ends = np.zeros(route.shape, dtype=bool)
+    if route.size:
+        ends[0] = ends[-1] = True
+        change = route[1:] != route[:-1]
+        ends[1:] |= change
+        ends[:-1] |= change
+    return ends
+
+
+def check_poles(angle, tension, route=None, min_length=9.0, dead_end=None, catalog=None):
+    """
+    Mechanical check of every pole.
+
+    `angle` is the deflection (degrees) at each pole, `tension` the conductor
+    tension (daN) as (n,) or (n, conductors); `route` ids mark where routes
+    start and end (terminal poles take the full tension); `dead_end` forces
+    the terminal case elsewhere. Returns a dict of arrays: force (daN),
+    traction_check, pole (catalog index, -1 when nothing fits), length,
+    resistance and foundation_depth of the proposed pole.
+    """
+    rules = load_mechanical_rules()
+    catalog = catalog or load_pole_catalog()
+
+    angle = np.asarray(angle, dtype=float)
+    tension = np.asarray(tension, dtype=float)
+    if tension.ndim > angle.ndim:
+        tension = tension.sum(axis=-1)
+    terminal = route_ends(np.zeros(angle.shape) if route is None else route)
+    if dead_end is not None:
+        terminal |= np.asarray(dead_end, dtype=bool)
+
+    force = np.where(terminal, tension, 2 * tension * np.sin(np.radians(np.abs(angle)) / 2))
+    traction = (np.abs(angle) > rules["angle_limit"]) | terminal
+
+    # Smallest pole (catalog is sorted by length, then resistance) that fits
+    min_length = np.broadcast_to(np.asarray(min_length, dtype=float), angle.shape)
+    fits = ((catalog["length"][None, :] >= min_length[:, None])
+            & (catalog["resistance"][None, :] >= force[:, None]))
+    pole = np.where(fits.any(axis=1), fits.argmax(axis=1), -1)
+
+    chosen = np.where(pole >= 0, pole, 0)
+    length = np.where(pole >= 0, catalog["length"][chosen], np.nan)
+    return {
+        "force": force,
+        "traction_check": traction,
+        "pole": pole,
+        "length": length,
+        "resistance": np.where(pole >= 0, catalog["resistance"][chosen], np.nan),
+        "foundation_depth": foundation_depth(length, rules),
+    }
+
+
+def main():
+    """Check a sample route and time a large synthetic project."""
+    print("=" * 60)
+    print("🏗️ CQT Light V3 - Pole Mechanics")
+    print("=" * 60)
+
+    rules = load_mechanical_rules()
+    catalog = load_pole_catalog()
+    print(f"✅ {len(catalog['id'])} catalog poles, traction check above {rules['angle_limit']}°")
+
+    angle = [0, 3, 12, 0, 25, 2, 0]
+    tension = [[250, 180]] * len(angle)
+    result = check_poles(angle, tension)
+    print(f"\n{'Poste':<7}{'Ângulo':>8}{'Esforço daN':>13}{'Tração':>8}  Poste proposto      Engaste m")
+    for i, a in enumerate(angle):
+        pole = result["pole"][i]
+        name = f"{catalog['length'][pole]:.0f}m/{catalog['resistance'][pole]:.0f}daN" if pole >= 0 else "—"
+        print(f"P-{i + 1:<5}{a:>8}{result['force'][i]:>13.1f}{'sim' if result['traction_check'][i] else '':>8}"
+              f"  {name:<19}{result['foundation_depth'][i]:>7.2f}")
+
+    count = 1_000_000
+    rng = np.random.default_rng(0)
+    route = np.sort(rng.integers(0, count // 20, count))
+    start = time.perf_counter()
+    batch = check_poles(rng.exponential(4, count), rng.uniform(100, 600, (count, 3)), route,
+                        rng.choice([9.0, 11.0, 12.0], count))
+    elapsed = time.perf_counter() - start
+    print(f"\n📊 {count:,} poles in {elapsed * 1000:.0f} ms: {batch['traction_check'].sum():,} need a "
+          f"traction check, {(batch['pole'] < 0).sum():,} exceed every catalog pole")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,210 @@
+"""
+CQT Light V3 - QDT Differential Harness
+Runs randomized circuits through the native QDT engine (qdt_engine.py) and
+through the extracted 'QDT Dutra 2.3' row formulas (qdt_deep_logic.json,
+evaluated by formula_compiler.py), compares every checked cell and reports
+the first divergence. Both sides are timed so the native speedup can be
+tracked.
+
+The row-15 formulas are filled down the 20 trecho rows of the sheet (15..34
+here, row 14 playing the header row). R and X (BI/BB) are fed from
+technical_data.json, since the CY/DL cable block the sheet looks them up in
+was not extracted.
+
+Usage:
+    python qdt_differential.py [--circuits N] [--seed S] [--tolerance T]
+"""
+
+import argparse
+import json
+import sys
+import time
+
+import numpy as np
+
+from formula_compiler import QDT_LOGIC_PATH, ExcelError, Workbook
+from qdt_engine import DEFAULT_VOLTAGE, compute_qdt, load_cable_table
+
+FIRST_ROW = 15
+SHEET_ROWS = 20
+
+# Sheet columns whose formulas are evaluated, in dependency order
+FORMULA_COLUMNS = ("I", "K", "L", "M", "N", "AR", "BJ", "BW", "BZ", "CA")
+
+# Checked cells: sheet column -> (native result key, kind)
+CHECKED = {
+    "K": ("load_k", "number"),
+    "L": ("load_l", "number"),
+    "M": ("load", "number"),
+    "BJ": ("k_drop", "number"),
+    "BZ": ("drop", "number"),
+    "CA": ("accumulated_drop", "number"),
+    "I": ("error_02", "Erro 02"),
+    "N": ("error_05", "Erro 05 !"),
+}
+
+
+def build_sheet(logic_path=QDT_LOGIC_PATH):
+    """Workbook with the row-15 formulas filled down the trecho rows."""
+    with open(logic_path, "r", encoding="utf-8") as f:
+        row15 = json.load(f)["row_15_logic"]
+    book = Workbook("QDT")
+    for col in FORMULA_COLUMNS:
+        book.fill(f"{col}{FIRST_ROW}", row15[col]["val"], SHEET_ROWS)
+    book.set_value(f"D{FIRST_ROW - 1}", "Nº Cons. no final de cada trecho")
+    book.set_value(f"H{FIRST_ROW - 1}", "Nº de fases do trecho")
+    return book
+
+
+def random_circuit(rng, table, max_rows=SHEET_ROWS):
+    """A random circuit, mostly well-formed, sometimes breaking the sequence rules."""
+    n = int(rng.integers(1, max_rows + 1))
+    consumers = np.sort(rng.integers(1, 40, n))[::-1]
+    phases = np.sort(rng.choice([1, 2, 3], n, p=[0.1, 0.2, 0.7]))[::-1]
+    if rng.random() < 0.2:
+        consumers = rng.integers(0, 40, n)
+    if rng.random() < 0.1:
+        phases = rng.choice([0, 1, 2, 3], n)
+    return {
+        "consumers": consumers.tolist(),
+        "kva": rng.uniform(0.5, 80, n).round(2).tolist(),
+        "fdiv": rng.choice([1.0, 0.9, 0.75], n).tolist(),
+        "phases": phases.tolist(),
+        "cables": rng.choice(table.names, n).tolist(),
+        "length": rng.uniform(5, 60, n).round(1).tolist(),
+        "parallel": rng.choice([1, 1, 1, 2], n).tolist(),
+        "small_load_rule": bool(rng.random() < 0.5),
+    }
+
+
+def sheet_inputs(circuit, table, voltage=DEFAULT_VOLTAGE):
+    """Cell inputs for one circuit; rows past the circuit are cleared."""
+    n = len(circuit["consumers"])
+    idx = table.lookup(circuit["cables"])
+    inputs = {"CH5": "SIM" if circuit["small_load_rule"] else "NÃO", "BX6": voltage}
+    for i in range(SHEET_ROWS):
+        row = FIRST_ROW + i
+        filled = i < n
+        cells = {
+            "C": f"P-{i + 1}" if filled else None,
+            "D": circuit["consumers"][i] if filled else None,
+            "E": circuit["kva"][i] if filled else None,
+            "G": circuit["fdiv"][i] if filled else None,
+            "H": circuit["phases"][i] if filled else None,
+            "AM": circuit["cables"][i] if filled else None,
+            "AQ": circuit["length"][i] if filled else None,
+            "AP": circuit["parallel"][i] if filled else None,
+            "BI": float(table.r[idx[i]]) if filled else None,
+            "BB": float(table.x[idx[i]]) if filled else None,
+        }
+        for col, value in cells.items():
+            inputs[f"{col}{row}"] = value
+    return inputs
+
+
+def run_native(circuit, table, voltage=DEFAULT_VOLTAGE):
+    return compute_qdt(circuit["consumers"], circuit["kva"], circuit["fdiv"], circuit["phases"],
+                       circuit["cables"], circuit["length"], circuit["parallel"],
+                       small_load_rule=circuit["small_load_rule"], voltage=voltage, table=table)
+
+
+def compare_circuit(book, circuit, native, tolerance):
+    """First diverging cell of one circuit as a dict, or None."""
+    n = len(circuit["consumers"])
+    for i in range(SHEET_ROWS):
+        row = FIRST_ROW + i
+        for col, (key, kind) in CHECKED.items():
+            sheet = book.get(f"{col}{row}")
+            if i >= n:
+                # Unused rows must stay blank, except BJ which is not guarded
+                expected = ""
+                ok = sheet == "" or col == "BJ"
+            elif kind == "number":
+                expected = float(native[key][i])
+                ok = (not isinstance(sheet, (str, ExcelError))
+                      and abs(sheet - expected) <= tolerance * max(1.0, abs(expected)))
+            else:
+                expected = kind if native[key][i] else ("OK !" if col == "I" else "")
+                ok = sheet == expected
+            if not ok:
+                return {"cell": f"{col}{row}", "sheet": sheet, "native": expected,
+                        "column": key, "trecho": i + 1}
+    return None
+
+
+def run_harness(circuits=1_000, seed=0, tolerance=1e-9, verbose=True):
+    """Compare both sides on random circuits; returns a summary dict."""
+    table = load_cable_table()
+    rng = np.random.default_rng(seed)
+    cases = [random_circuit(rng, table) for _ in range(circuits)]
+
+    book = build_sheet()
+    outputs = [f"{col}{FIRST_ROW + i}" for i in range(SHEET_ROWS) for col in CHECKED]
+    sheet_time = native_time = 0.0
+    divergence = None
+    for number, circuit in enumerate(cases):
+        start = time.perf_counter()
+        book.calculate(sheet_inputs(circuit, table), outputs)
+        sheet_time += time.perf_counter() - start
+
+        start = time.perf_counter()
+        native = run_native(circuit, table)
+        native_time += time.perf_counter() - start
+
+        divergence = compare_circuit(book, circuit, native, tolerance)
+        if divergence:
+            divergence["circuit"] = number
+            divergence["inputs"] = circuit
+            break
+
+    checked = number + 1 if cases else 0
+    summary = {
+        "circuits": checked,
+        "divergence": divergence,
+        "sheet_ms": sheet_time / max(checked, 1) * 1000,
+        "native_ms": native_time / max(checked, 1) * 1000,
+    }
+    summary["speedup"] = summary["sheet_ms"] / summary["native_ms"] if native_time else float("inf")
+
+    if verbose:
+        if divergence:
+            print(f"❌ Circuit {divergence['circuit']}: first divergence at {divergence['cell']} "
+                  f"({divergence['column']}, trecho {divergence['trecho']}): "
+                  f"sheet {divergence['sheet']!r} vs native {divergence['native']!r}")
+            print(f"   Inputs: {json.dumps(divergence['inputs'], ensure_ascii=False)}")
+        else:
+            print(f"✅ {checked:,} circuits match within {tolerance:g} "
+                  f"({len(CHECKED)} columns x {SHEET_ROWS} rows each)")
+        print(f"📊 Sheet formulas: {summary['sheet_ms']:.3f} ms/circuit, "
+              f"native: {summary['native_ms']:.3f} ms/circuit ({summary['speedup']:.0f}x)")
+    return summary
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Native QDT engine vs sheet formulas")
+    parser.add_argument("--circuits", type=int, default=2_000)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--tolerance", type=float, default=1e-9, help="Relative tolerance")
+    args = parser.parse_args()
+
+    print("=" * 60)
+    print("🔬 CQT Light V3 - QDT Differential Harness")
+    print("=" * 60)
+
+    summary = run_harness(args.circuits, args.seed, args.tolerance)
+
+    # Batched native throughput, the way the engine is meant to be used
+    table = load_cable_table()
+    rng = np.random.default_rng(args.seed)
+    kva = rng.uniform(0.5, 80, size=(args.circuits, SHEET_ROWS))
+    start = time.perf_counter()
+    compute_qdt(np.arange(SHEET_ROWS, 0, -1), kva, 1, 3, ["70 MMX"] * SHEET_ROWS, 30, table=table)
+    batched = (time.perf_counter() - start) / args.circuits * 1000
+    print(f"📊 Native batched: {batched * 1000:.2f} µs/circuit "
+          f"({summary['sheet_ms'] / batched:,.0f}x the sheet)")
+
+    sys.exit(1 if summary["divergence"] else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,325 @@
+"""
+CQT Light V3 - QDT Voltage Drop Engine
+Evaluates the 'QDT Dutra 2.3 Lado Esquerdo' voltage-drop columns for every
+trecho of a circuit at once, as NumPy arrays.
+
+Column mapping (see data/qdt_deep_logic.json, row 15):
+    D  consumers          E  kva            G  fdiv          H  phases
+    AM cable              AQ length (m)     AP parallel      AN ampacity
+    K/L/M  load at end of trecho (M = K when CH5 = "SIM", else L)
+    BJ     drop coefficient  sqrt(R^2 + X^2) / (V^2 / 100)
+    BZ     trecho drop (%)   M * BJ * AR * phase factor
+    CA     accumulated drop  running sum of BZ
+    P      cable temperature M / I-base / (AO / (Tmax - 30)) + 30
+
+Every input broadcasts: pass (n,) arrays for one circuit or (k, n) arrays to
+evaluate k load scenarios of the same circuit in one call.
+
+compute_qdt_unbalanced() is the per-phase mode: loads are placed on phases
+A/B/C, each trecho's phase-neutral drop includes the neutral return current,
+and drops accumulate as phasors. Balanced three-phase and single-phase trechos
+reproduce BZ exactly; two-phase trechos come out above the sheet's factor 2,
+which ignores the neutral current.
+"""
+
+import json
+import time
+from functools import lru_cache
+from pathlib import Path
+
+import numpy as np
+
+BASE_DIR = Path(__file__).parent.parent
+DATA_DIR = BASE_DIR / "data"
+TECHNICAL_DATA_PATH = DATA_DIR / "technical_data.json"
+
+# Line voltage of the secondary network ($BX$6)
+DEFAULT_VOLTAGE = 220.0
+
+# BZ multiplies the three-phase drop by these factors for 2- and 1-phase trechos
+PHASE_FACTORS = {3: 1.0, 2: 2.0, 1: 6.0}
+
+# Temperature coefficient (column AW) and conductor temperature limits (P/BY)
+ALPHA_AL = 0.00403
+ALPHA_CU = 0.00393
+TEMP_LIMIT = 90.1
+TEMP_LIMIT_SUFFIXES = {"QX": 70.0, "DX": 70.0, "TX": 70.0}
+TEMP_MAX_DEFAULT = 90.0
+
+# R values in technical_data.json are taken as Rcc at 20 °C, like column AT
+R_TABLE_TEMP = 20.0
+
+# Unit phasors of phases A, B, C and the phases a 1-, 2- or 3-phase trecho uses
+PHASE_ROTATION = np.exp(-2j * np.pi / 3 * np.arange(3))
+CONNECTED_PHASES = np.array([[0, 0, 0], [1, 0, 0], [1, 1, 0], [1, 1, 1]], dtype=float)
+
+
+class CableTable:
+    """R/X/Coef_Queda table from technical_data.json, as parallel arrays."""
+
+    def __init__(self, rows):
+        rows = [r for r in rows if isinstance(r.get("R"), (int, float))]
+        self.names = [str(r["Cabo"]).strip() for r in rows]
+        self.index = {name: i for i, name in enumerate(self.names)}
+        self.r = np.array([r["R"] for r in rows], dtype=float)
+        self.x = np.array([r["X"] for r in rows], dtype=float)
+        self.coef_queda = np.array([r["Coef_Queda"] for r in rows], dtype=float)
+        self.alpha = np.array(
+            [ALPHA_CU if "CU" in name.upper() else ALPHA_AL for name in self.names]
+        )
+        self.temp_max = np.array([
+            TEMP_LIMIT_SUFFIXES.get(name.split()[-1].upper(), TEMP_MAX_DEFAULT)
+            for name in self.names
+        ])
+
+    def lookup(self, cables):
+        """Cable names (or indexes) to an integer index array."""
+        cables = np.asarray(cables)
+        if cables.dtype.kind in "iu":
+            return cables.astype(np.intp)
+        flat = [self.index.get(str(c).strip(), -1) for c in cables.ravel()]
+        idx = np.array(flat, dtype=np.intp).reshape(cables.shape)
+        if (idx < 0).any():
+            unknown = sorted({str(c) for c, i in zip(cables.ravel(), idx.ravel()) if i < 0})
+            raise KeyError(f"Unknown cable(s): {', '.join(unknown)}")
+        return idx
+
+
+@lru_cache(maxsize=None)
+def load_cable_table(path=TECHNICAL_DATA_PATH):
+    """Load (once) the cable table from technical_data.json."""
+    with open(path, "r", encoding="utf-8") as f:
+        return CableTable(json.load(f)["cables"])
+
+
+def phase_factor(phases):
+    """BZ phase multiplier: 1 for 3 phases, 2 for 2, 6 for 1, 0 otherwise."""
+    phases = np.asarray(phases)
+    factor = np.zeros(phases.shape)
+    for n, f in PHASE_FACTORS.items():
+        factor[phases == n] = f
+    return factor
+
+
+def base_current_kva(phases, voltage=DEFAULT_VOLTAGE):
+    """kVA per ampere for the trecho phase count (denominator of column P)."""
+    phases = np.asarray(phases)
+    return np.select(
+        [phases == 3, phases == 2, phases == 1],
+        [voltage * np.sqrt(3) / 1000, voltage / 1000, voltage / np.sqrt(3) / 1000],
+        default=voltage * np.sqrt(3) / 1000,
+    )
+
+
+def drop_coefficient(table, idx, voltage=DEFAULT_VOLTAGE, temperature=None):
+    """Column BJ: % drop per kVA per metre of three-phase trecho."""
+    r = table.r[idx]
+    if temperature is not None:
+        r = r * (1 + table.alpha[idx] * (np.asarray(temperature, dtype=float) - R_TABLE_TEMP))
+    return np.hypot(r, table.x[idx]) / (voltage ** 2 / 100)
+
+
+def trecho_loads(consumers, kva, fdiv, small_load_rule=False):
+    """
+    Columns K, L and M: load at the end of each trecho.
+    K applies the minimum-load rule (4/8 kVA for 1/2 consumers); M picks K
+    when the sheet's CH5 switch is "SIM" (small_load_rule=True).
+    """
+    consumers = np.asarray(consumers, dtype=float)
+    base = np.asarray(kva, dtype=float) * np.asarray(fdiv, dtype=float)
+    fdiv = np.asarray(fdiv, dtype=float)
+    load_l = base * np.ones_like(consumers)
+    load_k = np.where(consumers > 2, base, np.where(consumers == 2, 8 * fdiv, 4 * fdiv))
+    load_m = load_k if small_load_rule else load_l
+    return load_k, load_l, load_m
+
+
+def sequence_errors(consumers, phases):
+    """Erro 02: zero consumers/phases, or a row with more of either than the row above."""
+    consumers = np.asarray(consumers)
+    phases = np.asarray(phases)
+    error = (consumers == 0) | (phases == 0)
+    error[..., 1:] |= (consumers[..., 1:] > consumers[..., :-1]) | (phases[..., 1:] > phases[..., :-1])
+    return error
+
+
+def compute_qdt(consumers, kva, fdiv, phases, cables, length, parallel=1,
+                small_load_rule=False, voltage=DEFAULT_VOLTAGE, temperature=None,
+                ampacity=None, table=None):
+    """
+    Evaluate the QDT columns for every trecho of a circuit.
+
+    Arrays are ordered from the transformer outwards (sheet rows 13, 14, ...);
+    drops accumulate along the last axis. `temperature` (°C, scalar or array)
+    corrects R from 20 °C; `ampacity` (A per cable) enables the conductor
+    temperature check (Erro 03).
+
+    Returns a dict of arrays: load_k, load_l, load (M), k_drop (BJ), drop (BZ),
+    accumulated_drop (CA), total_drop, error_02, error_05 and, with ampacity,
+    current, cable_temperature and error_03.
+    """
+    table = table or load_cable_table()
+    idx = table.lookup(cables)
+    phases = np.asarray(phases)
+
+    load_k, load_l, load = trecho_loads(consumers, kva, fdiv, small_load_rule)
+    load, phases, idx = np.broadcast_arrays(load, phases, idx)
+
+    k_drop = drop_coefficient(table, idx, voltage, temperature)
+
+    run_length = np.asarray(length, dtype=float) / np.asarray(parallel, dtype=float)
+    drop = load * k_drop * run_length * phase_factor(phases)
+    accumulated = np.cumsum(drop, axis=-1)
+
+    result = {
+        "load_k": load_k,
+        "load_l": load_l,
+        "load": load,
+        "k_drop": k_drop,
+        "drop": drop,
+        "accumulated_drop": accumulated,
+        "total_drop": accumulated[..., -1] if accumulated.shape[-1] else np.zeros(accumulated.shape[:-1]),
+        "error_02": sequence_errors(consumers, phases),
+        "error_05": load < np.asarray(kva, dtype=float) * np.asarray(fdiv, dtype=float),
+    }
+
+    if ampacity is not None:
+        bank_ampacity = np.asarray(ampacity, dtype=float) * np.asarray(parallel, dtype=float)
+        current = load / base_current_kva(phases, voltage)
+        cable_temperature = current / (bank_ampacity / (table.temp_max[idx] - 30)) + 30
+        result["current"] = current
+        result["cable_temperature"] = cable_temperature
+        result["error_03"] = cable_temperature > TEMP_LIMIT
+
+    return result
+
+
+def phase_impedance(table, idx, length, parallel=1, power_factor=None, temperature=None):
+    """
+    Segment impedance (ohm) and the unit current phasors of phases A/B/C.
+    Without `power_factor` the impedance is |Z| with currents in phase with
+    it (the sheet's worst case); with it, R + jX and lagging currents.
+    """
+    r = table.r[idx]
+    if temperature is not None:
+        r = r * (1 + table.alpha[idx] * (np.asarray(temperature, dtype=float) - R_TABLE_TEMP))
+    run_km = np.asarray(length, dtype=float) / np.asarray(parallel, dtype=float) / 1000
+    if power_factor is None:
+        return np.hypot(r, table.x[idx]) * run_km, PHASE_ROTATION
+    return (r + 1j * table.x[idx]) * run_km, PHASE_ROTATION * np.exp(-1j * np.arccos(power_factor))
+
+
+def compute_qdt_unbalanced(consumers, kva, fdiv, phases, cables, length, parallel=1,
+                           small_load_rule=False, phase_kva=None, power_factor=None,
+                           neutral_ratio=1.0, voltage=DEFAULT_VOLTAGE, temperature=None,
+                           table=None):
+    """
+    Per-phase (A/B/C/N) voltage drop of every trecho.
+
+    `phase_kva` (..., n, 3) is the load at the end of each trecho per phase;
+    by default the chosen load (M) is split evenly over the phases the trecho
+    feeds (A; A+B; A+B+C). Without `power_factor` currents are taken in phase
+    with the impedance, the worst case the sheet's |Z| coefficient assumes;
+    with it, R and X act on the lagging current. `neutral_ratio` scales the
+    neutral impedance relative to the phase conductor.
+
+    Returns a dict: phase_current (A, ..., n, 3), neutral_current (A),
+    phase_drop and accumulated_phase_drop (%, ..., n, 3), worst_phase (0-2),
+    worst_drop (%, ..., n) and total_drop (worst phase at the last trecho).
+    """
+    table = table or load_cable_table()
+    idx = table.lookup(cables)
+    phases = np.asarray(phases)
+
+    if phase_kva is None:
+        load = trecho_loads(consumers, kva, fdiv, small_load_rule)[2]
+        load, phases = np.broadcast_arrays(load, phases)
+        connected = CONNECTED_PHASES[np.clip(phases, 0, 3)]
+        share = connected / np.maximum(connected.sum(axis=-1, keepdims=True), 1)
+        phase_kva = [load * share[..., p] for p in range(3)]
+    else:
+        phase_kva = np.asarray(phase_kva, dtype=float)
+        phase_kva = [phase_kva[..., p] for p in range(3)]
+
+    z, rotation = phase_impedance(table, idx, length, parallel, power_factor, temperature)
+
+    # Phase-neutral drop: own current through the phase, return through the
+    # neutral. Phases are kept as separate (..., n) arrays; reductions over a
+    # length-3 last axis would dominate the run time.
+    v_phase = voltage / np.sqrt(3)
+    to_amps = 1000 / v_phase
+    to_pct = 100 / v_phase
+    currents = [phase_kva[p] * (to_amps * rotation[p]) for p in range(3)]
+    neutral = currents[0] + currents[1] + currents[2]
+    return_current = neutral_ratio * neutral
+    phase_drop, accumulated = [], []
+    for p in range(3):
+        dv = z * (currents[p] + return_current)
+        phase_drop.append(np.abs(dv))
+        accumulated.append(np.abs(np.cumsum(dv, axis=-1)))
+    worst_drop = np.maximum(np.maximum(accumulated[0], accumulated[1]), accumulated[2])
+    worst_phase = np.where(accumulated[0] >= worst_drop, 0, np.where(accumulated[1] >= worst_drop, 1, 2))
+
+    phase_current = np.stack(phase_kva, axis=-1) * to_amps
+    worst_drop = worst_drop * to_pct
+    phase_drop = np.stack(phase_drop, axis=-1) * to_pct
+    accumulated = np.stack(accumulated, axis=-1) * to_pct
+
+    return {
+        "phase_current": phase_current,
+        "neutral_current": np.abs(neutral),
+        "phase_drop": phase_drop,
+        "accumulated_phase_drop": accumulated,
+        "worst_phase": worst_phase,
+        "worst_drop": worst_drop,
+        "total_drop": worst_drop[..., -1] if worst_drop.shape[-1] else np.zeros(worst_drop.shape[:-1]),
+    }
+
+
+def main():
+    """Evaluate the sample circuit from the sheet and time a batch of scenarios."""
+    print("=" * 60)
+    print("⚡ CQT Light V3 - QDT Voltage Drop Engine")
+    print("=" * 60)
+
+    table = load_cable_table()
+    print(f"✅ {len(table.names)} cables loaded from {TECHNICAL_DATA_PATH.name}")
+
+    circuit = {
+        "consumers": [12, 9, 6, 3, 1],
+        "kva": [75.0, 58.0, 41.4, 22.0, 8.0],
+        "fdiv": [1.0, 1.0, 1.0, 1.0, 1.0],
+        "phases": [3, 3, 3, 2, 1],
+        "cables": ["185 MMX", "185 MMX", "70 MMX", "70 MMX", "53 QX"],
+        "length": [30, 35, 30, 40, 25],
+    }
+    result = compute_qdt(**circuit, ampacity=[355, 355, 181, 181, 165])
+
+    print(f"\n{'Trecho':<8}{'Cabo':<10}{'Carga kVA':>10}{'Queda %':>10}{'Acum. %':>10}{'Temp °C':>10}")
+    for i, cable in enumerate(circuit["cables"]):
+        print(f"{'P-' + str(i + 1):<8}{cable:<10}{result['load'][i]:>10.2f}"
+              f"{result['drop'][i]:>10.3f}{result['accumulated_drop'][i]:>10.3f}"
+              f"{result['cable_temperature'][i]:>10.1f}")
+    print(f"\n📊 Total drop: {result['total_drop']:.3f}%")
+
+    scenarios = 10_000
+    rng = np.random.default_rng(0)
+    kva = np.asarray(circuit["kva"]) * rng.uniform(0.8, 1.2, size=(scenarios, 1))
+    start = time.perf_counter()
+    batch = compute_qdt(circuit["consumers"], kva, circuit["fdiv"], circuit["phases"],
+                        circuit["cables"], circuit["length"])
+    elapsed = time.perf_counter() - start
+    print(f"📊 {scenarios:,} scenarios in {elapsed * 1000:.1f} ms "
+          f"({elapsed / scenarios * 1e6:.2f} µs/circuit), worst {batch['total_drop'].max():.3f}%")
+
+    start = time.perf_counter()
+    per_phase = compute_qdt_unbalanced(circuit["consumers"], kva, circuit["fdiv"], circuit["phases"],
+                                       circuit["cables"], circuit["length"])
+    elapsed = time.perf_counter() - start
+    print(f"📊 Per-phase mode: {scenarios:,} scenarios in {elapsed * 1000:.1f} ms, worst "
+          f"{per_phase['total_drop'].max():.3f}% (phase {'ABC'[per_phase['worst_phase'][0, -1]]}), "
+          f"neutral up to {per_phase['neutral_current'].max():.0f} A")
+
+
+if __name__ == "__main__":
+    main()
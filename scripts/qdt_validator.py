@@ -0,0 +1,235 @@
+"""
+CQT Light V3 - QDT Rule Validator
+Checks every trecho of many circuits against the QDT sheet's error rules in
+one pass and returns a compact violation table.
+
+Each rule is a predicate over the trecho columns (all circuits concatenated,
+a `circuit` id array separating them). The columns come from
+qdt_engine.compute_qdt, run once over the concatenated trechos and cut back
+into circuits, so the sheet formulas only live in the engine:
+
+    Erro 02   column I: zero consumers/phases, or more than the row above
+    Erro 03   column BY: cable temperature above 90.1 °C
+    Erro 04   column F: missing or non-positive kVA per consumer (provisional:
+              F's formula is not in the dump, so this is inferred)
+    Erro 05   column N: load M below kVA x FDIV
+    Erro 08   column BY: 70 °C cables (QX/DX/TX, $DF$6:$DJ$6) at 70.1 °C or more
+    CARREG    current above the cable ampacity (AN x parallel)
+    QUEDA     accumulated drop (CA) above secondary_network in calculation_logic.json
+
+The sheet summarises I and F with a 20-cell OR() in the headers; here
+the whole project is one boolean matrix (trechos x rules) and the table lists
+its true cells.
+
+Usage:
+    python qdt_validator.py [circuits.json]
+
+circuits.json: [{"id": "CIRC-1", "consumers": [...], "kva": [...], "fdiv": [...],
+"phases": [...], "cables": [...], "length": [...], "parallel": [...]}, ...]
+"""
+
+import argparse
+import json
+import time
+from pathlib import Path
+
+import numpy as np
+
+from qdt_engine import DEFAULT_VOLTAGE, compute_qdt, load_cable_table, sequence_errors
+
+BASE_DIR = Path(__file__).parent.parent
+DATA_DIR = BASE_DIR / "data"
+RULES_PATH = DATA_DIR / "rules" / "calculation_logic.json"
+
+# Column BY flags 70 °C cables from this temperature on (Erro 08)
+TEMP_LIMIT_70 = 70.1
+
+# (code, description, column whose value is reported, predicate over the columns)
+RULES = (
+    ("Erro 02", "sequência de consumidores/fases", "consumers",
+     lambda c: c["sequence_error"]),
+    ("Erro 03", "temperatura do cabo", "cable_temperature",
+     lambda c: ~c["cable_70"] & c["error_03"]),
+    ("Erro 04", "kVA por consumidor (provisória: fórmula da coluna F inferida)", "kva",
+     lambda c: ~(c["kva"] > 0)),
+    ("Erro 05", "carga abaixo de kVA x FDIV", "load",
+     lambda c: c["error_05"]),
+    ("Erro 08", "cabo 70 °C", "cable_temperature",
+     lambda c: c["cable_70"] & (c["cable_temperature"] >= TEMP_LIMIT_70)),
+    ("CARREG", "corrente acima da ampacidade", "loading",
+     lambda c: c["loading"] > 1),
+    ("QUEDA", "queda acumulada acima do limite", "accumulated_drop",
+     lambda c: c["accumulated_drop"] > c["drop_limit"]),
+)
+
+
+def load_validation_rules(path=RULES_PATH):
+    """Drop limit (%) and cable ampacities (A) from calculation_logic.json."""
+    with open(path, "r", encoding="utf-8") as f:
+        rules = json.load(f)
+    return {
+        "drop_limit": rules["voltage_drop_limits"]["secondary_network"] * 100,
+        "ampacity": {c["cable"]: c["capacity_a"]
+                     for c in rules["bt_conductors_multiplexed"] if c.get("cable")},
+    }
+
+
+def flatten_circuits(circuits):
+    """Circuit dicts to concatenated trecho arrays plus the circuit id array."""
+    columns = {key: [] for key in ("consumers", "kva", "fdiv", "phases", "cables", "length", "parallel")}
+    circuit = []
+    for i, c in enumerate(circuits):
+        n = len(c["cables"])
+        circuit.extend([i] * n)
+        for key in columns:
+            value = c.get(key, 1)
+            columns[key].extend(value if isinstance(value, list) else [value] * n)
+    flat = {key: np.asarray(values) for key, values in columns.items()}
+    flat["kva"] = np.array([np.nan if v is None else v for v in columns["kva"]], dtype=float)
+    flat["circuit"] = np.asarray(circuit, dtype=np.intp)
+    return flat
+
+
+def trecho_columns(circuit, consumers, kva, fdiv, phases, cables, length, parallel=1,
+                   ampacity=None, small_load_rule=False, voltage=DEFAULT_VOLTAGE,
+                   drop_limit=None, table=None):
+    """
+    Derived QDT columns for concatenated trechos (circuit ids non-decreasing).
+
+    `ampacity` (A per trecho) defaults to capacity_a of the cable in
+    bt_conductors_multiplexed; trechos with no known ampacity skip the
+    temperature and loading rules.
+    """
+    table = table or load_cable_table()
+    rules = load_validation_rules()
+    idx = table.lookup(cables)
+    circuit = np.asarray(circuit, dtype=np.intp)
+    consumers = np.asarray(consumers, dtype=float)
+    phases = np.asarray(phases)
+    kva = np.asarray(kva, dtype=float)
+    fdiv = np.broadcast_to(np.asarray(fdiv, dtype=float), circuit.shape)
+    parallel = np.broadcast_to(np.asarray(parallel, dtype=float), circuit.shape)
+    if ampacity is None:
+        by_cable = np.array([rules["ampacity"].get(name, np.nan) for name in table.names])
+        ampacity = by_cable[idx]
+
+    first = np.ones(circuit.shape, dtype=bool)
+    first[1:] = circuit[1:] != circuit[:-1]
+    starts = np.flatnonzero(first)
+    counts = np.diff(np.append(starts, len(circuit)))
+
+    # One engine run over every trecho; only the accumulation and the
+    # row-above comparison must not cross circuit boundaries
+    with np.errstate(invalid="ignore"):
+        qdt = compute_qdt(consumers, kva, fdiv, phases, cables, length, parallel,
+                          small_load_rule=small_load_rule, voltage=voltage, ampacity=ampacity, table=table)
+    running = qdt["accumulated_drop"]
+    accumulated = running - np.repeat((running - qdt["drop"])[starts], counts)
+    sequence = qdt["error_02"].copy()
+    sequence[first] = sequence_errors(consumers[first, None], phases[first, None])[:, 0]
+
+    return {
+        "circuit": circuit,
+        "trecho": np.arange(len(circuit)) - np.repeat(starts, counts),
+        "consumers": consumers,
+        "kva": kva,
+        "fdiv": fdiv,
+        "load": qdt["load"],
+        "drop": qdt["drop"],
+        "accumulated_drop": accumulated,
+        "sequence_error": sequence,
+        "error_03": qdt["error_03"],
+        "error_05": qdt["error_05"],
+        "current": qdt["current"],
+        "loading": qdt["current"] / (np.asarray(ampacity, dtype=float) * parallel),
+        "cable_temperature": qdt["cable_temperature"],
+        "cable_70": table.temp_max[idx] <= 70,
+        "drop_limit": rules["drop_limit"] if drop_limit is None else drop_limit,
+    }
+
+
+def validate(columns, rules=RULES):
+    """
+    Evaluate every rule on every trecho.
+
+    Returns the violation table as parallel arrays (circuit, trecho, rule
+    index, reported value), the rule codes, and counts per rule.
+    """
+    with np.errstate(invalid="ignore"):
+        hits = np.column_stack([predicate(columns) for _, _, _, predicate in rules])
+    row, rule = np.nonzero(hits)
+    values = np.column_stack([np.broadcast_to(columns[col], hits.shape[:1]) for _, _, col, _ in rules])
+    return {
+        "circuit": columns["circuit"][row],
+        "trecho": columns["trecho"][row],
+        "rule": rule,
+        "value": values[row, rule].astype(float),
+        "codes": [code for code, _, _, _ in rules],
+        "counts": np.bincount(rule, minlength=len(rules)),
+    }
+
+
+def validate_circuits(circuits, **kwargs):
+    """Violation table for a list of circuit dicts (see the module docstring)."""
+    flat = flatten_circuits(circuits)
+    return validate(trecho_columns(**flat, **kwargs))
+
+
+def sample_circuits(count, rng, table):
+    """Synthetic circuits for the demo run, some breaking the rules."""
+    circuits = []
+    for i in range(count):
+        n = int(rng.integers(1, 21))
+        consumers = np.sort(rng.integers(1, 40, n))[::-1]
+        if rng.random() < 0.05:
+            consumers = rng.integers(0, 40, n)
+        circuits.append({
+            "id": f"CIRC-{i + 1:05d}",
+            "consumers": consumers.tolist(),
+            "kva": rng.uniform(0.5, 30, n).round(2).tolist(),
+            "fdiv": 1.0,
+            "phases": 3,
+            "cables": rng.choice(table.names, n).tolist(),
+            "length": rng.uniform(5, 40, n).round(1).tolist(),
+            "parallel": 1,
+        })
+    return circuits
+
+
+def main():
+    parser = argparse.ArgumentParser(description="QDT rule validator")
+    parser.add_argument("circuits", nargs="?", help="JSON list of circuits (demo data if omitted)")
+    args = parser.parse_args()
+
+    print("=" * 60)
+    print("🔎 CQT Light V3 - QDT Rule Validator")
+    print("=" * 60)
+
+    if args.circuits:
+        with open(args.circuits, "r", encoding="utf-8") as f:
+            circuits = json.load(f)
+    else:
+        circuits = sample_circuits(50_000, np.random.default_rng(0), load_cable_table())
+        print("⚠️ No input file, validating 50,000 synthetic circuits")
+
+    start = time.perf_counter()
+    flat = flatten_circuits(circuits)
+    flattened = time.perf_counter() - start
+    table = validate(trecho_columns(**flat))
+    elapsed = time.perf_counter() - start
+
+    print(f"✅ {len(flat['circuit']):,} trechos in {(elapsed - flattened) * 1000:.0f} ms "
+          f"(+{flattened * 1000:.0f} ms reading the circuits)")
+    print(f"\n{'Regra':<9}{'Trechos':>10}  Descrição")
+    for (code, label, _, _), count in zip(RULES, table["counts"]):
+        print(f"{code:<9}{count:>10,}  {label}")
+
+    print(f"\n📊 {len(np.unique(table['circuit'])):,} of {len(circuits):,} circuits with violations")
+    for k in range(min(10, len(table["rule"]))):
+        circuit = circuits[table["circuit"][k]]
+        print(f"   {circuit.get('id', table['circuit'][k])}  trecho {table['trecho'][k] + 1:<3}"
+              f"{table['codes'][table['rule'][k]]:<9}{table['value'][k]:>10.2f}")
+
+
+if __name__ == "__main__":
+    main()
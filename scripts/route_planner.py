@@ -0,0 +1,258 @@
+"""
+CQT Light V3 - Route to BOM Planner
+Turns MV route alternatives into a costed kit list.
+
+Each route is a sequence of segments {length (m), angle (° deflection at the
+segment's far end), network ("compact" or "conventional")}. Poles are placed
+at every vertex and every max_span_m along each segment
+(medium_voltage_standards in calculation_logic.json); every pole gets a
+structure kit from route_structures:
+
+    tangent   intermediate poles and vertices up to tangent_max_angle
+    angle     vertices up to angle_max_angle
+    special   sharper vertices
+    dead_end  first and last pole of the route
+
+plus the smallest catalog pole that carries the resultant conductor tension
+(pole_mechanics.py). All alternatives are planned as arrays and costed with a
+single query against the Configurator database (kit_composicao x materiais +
+custo_servico), passing the (alternative, kit, quantity) list through
+json_each.
+
+Usage:
+    python route_planner.py [routes.json] [--tension DAN] [--db cqt_light.db]
+
+routes.json: [{"id": "A", "segments": [{"length": 120, "angle": 15, "network": "compact"}, ...]}]
+"""
+
+import argparse
+import json
+import sqlite3
+import time
+from pathlib import Path
+
+import numpy as np
+
+from pole_mechanics import check_poles, load_pole_catalog
+
+BASE_DIR = Path(__file__).parent.parent
+DATA_DIR = BASE_DIR / "data"
+DB_PATH = BASE_DIR / "frontend" / "cqt_light.db"
+RULES_PATH = DATA_DIR / "rules" / "calculation_logic.json"
+KITS_PATH = DATA_DIR / "kits" / "kits.json"
+
+NETWORKS = ("compact", "conventional")
+STRUCTURES = ("tangent", "angle", "special", "dead_end")
+
+COST_QUERY = """
+    WITH plan AS (
+      SELECT json_extract(value, '$[0]') AS alt,
+             json_extract(value, '$[1]') AS kit,
+             json_extract(value, '$[2]') AS qty
+      FROM json_each(?)
+    ),
+    kit_material AS (
+      SELECT kc.codigo_kit, SUM(kc.quantidade * m.preco_unitario) AS total
+      FROM kit_composicao kc
+      JOIN materiais m ON kc.sap = m.sap
+      WHERE kc.codigo_kit IN (SELECT DISTINCT kit FROM plan)
+      GROUP BY kc.codigo_kit
+    )
+    SELECT p.alt,
+           SUM(p.qty * COALESCE(km.total, 0)) AS material,
+           SUM(p.qty * COALESCE(k.custo_servico, 0)) AS servico,
+           SUM(CASE WHEN k.codigo_kit IS NULL THEN 1 ELSE 0 END) AS missing
+    FROM plan p
+    LEFT JOIN kits k ON k.codigo_kit = p.kit
+    LEFT JOIN kit_material km ON km.codigo_kit = p.kit
+    GROUP BY p.alt
+"""
+
+
+def load_route_rules(path=RULES_PATH):
+    """Span limits, angle thresholds and structure kit codes per network type."""
+    with open(path, "r", encoding="utf-8") as f:
+        rules = json.load(f)
+    mv = rules["medium_voltage_standards"]
+    structures = rules["route_structures"]
+    return {
+        "max_span": np.array([mv[f"{n}_network"]["max_span_m"] for n in NETWORKS], dtype=float),
+        "tangent_max_angle": structures["tangent_max_angle"],
+        "angle_max_angle": structures["angle_max_angle"],
+        "pole_min_length": structures["pole_min_length"],
+        "kits": [[structures[f"{n}_network"][s] for s in STRUCTURES] for n in NETWORKS],
+    }
+
+
+def flatten_routes(routes):
+    """Route dicts to per-segment arrays (alternative index, length, angle, network code)."""
+    alt, length, angle, network = [], [], [], []
+    for i, route in enumerate(routes):
+        for segment in route["segments"]:
+            alt.append(i)
+            length.append(float(segment["length"]))
+            angle.append(float(segment.get("angle", 0) or 0))
+            network.append(NETWORKS.index(segment.get("network", "compact")))
+    return np.array(alt, dtype=np.intp), np.array(length), np.array(angle), np.array(network, dtype=np.intp)
+
+
+def plan_routes(alt, length, angle, network, tension=0.0, rules=None):
+    """
+    Place poles and structures for every alternative at once.
+
+    Segments must be grouped by alternative (alt is non-decreasing). Returns
+    {kits (codes), quantities (alternatives x kits), poles, length} where
+    quantities counts structure and pole kits.
+    """
+    rules = rules or load_route_rules()
+    catalog = load_pole_catalog()
+    n_alt = int(alt[-1]) + 1 if len(alt) else 0
+
+    structure_kits = sorted({code for per_network in rules["kits"] for code in per_network})
+    kits = structure_kits + catalog["id"]
+    kit_index = {code: i for i, code in enumerate(kits)}
+    table = np.array([[kit_index[code] for code in per_network] for per_network in rules["kits"]])
+
+    last = np.ones(len(alt), dtype=bool)
+    last[:-1] = alt[1:] != alt[:-1]
+    first = np.ones(len(alt), dtype=bool)
+    first[1:] = alt[1:] != alt[:-1]
+
+    # Spans per segment; intermediate poles are tangent structures
+    spans = np.maximum(np.ceil(length / rules["max_span"][network] - 1e-9), 1).astype(np.int64)
+    tangent = table[network, 0]
+
+    # Far-end vertex structure by deflection; route ends are dead ends
+    deflection = np.abs(angle)
+    kind = np.select([last, deflection <= rules["tangent_max_angle"], deflection <= rules["angle_max_angle"]],
+                     [3, 0, 1], default=2)
+    vertex = table[network, kind]
+    start = table[network[first], 3]
+
+    counts = np.zeros((n_alt, len(kits)))
+    np.add.at(counts, (alt, tangent), spans - 1)
+    np.add.at(counts, (alt, vertex), 1)
+    np.add.at(counts, (np.unique(alt), start), 1)
+
+    # Poles: vertices carry the deflection force, intermediate poles none
+    vertex_angle = np.insert(np.where(last, 0.0, angle), np.flatnonzero(first), 0.0)
+    vertex_alt = np.insert(alt, np.flatnonzero(first), alt[first])
+    poles = check_poles(vertex_angle, np.broadcast_to(tension, vertex_angle.shape), route=vertex_alt,
+                        min_length=rules["pole_min_length"], catalog=catalog)
+    if (poles["pole"] < 0).any():
+        raise ValueError(f"{(poles['pole'] < 0).sum()} vertices exceed every catalog pole")
+    np.add.at(counts, (vertex_alt, len(structure_kits) + poles["pole"]), 1)
+    line_pole = check_poles([0.0], [0.0], dead_end=[False], min_length=rules["pole_min_length"],
+                            catalog=catalog)["pole"][0]
+    np.add.at(counts, (alt, len(structure_kits) + line_pole), spans - 1)
+
+    return {
+        "kits": kits,
+        "quantities": counts,
+        "poles": counts[:, len(structure_kits):].sum(axis=1).astype(np.int64),
+        "length": np.bincount(alt, weights=length, minlength=n_alt),
+    }
+
+
+def open_catalog(db_path=DB_PATH):
+    """
+    The Configurator database, or an in-memory copy of kits.json compositions
+    (no prices) when the database has not been seeded yet.
+    """
+    if Path(db_path).exists():
+        conn = sqlite3.connect(db_path)
+        tables = {r[0] for r in conn.execute("SELECT name FROM sqlite_master WHERE type = 'table'")}
+        if {"kits", "kit_composicao", "materiais"} <= tables:
+            return conn
+        conn.close()
+
+    print(f"⚠️ {db_path} is not seeded; costing from kits.json without prices")
+    conn = sqlite3.connect(":memory:")
+    conn.executescript("""
+        CREATE TABLE materiais (sap TEXT PRIMARY KEY, descricao TEXT, unidade TEXT, preco_unitario REAL DEFAULT 0);
+        CREATE TABLE kits (codigo_kit TEXT PRIMARY KEY, descricao_kit TEXT, codigo_servico TEXT, custo_servico REAL DEFAULT 0);
+        CREATE TABLE kit_composicao (codigo_kit TEXT, sap TEXT, quantidade REAL DEFAULT 1);
+    """)
+    with open(KITS_PATH, "r", encoding="utf-8") as f:
+        kits = json.load(f)
+    conn.executemany("INSERT INTO kits (codigo_kit, descricao_kit) VALUES (?, ?)",
+                     [(code, data.get("name", code)) for code, data in kits.items()])
+    conn.executemany("INSERT INTO kit_composicao VALUES (?, ?, ?)",
+                     [(code, str(m["sap"]), float(m.get("qty", 1) or 1))
+                      for code, data in kits.items() for m in data.get("materials", []) if m.get("sap")])
+    return conn
+
+
+def cost_plans(plan, conn):
+    """Material, service and total cost per alternative in one query."""
+    quantities = plan["quantities"]
+    rows, cols = np.nonzero(quantities)
+    payload = json.dumps([[int(a), plan["kits"][k], float(quantities[a, k])] for a, k in zip(rows, cols)])
+    n_alt = quantities.shape[0]
+    material, servico, missing = np.zeros(n_alt), np.zeros(n_alt), np.zeros(n_alt, dtype=np.int64)
+    for alt, mat, serv, miss in conn.execute(COST_QUERY, (payload,)):
+        material[alt], servico[alt], missing[alt] = mat, serv, miss
+    return {"material": material, "servico": servico, "total": material + servico, "missing": missing}
+
+
+def bill_of_materials(plan, alternative):
+    """[(kit code, quantity)] of one alternative."""
+    row = plan["quantities"][alternative]
+    return [(plan["kits"][k], float(row[k])) for k in np.flatnonzero(row)]
+
+
+def sample_routes(count, rng):
+    """Synthetic alternatives for the demo run."""
+    routes = []
+    for i in range(count):
+        n = int(rng.integers(2, 12))
+        routes.append({
+            "id": f"ALT-{i + 1:04d}",
+            "segments": [{"length": round(float(rng.uniform(30, 400)), 1),
+                          "angle": round(float(rng.exponential(12)), 1),
+                          "network": str(rng.choice(NETWORKS, p=[0.7, 0.3]))} for _ in range(n)],
+        })
+    return routes
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Route to BOM planner")
+    parser.add_argument("routes", nargs="?", help="JSON list of route alternatives (demo data if omitted)")
+    parser.add_argument("--tension", type=float, default=0.0, help="Conductor tension per vertex (daN)")
+    parser.add_argument("--db", default=str(DB_PATH))
+    args = parser.parse_args()
+
+    print("=" * 60)
+    print("🗺️ CQT Light V3 - Route to BOM Planner")
+    print("=" * 60)
+
+    if args.routes:
+        with open(args.routes, "r", encoding="utf-8") as f:
+            routes = json.load(f)
+    else:
+        routes = sample_routes(2_000, np.random.default_rng(0))
+        print("⚠️ No input file, planning 2,000 synthetic alternatives")
+
+    conn = open_catalog(args.db)
+    start = time.perf_counter()
+    plan = plan_routes(*flatten_routes(routes), tension=args.tension)
+    planned = time.perf_counter() - start
+    costs = cost_plans(plan, conn)
+    elapsed = time.perf_counter() - start
+    conn.close()
+
+    print(f"✅ {len(routes):,} alternatives planned in {planned * 1000:.0f} ms, "
+          f"costed in {(elapsed - planned) * 1000:.0f} ms")
+    if costs["missing"].any():
+        print(f"⚠️ {costs['missing'].sum():,} kit lines not found in the catalog")
+
+    order = np.lexsort((plan["poles"], costs["total"]))
+    for a in order[:5]:
+        print(f"\n📊 {routes[a].get('id', a)}: {plan['length'][a]:,.0f} m, {plan['poles'][a]} postes, "
+              f"R$ {costs['total'][a]:,.2f}")
+        for kit, qty in bill_of_materials(plan, a):
+            print(f"   {kit:<10} x{qty:g}")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,10 +1,14 @@
 """
 CQT Light V3 - Complete Data Seeder
-Seeds the new simplified schema with materials, kits, and servicos_cm.
+Seeds the new simplified schema with materials, kits, and servicos_cm,
+and emits the prebuilt search-index artifact loaded by the Electron app.
 """
 
+import hashlib
 import json
+import re
 import sqlite3
+import unicodedata
 from pathlib import Path
 
 try:
@@ -18,6 +22,10 @@ BASE_DIR = Path(__file__).parent.parent
 DB_PATH = BASE_DIR / "frontend" / "cqt_light.db"
 DATA_DIR = BASE_DIR / "data"
 XLSM_DIR = BASE_DIR / "PLANILHA CUSTO MODULAR"
+SEARCH_INDEX_PATH = BASE_DIR / "frontend" / "cqt_light.search.json"
+
+# Bump when the artifact layout changes (must match electron/db/searchIndex.cjs)
+SEARCH_INDEX_FORMAT = 1
 
 def create_schema(conn):
     """Create fresh tables."""
@@ -30,6 +38,7 @@ def create_schema(conn):
     cursor.execute("DROP TABLE IF EXISTS kits")
     cursor.execute("DROP TABLE IF EXISTS materiais")
     cursor.execute("DROP TABLE IF EXISTS servicos_cm")
+    cursor.execute("DROP TABLE IF EXISTS meta")
     conn.commit()
     
     # Create new schema
@@ -62,6 +71,11 @@ def create_schema(conn):
       UNIQUE(codigo_kit, sap)
     );
 
+    CREATE TABLE meta (
+      key TEXT PRIMARY KEY,
+      value TEXT
+    );
+
     CREATE INDEX idx_kit_composicao_kit ON kit_composicao(codigo_kit);
     CREATE INDEX idx_kit_composicao_sap ON kit_composicao(sap);
     """
@@ -210,6 +224,76 @@ def import_servicos(conn):
     return count
 
 
+def tokenize(text):
+    """Uppercase, accent-free alphanumeric tokens (same rules as searchIndex.cjs)."""
+    nfd = unicodedata.normalize('NFD', str(text or ''))
+    plain = re.sub('[\u0300-\u036f]', '', nfd).upper()
+    return re.findall(r'[A-Z0-9]+', plain)
+
+
+def build_collection(rows):
+    """
+    Index one catalog collection given (code, description) rows.
+    Doc ids are positions in the sorted code list, so the code list doubles as
+    a flattened prefix trie (a prefix is a contiguous range found by bisection)
+    and postings in doc-id order come out sorted by code.
+    """
+    rows = sorted((str(code), desc or '') for code, desc in rows)
+    codes = [code for code, _ in rows]
+
+    postings = {}
+    for doc_id, (code, desc) in enumerate(rows):
+        for token in set(tokenize(desc)) | set(tokenize(code)):
+            postings.setdefault(token, []).append(doc_id)
+
+    tokens = sorted(postings)
+    encoded = []
+    for token in tokens:
+        # Delta-encode doc ids to keep the artifact compact
+        ids = postings[token]
+        encoded.append([ids[0]] + [b - a for a, b in zip(ids, ids[1:])])
+
+    return {"codes": codes, "tokens": tokens, "postings": encoded}
+
+
+def build_search_index(conn, path=SEARCH_INDEX_PATH):
+    """
+    Build the typeahead index for materials and kits and stamp the database
+    with the catalog version the artifact belongs to. The app discards the
+    artifact whenever meta.catalog_version no longer matches.
+    """
+    cursor = conn.cursor()
+    cursor.execute("SELECT sap, descricao FROM materiais")
+    materials = build_collection(cursor.fetchall())
+    cursor.execute("SELECT codigo_kit, descricao_kit FROM kits")
+    kits = build_collection(cursor.fetchall())
+
+    digest = hashlib.sha1()
+    for collection in (materials, kits):
+        digest.update("\x1f".join(collection["codes"]).encode('utf-8'))
+        digest.update("\x1f".join(collection["tokens"]).encode('utf-8'))
+    catalog_version = f"seed-{digest.hexdigest()[:16]}"
+
+    cursor.execute("""
+        INSERT OR REPLACE INTO meta (key, value) VALUES ('catalog_version', ?)
+    """, (catalog_version,))
+    conn.commit()
+
+    artifact = {
+        "format": SEARCH_INDEX_FORMAT,
+        "catalog_version": catalog_version,
+        "materials": materials,
+        "kits": kits,
+    }
+    with open(path, 'w', encoding='utf-8') as f:
+        json.dump(artifact, f, ensure_ascii=False, separators=(',', ':'))
+
+    size_kb = Path(path).stat().st_size / 1024
+    print(f"✅ Search index written: {Path(path).name} "
+          f"({len(materials['tokens']):,} + {len(kits['tokens']):,} tokens, {size_kb:,.0f} KB)")
+    return catalog_version
+
+
 def main():
     print("=" * 60)
     print("CQT Light V3 - Data Seeder")
@@ -227,6 +311,7 @@ def main():
     import_materials(conn)
     import_kits(conn)
     import_servicos(conn)
+    build_search_index(conn)
     
     # Stats
     cursor = conn.cursor()
@@ -0,0 +1,210 @@
+"""
+CQT Light V3 - Service Drop Checker
+Validates ramais (service drops) in bulk: conductor ampacity, derated by the
+ambient temperature band, and voltage drop against the service_drop limit.
+
+Ampacities come from the 'Ramais' sheet dump (data/ramais_raw.json, the
+"Ampacidade dos Condutores de Ramais de BT (A)" block); temperature bands and
+the drop limit from data/rules/calculation_logic.json. Conductor R/X come from
+technical_data.json when the cable is there; otherwise R is derived from the
+section (copper for CC, aluminium otherwise) at the conductor's maximum
+temperature, like column AX of the QDT sheet.
+
+Every lookup is an array operation, so one call checks any number of ramais.
+"""
+
+import json
+import math
+import re
+import time
+from functools import lru_cache
+from pathlib import Path
+
+import numpy as np
+
+from qdt_engine import (ALPHA_AL, ALPHA_CU, DEFAULT_VOLTAGE, TEMP_LIMIT_SUFFIXES,
+                        TEMP_MAX_DEFAULT, base_current_kva, load_cable_table, phase_factor)
+
+BASE_DIR = Path(__file__).parent.parent
+DATA_DIR = BASE_DIR / "data"
+RAMAIS_PATH = DATA_DIR / "ramais_raw.json"
+RULES_PATH = DATA_DIR / "rules" / "calculation_logic.json"
+
+# Resistivity at 20 °C in ohm.mm²/km (column DC of the QDT sheet uses 17.241 for copper)
+RESISTIVITY_CU = 17.241
+RESISTIVITY_AL = 28.264
+
+# Reactance assumed for service conductors not in technical_data.json (ohm/km)
+SERVICE_REACTANCE = 0.1
+
+# Phases fed by each conductor type; CC (concentric) ramais are single-phase by default
+CONDUCTOR_PHASES = {"DX": 1, "TX": 2, "QX": 3, "MMX": 3, "CC": 1}
+
+
+def _is_blank(value):
+    return value is None or (isinstance(value, float) and math.isnan(value))
+
+
+def _find_row(rows, label):
+    for i, row in enumerate(rows):
+        if any(isinstance(v, str) and v.strip() == label for v in row):
+            return i
+    raise ValueError(f"Row '{label}' not found in the Ramais sheet")
+
+
+class RamalTable:
+    """Service conductors as parallel arrays: ampacity, R, X, phases, material."""
+
+    def __init__(self, rows, cables=None):
+        cables = cables or load_cable_table()
+        header = _find_row(rows, "Condutor")
+        loading = _find_row(rows, "Carregamento")
+        label_col = rows[header].index("Condutor")
+
+        names, kinds, gauges, ampacity = [], [], [], []
+        for col in range(label_col + 1, len(rows[header])):
+            size, kind, amps = rows[header][col], rows[header + 1][col], rows[loading][col]
+            if _is_blank(size) or _is_blank(amps):
+                continue
+            size = str(int(size)) if isinstance(size, float) and size.is_integer() else str(size)
+            if " " in size:
+                size, suffix = size.split(" ", 1)
+                names.append(f"{size} {suffix}")
+                kinds.append(suffix)
+                gauges.append(None if _is_blank(kind) else str(kind))
+            else:
+                names.append(f"{size} {kind}")
+                kinds.append(str(kind))
+                gauges.append(None)
+            ampacity.append(float(amps))
+
+        self.names = names
+        self.index = {name: i for i, name in enumerate(names)}
+        self.gauge = gauges
+        self.ampacity = np.array(ampacity)
+        self.section = np.array([float(re.match(r"[\d.]+", n).group()) for n in names])
+        self.copper = np.array([k == "CC" for k in kinds])
+        self.phases = np.array([CONDUCTOR_PHASES.get(k, 1) for k in kinds])
+        self.temp_max = np.array([TEMP_LIMIT_SUFFIXES.get(k, TEMP_MAX_DEFAULT) for k in kinds])
+
+        # R/X: technical_data.json when listed, else from resistivity at Tmax
+        known = np.array([cables.index.get(n, -1) for n in names])
+        alpha = np.where(self.copper, ALPHA_CU, ALPHA_AL)
+        r20 = np.where(self.copper, RESISTIVITY_CU, RESISTIVITY_AL) / self.section
+        self.r = np.where(known >= 0, cables.r[known], r20 * (1 + alpha * (self.temp_max - 20)))
+        self.x = np.where(known >= 0, cables.x[known], SERVICE_REACTANCE)
+        self.from_table = known >= 0
+
+    def lookup(self, conductors):
+        """Conductor names (or indexes) to an integer index array."""
+        conductors = np.asarray(conductors)
+        if conductors.dtype.kind in "iu":
+            return conductors.astype(np.intp)
+        idx = np.array([self.index.get(str(c).strip(), -1) for c in conductors.ravel()],
+                       dtype=np.intp).reshape(conductors.shape)
+        if (idx < 0).any():
+            unknown = sorted({str(c) for c, i in zip(conductors.ravel(), idx.ravel()) if i < 0})
+            raise KeyError(f"Unknown ramal conductor(s): {', '.join(unknown)}")
+        return idx
+
+
+@lru_cache(maxsize=None)
+def load_ramal_table(path=RAMAIS_PATH):
+    """Load (once) the service conductor table from the Ramais sheet dump."""
+    with open(path, "r", encoding="utf-8") as f:
+        return RamalTable(json.load(f))
+
+
+@lru_cache(maxsize=None)
+def load_service_rules(path=RULES_PATH):
+    """Temperature bands (upper edges, factors) and the service drop limit (%)."""
+    with open(path, "r", encoding="utf-8") as f:
+        rules = json.load(f)
+    bands = []
+    for key, factor in rules["temperature_factors"].items():
+        numbers = [int(n) for n in re.findall(r"\d+", key)]
+        upper = math.inf if key.endswith("plus") else numbers[-1]
+        bands.append((upper, factor))
+    bands.sort()
+    return {
+        "temp_edges": np.array([upper for upper, _ in bands[:-1]], dtype=float),
+        "temp_factors": np.array([factor for _, factor in bands]),
+        "drop_limit": rules["voltage_drop_limits"]["service_drop"] * 100,
+    }
+
+
+def temperature_factor(temperature, rules=None):
+    """Ampacity factor of the band each ambient temperature (°C) falls in."""
+    rules = rules or load_service_rules()
+    band = np.searchsorted(rules["temp_edges"], np.asarray(temperature, dtype=float), side="left")
+    return rules["temp_factors"][band]
+
+
+def check_service_drops(conductors, length, load, temperature, phases=None,
+                        voltage=DEFAULT_VOLTAGE, drop_limit=None, table=None):
+    """
+    Check many ramais at once.
+
+    `load` is in kVA, `length` in metres, `temperature` the ambient °C;
+    `phases` defaults to the conductor type (DX 1, TX 2, QX 3, CC 1).
+    Returns a dict of arrays: current, ampacity (derated), loading, drop (%),
+    error_ampacity, error_drop and ok.
+    """
+    table = table or load_ramal_table()
+    rules = load_service_rules()
+    drop_limit = rules["drop_limit"] if drop_limit is None else drop_limit
+
+    idx = table.lookup(conductors)
+    phases = table.phases[idx] if phases is None else np.asarray(phases)
+    load = np.asarray(load, dtype=float)
+
+    current = load / base_current_kva(phases, voltage)
+    ampacity = table.ampacity[idx] * temperature_factor(temperature, rules)
+    k_drop = np.hypot(table.r[idx], table.x[idx]) / (voltage ** 2 / 100)
+    drop = load * k_drop * np.asarray(length, dtype=float) * phase_factor(phases)
+
+    error_ampacity = current > ampacity
+    error_drop = drop > drop_limit
+    return {
+        "current": current,
+        "ampacity": ampacity,
+        "loading": current / ampacity,
+        "drop": drop,
+        "error_ampacity": error_ampacity,
+        "error_drop": error_drop,
+        "ok": ~(error_ampacity | error_drop),
+    }
+
+
+def main():
+    """Print the conductor table and check a large batch of random ramais."""
+    print("=" * 60)
+    print("🏠 CQT Light V3 - Service Drop Checker")
+    print("=" * 60)
+
+    table = load_ramal_table()
+    rules = load_service_rules()
+    print(f"✅ {len(table.names)} service conductors, drop limit {rules['drop_limit']:.1f}%")
+    print(f"\n{'Condutor':<10}{'A':>6}{'R Ω/km':>9}{'X Ω/km':>9}{'Fases':>7}  Origem")
+    for i, name in enumerate(table.names):
+        source = "technical_data" if table.from_table[i] else "resistividade"
+        print(f"{name:<10}{table.ampacity[i]:>6.0f}{table.r[i]:>9.4f}{table.x[i]:>9.4f}"
+              f"{table.phases[i]:>7}  {source}")
+
+    count = 1_000_000
+    rng = np.random.default_rng(0)
+    conductors = rng.integers(0, len(table.names), count)
+    length = rng.uniform(5, 40, count)
+    load = rng.uniform(0.5, 15, count)
+    temperature = rng.uniform(20, 42, count)
+
+    start = time.perf_counter()
+    result = check_service_drops(conductors, length, load, temperature)
+    elapsed = time.perf_counter() - start
+    print(f"\n📊 {count:,} ramais in {elapsed * 1000:.0f} ms: {result['ok'].sum():,} OK, "
+          f"{result['error_drop'].sum():,} above {rules['drop_limit']:.1f}%, "
+          f"{result['error_ampacity'].sum():,} above ampacity")
+
+
+if __name__ == "__main__":
+    main()
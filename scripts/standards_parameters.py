@@ -0,0 +1,268 @@
+"""
+CQT Light V3 - Standards Parameter Extraction
+Typed design parameters from the Padrões PDFs, and the rules they feed.
+
+Each entry of PARAMETERS is a regex over one line of page text that yields a
+number with a fixed unit:
+
+    span              m     VÃO ... 40 m
+    max_span          m     VÃO MÁXIMO ... 40 m
+    transformer_kva   kVA   75 kVA, 112,5 kVA, 1.000 kVA
+    voltage_kv        kV    13,8 kV (not the second value of a rating
+                            such as 0,6/1 kV)
+    traction_dan      daN   TRAÇÃO ... 300 daN
+
+Rows (parameter, value, unit, page, context) are cached per document in
+data/standards/parameters.db, keyed by the content hash from the page cache
+and a hash of the patterns, so a run over the library only parses revised
+standards (or everything, once, after a pattern changes).
+
+rebuild_rules() checks the rows of each standard referenced in
+medium_voltage_standards (calculation_logic.json) against its max_span_m,
+voltage_levels_kv (nominal MV levels only) and standard_kva_ratings. Values
+found in the standard are added to the curated lists, curated values it does
+not mention are reported as unconfirmed but kept, and the notes are left to
+the reviewer. The script prints the resulting diff of the rules file;
+--apply writes it.
+
+Usage:
+    python standards_parameters.py [folder] [--apply] [--workers N]
+"""
+
+import argparse
+import difflib
+import hashlib
+import json
+import re
+import sqlite3
+import time
+from pathlib import Path
+
+from pdf_pages import CACHE_PATH, PADROES_DIR, file_hashes, find_pdfs, load_pages, open_cache
+
+BASE_DIR = Path(__file__).parent.parent
+DATA_DIR = BASE_DIR / "data"
+RULES_PATH = DATA_DIR / "rules" / "calculation_logic.json"
+PARAMETERS_PATH = DATA_DIR / "standards" / "parameters.db"
+
+# 1.000 / 1.500,5 (dot as thousands separator) before 13,8 / 13.8 / 750
+NUMBER = r"(\d{1,3}(?:\.\d{3})+(?:,\d{1,2})?(?![.\d])|\d{1,4}(?:[.,]\d{1,2})?)"
+THOUSANDS = re.compile(r"\d{1,3}(?:\.\d{3})+(?:,\d+)?")
+
+# (parameter, unit, pattern with the value as its first group)
+PARAMETERS = (
+    ("span", "m", re.compile(r"V[ÃA]O(?!\s+M[ÁA]X)\D{0,40}?" + NUMBER + r"\s*m\b", re.IGNORECASE)),
+    ("max_span", "m", re.compile(r"V[ÃA]O\s+M[ÁA]XIMO\D{0,40}?" + NUMBER + r"\s*m\b", re.IGNORECASE)),
+    ("transformer_kva", "kVA", re.compile(r"\b" + NUMBER + r"\s?kVA\b", re.IGNORECASE)),
+    ("voltage_kv", "kV", re.compile(r"(?<![\d.,/])" + NUMBER + r"\s?kV\b", re.IGNORECASE)),
+    ("traction_dan", "daN", re.compile(r"TRA[ÇC][ÃA]O\D{0,40}?" + NUMBER + r"\s?daN\b", re.IGNORECASE)),
+)
+
+# Cached rows are only reused by the same set of patterns
+EXTRACTOR_VERSION = hashlib.sha1(
+    repr([(name, unit, p.pattern, p.flags) for name, unit, p in PARAMETERS]).encode("utf-8")).hexdigest()[:12]
+
+CONTEXT_CHARS = 200
+
+# Plausible ranges for the values that reach the rules
+SPAN_RANGE = (10, 500)
+KVA_RANGE = (5, 3000)
+
+# Nominal distribution voltages (kV); other kV figures are equipment or cable ratings
+NOMINAL_MV_KV = (11.4, 13.2, 13.8, 22, 23.1, 34.5)
+
+SCHEMA = """
+    CREATE TABLE IF NOT EXISTS documents (
+        file_hash TEXT PRIMARY KEY, extractor TEXT
+    );
+    CREATE TABLE IF NOT EXISTS parameters (
+        file_hash TEXT, parameter TEXT, value REAL, unit TEXT, page INTEGER, context TEXT
+    );
+    CREATE INDEX IF NOT EXISTS idx_parameters_hash ON parameters(file_hash);
+"""
+
+
+def parse_number(text):
+    """'112,5' -> 112.5, '1.000' -> 1000; integral values come back as int."""
+    if THOUSANDS.fullmatch(text):
+        text = text.replace(".", "")
+    value = float(text.replace(",", "."))
+    return int(value) if value.is_integer() else value
+
+
+def parse_parameters(pages):
+    """Typed (parameter, value, unit, page, context) rows of one document's page texts."""
+    rows = []
+    for i, text in enumerate(pages):
+        for line in text.splitlines():
+            context = None
+            for name, unit, pattern in PARAMETERS:
+                for match in pattern.finditer(line):
+                    context = context or " ".join(line.split())[:CONTEXT_CHARS]
+                    rows.append((name, parse_number(match.group(1)), unit, i + 1, context))
+    return rows
+
+
+def open_parameters(cache_path=PARAMETERS_PATH):
+    """Open (creating if needed) the per-document parameter cache."""
+    Path(cache_path).parent.mkdir(parents=True, exist_ok=True)
+    conn = sqlite3.connect(cache_path)
+    conn.executescript(SCHEMA)
+    return conn
+
+
+def extract_parameters(paths, cache_path=PARAMETERS_PATH, page_cache=CACHE_PATH, workers=None, stats=None):
+    """
+    Parameter rows of many PDFs, as dicts with parameter, value, unit,
+    document (path), page and context.
+
+    Documents whose content and patterns are unchanged come from the cache;
+    the rest are parsed from the page cache (extracting new pages first).
+    `stats`, when a dict, receives documents/parsed/rows counts.
+    """
+    hashes = file_hashes(paths, page_cache, workers)
+    conn = open_parameters(cache_path)
+    done = {digest for digest, in conn.execute(
+        "SELECT file_hash FROM documents WHERE extractor = ?", (EXTRACTOR_VERSION,))}
+    todo = sorted(set(hashes.values()) - done)
+
+    if todo:
+        pages = open_cache(page_cache)
+        for digest in todo:
+            rows = parse_parameters(load_pages(pages, digest))
+            conn.execute("DELETE FROM parameters WHERE file_hash = ?", (digest,))
+            conn.executemany("INSERT INTO parameters VALUES (?, ?, ?, ?, ?, ?)",
+                             [(digest, *row) for row in rows])
+            conn.execute("INSERT OR REPLACE INTO documents VALUES (?, ?)", (digest, EXTRACTOR_VERSION))
+        conn.commit()
+        pages.close()
+
+    by_hash = {}
+    for digest in set(hashes.values()):
+        by_hash[digest] = conn.execute(
+            "SELECT parameter, value, unit, page, context FROM parameters WHERE file_hash = ? "
+            "ORDER BY page, rowid", (digest,)).fetchall()
+    conn.close()
+
+    result = [{"parameter": name, "value": int(value) if value.is_integer() else value, "unit": unit,
+               "document": path, "page": page, "context": context}
+              for path, digest in hashes.items() for name, value, unit, page, context in by_hash[digest]]
+    if stats is not None:
+        stats.update(documents=len(hashes), parsed=len(todo), rows=len(result))
+    return result
+
+
+def _values(rows, parameter, bounds):
+    lo, hi = bounds
+    return [r["value"] for r in rows if r["parameter"] == parameter and lo <= r["value"] <= hi]
+
+
+def rebuild_rules(rows, rules):
+    """
+    medium_voltage_standards values from the parameter rows of each section's
+    reference_file. Lists only grow: found values are merged into the curated
+    ones, never replace them. max_span_m only comes from VÃO MÁXIMO rows.
+    Returns (updated rules, list of (section, key, old, new), list of
+    (section, key, values, reason) left for the reviewer: curated values the
+    standard does not mention, and plain spans that were not applied).
+    Sections whose standard is not among the rows are left as they are.
+    """
+    updated = json.loads(json.dumps(rules))
+    by_file = {}
+    for r in rows:
+        by_file.setdefault(Path(r["document"]).name, []).append(r)
+
+    changes, unconfirmed = [], []
+
+    def assign(section, key, value):
+        if value != updated["medium_voltage_standards"][section].get(key):
+            changes.append((section, key, updated["medium_voltage_standards"][section].get(key), value))
+            updated["medium_voltage_standards"][section][key] = value
+
+    def merge(section, key, found):
+        curated = rules["medium_voltage_standards"][section][key]
+        missing = [v for v in curated if v not in found]
+        if missing:
+            unconfirmed.append((section, key, missing, "not found in the standard (kept)"))
+        assign(section, key, sorted(set(curated) | set(found)))
+
+    for section, entry in rules["medium_voltage_standards"].items():
+        found = by_file.get(entry.get("reference_file"))
+        if not found:
+            continue
+        if "max_span_m" in entry:
+            spans = _values(found, "max_span", SPAN_RANGE)
+            if spans:
+                assign(section, "max_span_m", max(spans))
+            else:
+                plain = sorted(set(_values(found, "span", SPAN_RANGE)))
+                if plain and entry["max_span_m"] not in plain:
+                    unconfirmed.append((section, "max_span_m", plain, "spans without VÃO MÁXIMO (not applied)"))
+        if "voltage_levels_kv" in entry:
+            levels = {r["value"] for r in found
+                      if r["parameter"] == "voltage_kv" and r["value"] in NOMINAL_MV_KV}
+            if levels:
+                merge(section, "voltage_levels_kv", levels)
+        if "standard_kva_ratings" in entry:
+            ratings = set(_values(found, "transformer_kva", KVA_RANGE))
+            if ratings:
+                merge(section, "standard_kva_ratings", ratings)
+    return updated, changes, unconfirmed
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Standards parameter extraction")
+    parser.add_argument("folder", nargs="?", default=str(PADROES_DIR))
+    parser.add_argument("--apply", action="store_true", help=f"Write the rebuilt rules to {RULES_PATH.name}")
+    parser.add_argument("--workers", type=int, default=None)
+    args = parser.parse_args()
+
+    print("=" * 60)
+    print("📐 CQT Light V3 - Standards Parameter Extraction")
+    print("=" * 60)
+
+    paths = find_pdfs(args.folder)
+    if not paths:
+        print(f"⚠️ No PDFs found in {args.folder}")
+        return
+
+    stats = {}
+    start = time.perf_counter()
+    rows = extract_parameters(paths, workers=args.workers, stats=stats)
+    elapsed = time.perf_counter() - start
+    print(f"✅ {stats['rows']:,} parameter rows from {stats['documents']} documents "
+          f"({stats['parsed']} parsed, {stats['documents'] - stats['parsed']} cached) in {elapsed * 1000:.0f} ms")
+
+    counts = {}
+    for r in rows:
+        counts[r["parameter"]] = counts.get(r["parameter"], 0) + 1
+    for name, unit, _ in PARAMETERS:
+        print(f"   {name:<16}{unit:<5}{counts.get(name, 0):>7,}")
+
+    with open(RULES_PATH, "r", encoding="utf-8") as f:
+        rules = json.load(f)
+    updated, changes, unconfirmed = rebuild_rules(rows, rules)
+    print(f"\n📊 {len(changes)} rule changes")
+    for section, key, old, new in changes:
+        print(f"   {section}.{key}: {old} -> {new}")
+    for section, key, values, reason in unconfirmed:
+        print(f"   ⚠️ {section}.{key}: {values} {reason}")
+
+    if changes:
+        old_text = json.dumps(rules, indent=4, ensure_ascii=False)
+        new_text = json.dumps(updated, indent=4, ensure_ascii=False)
+        print()
+        for line in difflib.unified_diff(old_text.splitlines(), new_text.splitlines(),
+                                         str(RULES_PATH.name), str(RULES_PATH.name), lineterm=""):
+            print(line)
+
+    if args.apply and changes:
+        with open(RULES_PATH, "w", encoding="utf-8") as f:
+            f.write(new_text)
+        print(f"✅ Rules written to {RULES_PATH} (review the notes of the changed sections)")
+    elif changes:
+        print("   (review the diff, then run with --apply to write it)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,315 @@
+"""
+CQT Light V3 - Standards Full-Text Search
+Page-level inverted index over the Padrões PDFs, ranked by BM25.
+
+Page texts come from the page cache (pdf_pages.py) and go into an SQLite
+FTS4 table, one row per non-empty page with its document id and page number,
+tokenized with unicode61 and diacritics removed, so "vao" finds "VÃO" and
+"tracao" finds "TRAÇÃO". FTS4 rather than FTS5 because the Electron app
+opens the same file with sql.js, which is built with FTS3/FTS4 only; BM25 is
+computed from matchinfo('pcnalx') by a bm25() SQL function registered on
+both sides (standardsSearch.cjs mirrors it).
+
+Every 6-digit SAP code on a page is also recorded in sap_references with
+its page and line of context, indexed by code, so "which standards specify
+this material" is a lookup; material_standards() and kit_standards() join it
+to materiais and kit_composicao in cqt_light.db.
+
+Documents are keyed by their path below Padrões and remember the content
+hash they were indexed from: a rebuild only re-indexes (pages and SAP
+references) new or changed PDFs and drops the rows of removed ones.
+
+Usage:
+    python standards_search.py --build [folder]     (re)index the library
+    python standards_search.py vão livre [--limit N]
+    python standards_search.py --sap 309245
+    python standards_search.py --kit 13N1
+"""
+
+import argparse
+import math
+import os
+import re
+import sqlite3
+import struct
+import time
+from pathlib import Path
+
+from pdf_pages import CACHE_PATH, PADROES_DIR, extract_pages, file_hashes, find_pdfs
+
+BASE_DIR = Path(__file__).parent.parent
+INDEX_PATH = BASE_DIR / "frontend" / "cqt_light.standards.db"
+CATALOG_PATH = BASE_DIR / "frontend" / "cqt_light.db"
+
+# Bump when the index layout changes (must match electron/db/standardsSearch.cjs)
+STANDARDS_INDEX_FORMAT = 2
+
+BM25_K1 = 1.2
+BM25_B = 0.75
+SNIPPET_TOKENS = 12
+CONTEXT_CHARS = 200
+
+# SAP material codes in the standards are 6-digit numbers
+SAP_PATTERN = re.compile(r"\b\d{6}\b")
+
+SCHEMA = """
+    CREATE TABLE IF NOT EXISTS documents (
+        id INTEGER PRIMARY KEY, path TEXT UNIQUE, title TEXT, file_hash TEXT, page_count INTEGER
+    );
+    CREATE VIRTUAL TABLE IF NOT EXISTS pages USING fts4(
+        text, document, page, notindexed=document, notindexed=page,
+        tokenize=unicode61 "remove_diacritics=1"
+    );
+    CREATE TABLE IF NOT EXISTS sap_references (
+        sap TEXT, document INTEGER, page INTEGER, context TEXT
+    );
+    CREATE INDEX IF NOT EXISTS idx_sap_references_sap ON sap_references(sap, document, page);
+    CREATE INDEX IF NOT EXISTS idx_sap_references_document ON sap_references(document);
+"""
+
+SEARCH_SQL = """
+    SELECT d.path, d.title, pages.page, snippet(pages, '«', '»', '…', 0, ?), top.score
+    FROM (SELECT docid, bm25(matchinfo(pages, 'pcnalx')) AS score
+          FROM pages WHERE pages MATCH ? ORDER BY score DESC LIMIT ?) AS top
+    JOIN pages ON pages.docid = top.docid
+    JOIN documents d ON d.id = pages.document
+    WHERE pages MATCH ?
+    ORDER BY top.score DESC
+"""
+
+REFERENCES_SQL = """
+    SELECT r.sap, m.descricao, d.path, d.title, r.page, r.context
+    FROM sap_references r
+    JOIN documents d ON d.id = r.document
+    LEFT JOIN catalog.materiais m ON m.sap = r.sap
+    WHERE r.sap IN ({})
+    ORDER BY r.sap, d.path, r.page
+"""
+
+KIT_REFERENCES_SQL = """
+    SELECT k.codigo_kit, r.sap, m.descricao, d.path, d.title, r.page, r.context
+    FROM catalog.kit_composicao k
+    JOIN sap_references r ON r.sap = k.sap
+    JOIN documents d ON d.id = r.document
+    LEFT JOIN catalog.materiais m ON m.sap = k.sap
+    WHERE k.codigo_kit = ?
+    ORDER BY r.sap, d.path, r.page
+"""
+
+
+def bm25(info, k1=BM25_K1, b=BM25_B):
+    """BM25 score of one row from FTS4 matchinfo(..., 'pcnalx'), over the text column."""
+    values = struct.unpack(f"{len(info) // 4}I", info)
+    phrases, columns, rows = values[0], values[1], values[2]
+    average, length = values[3], values[3 + columns]
+    hits = 3 + 2 * columns
+    norm = k1 * (1 - b + b * length / max(average, 1))
+    score = 0.0
+    for i in range(phrases):
+        tf, _, df = values[hits + 3 * columns * i: hits + 3 * columns * i + 3]
+        if tf:
+            score += math.log(1 + (rows - df + 0.5) / (df + 0.5)) * tf * (k1 + 1) / (tf + norm)
+    return score
+
+
+def match_query(text):
+    """Free text to an FTS query: every word, as a prefix, must appear on the page."""
+    return " ".join(f"{word}*" for word in re.findall(r"\w+", text))
+
+
+def find_sap_references(text):
+    """(sap, context line) for every SAP code on a page, once per line."""
+    found = []
+    for line in text.splitlines():
+        context = " ".join(line.split())[:CONTEXT_CHARS]
+        found += [(sap, context) for sap in dict.fromkeys(SAP_PATTERN.findall(line))]
+    return found
+
+
+def open_index(index_path=INDEX_PATH):
+    """
+    Open (creating if needed) the full-text index with bm25() registered.
+    An index of another format is emptied, so the next build redoes it.
+    """
+    Path(index_path).parent.mkdir(parents=True, exist_ok=True)
+    conn = sqlite3.connect(index_path)
+    if conn.execute("PRAGMA user_version").fetchone()[0] != STANDARDS_INDEX_FORMAT:
+        conn.executescript("""
+            DROP TABLE IF EXISTS documents;
+            DROP TABLE IF EXISTS pages;
+            DROP TABLE IF EXISTS sap_references;
+        """)
+    conn.executescript(SCHEMA)
+    conn.execute(f"PRAGMA user_version = {STANDARDS_INDEX_FORMAT}")
+    conn.create_function("bm25", 1, bm25, deterministic=True)
+    return conn
+
+
+def document_key(path, root=PADROES_DIR):
+    """Index key of a PDF: its path below the library root when inside it."""
+    path = Path(path).resolve()
+    try:
+        return path.relative_to(Path(root).resolve()).as_posix()
+    except ValueError:
+        return path.as_posix()
+
+
+def build_index(paths, root=PADROES_DIR, index_path=INDEX_PATH, cache_path=CACHE_PATH,
+                workers=None, stats=None):
+    """
+    Bring the index in line with `paths` (the whole library).
+
+    Unchanged documents are kept, changed ones re-indexed and documents no
+    longer in `paths` removed. `stats`, when a dict, receives
+    documents/pages/references/indexed/removed counts.
+    """
+    texts = extract_pages(paths, cache_path, workers)
+    hashes = file_hashes(texts, cache_path)
+
+    conn = open_index(index_path)
+    known = {key: (doc_id, digest) for doc_id, key, digest in
+             conn.execute("SELECT id, path, file_hash FROM documents")}
+    current = {document_key(path, root): path for path in texts}
+
+    removed = [doc_id for key, (doc_id, _) in known.items() if key not in current]
+    indexed = 0
+    for key, path in current.items():
+        digest = hashes[path]
+        doc_id = known.get(key, (None, None))[0]
+        if doc_id is not None and known[key][1] == digest:
+            continue
+        if doc_id is not None:
+            conn.execute("DELETE FROM pages WHERE document = ?", (doc_id,))
+            conn.execute("DELETE FROM sap_references WHERE document = ?", (doc_id,))
+        doc_id = conn.execute(
+            "INSERT OR REPLACE INTO documents (id, path, title, file_hash, page_count) VALUES (?, ?, ?, ?, ?)",
+            (doc_id, key, Path(path).stem, digest, len(texts[path]))).lastrowid
+        conn.executemany("INSERT INTO pages (text, document, page) VALUES (?, ?, ?)",
+                         [(text, doc_id, i + 1) for i, text in enumerate(texts[path]) if text.strip()])
+        conn.executemany("INSERT INTO sap_references VALUES (?, ?, ?, ?)",
+                         [(sap, doc_id, i + 1, context) for i, text in enumerate(texts[path])
+                          for sap, context in find_sap_references(text)])
+        indexed += 1
+    for doc_id in removed:
+        conn.execute("DELETE FROM pages WHERE document = ?", (doc_id,))
+        conn.execute("DELETE FROM sap_references WHERE document = ?", (doc_id,))
+        conn.execute("DELETE FROM documents WHERE id = ?", (doc_id,))
+    if indexed or removed:
+        conn.execute("INSERT INTO pages (pages) VALUES ('optimize')")
+    conn.commit()
+
+    if stats is not None:
+        stats.update(
+            documents=conn.execute("SELECT COUNT(*) FROM documents").fetchone()[0],
+            pages=conn.execute("SELECT COUNT(*) FROM pages").fetchone()[0],
+            references=conn.execute("SELECT COUNT(*) FROM sap_references").fetchone()[0],
+            indexed=indexed, removed=len(removed),
+        )
+    conn.close()
+
+
+def search(query, index_path=INDEX_PATH, limit=20, conn=None):
+    """
+    Ranked page hits for a free-text query.
+
+    Returns dicts with path (below Padrões), title, page (1-based), snippet
+    (matches between « and ») and score, best first.
+    """
+    fts_query = match_query(query)
+    if not fts_query:
+        return []
+    own = conn is None
+    conn = conn or open_index(index_path)
+    try:
+        rows = conn.execute(SEARCH_SQL, (SNIPPET_TOKENS, fts_query, limit, fts_query)).fetchall()
+    finally:
+        if own:
+            conn.close()
+    return [{"path": path, "title": title, "page": page, "snippet": snippet, "score": score}
+            for path, title, page, snippet, score in rows]
+
+
+def _catalog_query(sql, params, index_path, catalog_path):
+    """Run a query joining the index to the cqt_light.db catalog (attached as `catalog`)."""
+    if not Path(catalog_path).exists():
+        raise FileNotFoundError(f"Catalog database not found: {catalog_path}")
+    conn = open_index(index_path)
+    try:
+        conn.execute("ATTACH DATABASE ? AS catalog", (str(catalog_path),))
+        cursor = conn.execute(sql, params)
+        names = [c[0] for c in cursor.description]
+        return [dict(zip(names, row)) for row in cursor]
+    finally:
+        conn.close()
+
+
+def material_standards(saps, index_path=INDEX_PATH, catalog_path=CATALOG_PATH):
+    """
+    Where materials appear in the standards: dicts with sap, descricao,
+    path, title, page and context, by code, document and page.
+    """
+    saps = [str(sap) for sap in ([saps] if isinstance(saps, (str, int)) else saps)]
+    if not saps:
+        return []
+    sql = REFERENCES_SQL.format(", ".join("?" * len(saps)))
+    return _catalog_query(sql, saps, index_path, catalog_path)
+
+
+def kit_standards(codigo_kit, index_path=INDEX_PATH, catalog_path=CATALOG_PATH):
+    """Standards pages that mention the materials of a kit (as material_standards, plus codigo_kit)."""
+    return _catalog_query(KIT_REFERENCES_SQL, (codigo_kit,), index_path, catalog_path)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Standards full-text search")
+    parser.add_argument("query", nargs="*", help="Words to search for")
+    parser.add_argument("--build", nargs="?", const=str(PADROES_DIR), metavar="FOLDER",
+                        help=f"(Re)index a PDF folder first (default: {PADROES_DIR})")
+    parser.add_argument("--sap", nargs="+", help="Standards pages citing these SAP codes")
+    parser.add_argument("--kit", help="Standards pages citing the materials of a kit")
+    parser.add_argument("--limit", type=int, default=20)
+    parser.add_argument("--workers", type=int, default=None)
+    parser.add_argument("--index", default=str(INDEX_PATH))
+    args = parser.parse_args()
+
+    print("=" * 60)
+    print("🔍 CQT Light V3 - Standards Full-Text Search")
+    print("=" * 60)
+
+    if args.build or not os.path.exists(args.index):
+        folder = args.build or str(PADROES_DIR)
+        paths = find_pdfs(folder)
+        if not paths:
+            print(f"⚠️ No PDFs found in {folder}")
+            return
+        stats = {}
+        start = time.perf_counter()
+        build_index(paths, root=folder, index_path=args.index, workers=args.workers, stats=stats)
+        print(f"✅ {stats['documents']} documents, {stats['pages']:,} pages, {stats['references']:,} SAP "
+              f"references indexed ({stats['indexed']} updated, {stats['removed']} removed) "
+              f"in {time.perf_counter() - start:.1f} s")
+
+    if args.sap or args.kit:
+        start = time.perf_counter()
+        refs = material_standards(args.sap, args.index) if args.sap else kit_standards(args.kit, args.index)
+        elapsed = time.perf_counter() - start
+        print(f"\n📊 {len(refs)} references in {elapsed * 1000:.1f} ms")
+        for ref in refs:
+            print(f"   {ref['sap']}  {(ref['descricao'] or '(fora do catálogo)')[:40]:<40}  "
+                  f"{ref['path']}  p. {ref['page']}")
+            print(f"           {ref['context']}")
+
+    if not args.query:
+        return
+    query = " ".join(args.query)
+    start = time.perf_counter()
+    hits = search(query, args.index, args.limit)
+    elapsed = time.perf_counter() - start
+    print(f"\n📊 {len(hits)} hits for '{query}' in {elapsed * 1000:.1f} ms")
+    for hit in hits:
+        print(f"\n   {hit['score']:6.2f}  {hit['path']}  p. {hit['page']}")
+        print(f"           {' '.join(hit['snippet'].split())}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,456 @@
+"""
+CQT Light V3 - Engineering Engine Tests
+Checks the native calculation engines against the spreadsheet formulas.
+"""
+
+import itertools
+import sqlite3
+import time
+
+import numpy as np
+
+from catalog_coverage import CoverageIndex
+from conductor_optimizer import optimize_conductors
+from demand_estimator import diversity_factor, estimate_demand, load_demand_rules
+from formula_compiler import CircularReference, ExcelError, Workbook, compile_stats
+from monte_carlo import simulate_circuit
+from network_solver import (IncrementalSolver, RadialNetwork, random_feeder, solve_network,
+                            solve_network_unbalanced)
+from pole_mechanics import check_poles
+from qdt_differential import run_harness
+from qdt_engine import compute_qdt, compute_qdt_unbalanced, load_cable_table
+from qdt_validator import validate_circuits
+from route_planner import cost_plans, flatten_routes, plan_routes
+from service_drop import check_service_drops, load_ramal_table, temperature_factor
+from short_circuit import short_circuit_levels, source_impedance, transformer_impedance
+from transformer_sizing import size_transformers
+
+
+def run_tests():
+    print("\n" + "=" * 60)
+    print("🧪 CQT Light V3 - Engineering Test Suite")
+    print("=" * 60)
+
+    results = []
+
+    def test(name, condition, details=""):
+        results.append((name, condition))
+        status = "✅" if condition else "❌"
+        print(f"{status} {name}{': ' + details if details else ''}")
+
+    table = load_cable_table()
+
+    # Test 1: Drop coefficient reproduces Coef_Queda (per 100 m) of technical_data.json
+    try:
+        one_km = compute_qdt([1] * len(table.names), [1.0] * len(table.names), 1, 3,
+                             table.names, 100, table=table)
+        err = np.abs(one_km["drop"] - table.coef_queda).max()
+        test("T1: BJ matches Coef_Queda", err < 1e-9, f"max error {err:.2e}")
+    except Exception as e:
+        test("T1: BJ matches Coef_Queda", False, str(e))
+
+    # Test 2: Row formulas (K/L/M, phase factor, accumulation)
+    try:
+        r = compute_qdt([3, 2, 1], [30.0, 20.0, 10.0], 0.5, [3, 2, 1],
+                        ["185 MMX", "70 MMX", "53 QX"], [30, 40, 20],
+                        small_load_rule=True)
+        coef = table.coef_queda[table.lookup(["185 MMX", "70 MMX", "53 QX"])] / 100
+        expected = np.array([15.0 * 30 * 1, 4.0 * 40 * 2, 2.0 * 20 * 6]) * coef
+        ok = (np.allclose(r["load"], [15.0, 4.0, 2.0])
+              and np.allclose(r["drop"], expected)
+              and np.allclose(r["accumulated_drop"], np.cumsum(expected)))
+        test("T2: Trecho load, drop and accumulated drop", ok,
+             f"total {r['total_drop']:.3f}%")
+    except Exception as e:
+        test("T2: Trecho load, drop and accumulated drop", False, str(e))
+
+    # Test 3: Validation flags
+    try:
+        r = compute_qdt([4, 5, 0], [10.0, 10.0, 10.0], 1, [3, 3, 3],
+                        ["70 MMX"] * 3, [10, 10, 10], ampacity=[181, 181, 1])
+        ok = (r["error_02"].tolist() == [False, True, True]
+              and r["error_03"].tolist() == [False, False, True])
+        test("T3: Erro 02 / Erro 03 flags", ok)
+    except Exception as e:
+        test("T3: Erro 02 / Erro 03 flags", False, str(e))
+
+    # Test 4: Broadcast scenarios equal one call per scenario
+    try:
+        rng = np.random.default_rng(1)
+        kva = rng.uniform(5, 50, size=(200, 6))
+        args = ([6, 5, 4, 3, 2, 1], kva, 1, 3, ["85 QX"] * 6, [25] * 6)
+        start = time.perf_counter()
+        batch = compute_qdt(*args)
+        elapsed = (time.perf_counter() - start) * 1000
+        single = np.array([compute_qdt(args[0], k, *args[2:])["total_drop"] for k in kva])
+        test("T4: Batch scenarios", np.allclose(batch["total_drop"], single),
+             f"200 circuits in {elapsed:.2f}ms")
+    except Exception as e:
+        test("T4: Batch scenarios", False, str(e))
+
+    # Test 5: A chain network reproduces the sheet with cumulative loads
+    try:
+        loads = np.array([5.0, 4.0, 3.0, 2.0])
+        chain = RadialNetwork([-1, 0, 1, 2])
+        tree = solve_network(chain, loads, "70 MMX", [30, 30, 25, 20])
+        sheet = compute_qdt([4, 3, 2, 1], loads[::-1].cumsum()[::-1], 1, 3, ["70 MMX"] * 4, [30, 30, 25, 20])
+        test("T5: Chain matches QDT sheet", np.allclose(tree["accumulated_drop"], sheet["accumulated_drop"]))
+    except Exception as e:
+        test("T5: Chain matches QDT sheet", False, str(e))
+
+    # Test 6: Branched tree against a per-node walk, with (n, k) scenarios
+    try:
+        rng = np.random.default_rng(2)
+        feeder = random_feeder(2_000, rng)
+        loads = rng.uniform(0, 2, size=(2_000, 3))
+        start = time.perf_counter()
+        r = solve_network(feeder, loads, "185 MMX", 20)
+        elapsed = (time.perf_counter() - start) * 1000
+        through = np.zeros_like(loads)
+        for node in range(len(feeder)):
+            for up in feeder.path(node):
+                through[up] += loads[node]
+        drop = through * r["k_drop"][:, None] * 20
+        expected = np.array([drop[feeder.path(node)].sum(axis=0) for node in range(len(feeder))])
+        ok = np.allclose(r["through_load"], through) and np.allclose(r["accumulated_drop"], expected)
+        test("T6: Radial solver on a branched feeder", ok, f"2,000 nodes x 3 scenarios in {elapsed:.2f}ms")
+    except Exception as e:
+        test("T6: Radial solver on a branched feeder", False, str(e))
+
+    # Test 7: Incremental edits agree with a full re-solve
+    try:
+        rng = np.random.default_rng(3)
+        feeder = random_feeder(1_000, rng)
+        loads = rng.uniform(0, 2, 1_000)
+        cables = rng.choice(["70 MMX", "185 MMX", "53 QX"], 1_000)
+        solver = IncrementalSolver(feeder, loads, cables, 25)
+        for node in rng.integers(0, 1_000, size=50):
+            loads[node] = rng.uniform(0, 5)
+            cables[node] = "185 MMX"
+            solver.set_load(node, loads[node])
+            solver.set_segment(node, cable="185 MMX")
+        full = solve_network(feeder, loads, cables, 25)
+        ok = (np.allclose(solver.accumulated_drop(), full["accumulated_drop"])
+              and np.isclose(solver.through_load(0), full["through_load"][0]))
+        test("T7: Incremental edits match full solve", ok, f"{solver.edits} edits")
+    except Exception as e:
+        test("T7: Incremental edits match full solve", False, str(e))
+
+    # Test 8: Transformer sizing picks the smallest rating within loading and drop limits
+    try:
+        choice, loading, total = size_transformers(
+            [20.0, 20.0, 500.0], [1.0, 3.5, 1.0], [15, 30, 45, 75], [3.5] * 4, 0.85, 5.0
+        )
+        ok = choice.tolist() == [1, 3, -1] and np.isclose(total[1], 3.5 + 3.5 * 20 / 75)
+        test("T8: Transformer sizing", ok, f"choices {choice.tolist()}")
+    except Exception as e:
+        test("T8: Transformer sizing", False, str(e))
+
+    # Test 9: Conductor optimizer against exhaustive search on a small tree
+    try:
+        candidates = [{"cable": "70 MMX", "ampacity": 181, "price": 10.0},
+                      {"cable": "185 MMX", "ampacity": 355, "price": 25.0}]
+        tree = RadialNetwork([-1, 0, 0, 1, 1, 2, 2, 3])
+        loads = np.array([4.0, 6.0, 5.0, 8.0, 7.0, 9.0, 6.0, 10.0])
+        length = np.array([40.0, 35, 30, 45, 40, 35, 30, 40])
+        r = optimize_conductors(tree, loads, length, candidates, 5.0, budget_steps=1000)
+        exact, margin = np.inf, np.inf
+        for combo in itertools.product(range(2), repeat=8):
+            drop = solve_network(tree, loads, [candidates[c]["cable"] for c in combo], length)["max_drop"]
+            price = sum(candidates[c]["price"] * l for c, l in zip(combo, length))
+            if drop <= 5.0:
+                exact = min(exact, price)
+            if drop <= 5.0 - 4 * 5.0 / 1000:
+                margin = min(margin, price)
+        chosen = [candidates[c]["cable"] for c in r["choice"]]
+        ok = (solve_network(tree, loads, chosen, length)["max_drop"] <= 5.0
+              and exact <= r["cost"] <= margin)
+        test("T9: Conductor optimizer", ok, f"cost {r['cost']:.0f} (exhaustive {exact:.0f})")
+    except Exception as e:
+        test("T9: Conductor optimizer", False, str(e))
+
+    # Test 10: Formula compiler (filled-down chain, IF/OR blanks, errors, IM* functions)
+    try:
+        book = Workbook("QDT")
+        book.set_value("CA14", 0)
+        book.fill("CA15", '=IF(OR(BZ15="",C15=""),"",BZ15+CA14)', 5)
+        for r, bz in zip(range(15, 20), [0.5, 0.25, 1.0, 0.75, 0.5]):
+            book.set_value(f"BZ{r}", bz)
+            book.set_value(f"C{r}", f"P-{r - 14}")
+        book.set_formula("A1", '=IMABS(IMPRODUCT(COMPLEX(3,4),"1-i"))')
+        book.set_formula("A2", "=IFERROR(1/0,-1)+(1/0=0)")
+        for address, v in zip(("F1", "G1", "F2", "G2"), (1.0, 2.0, 3.0, 4.0)):
+            book.set_value(address, v)
+        book.set_formula("A3", "=INDEX(F1:G2,2,1)")
+        book.set_formula("A4", "=INDEX(F1:G2,0,1)")
+        book.set_formula("A5", "=COMPLEX(1,2)")
+        book.set_formula("A6", "=AND(ISTEXT(A5),A5>0)")
+        book.set_formula("A7", "=F1:G2")
+        book.set_formula("A8", "=ROUNDUP(1.0000000001,0)+ROUNDUP(0.1*3,1)")
+        before = compile_stats()["compiled"]
+        chain = book.calculate({"BZ17": 2.0}, [f"CA{r}" for r in range(15, 20)])
+        ok = (np.allclose(chain, np.cumsum([0.5, 0.25, 2.0, 0.75, 0.5]))
+              and np.isclose(book.get("A1"), 5 * np.sqrt(2))
+              and book.get("A2") == ExcelError("#DIV/0!")
+              and book.get("A3") == 3.0 and book.get("A4") == ExcelError("#VALUE!")
+              and book.get("A5") == "1+2i" and book.get("A6") is True
+              and book.get("A7") == ExcelError("#VALUE!") and np.isclose(book.get("A8"), 2.3)
+              and book.calculate({"C18": ""}, ["CA18"]) == [""]
+              and book.calculate({"CA16": 10.0}, ["CA16", "CA17"]) == [10.0, 12.0]
+              and compile_stats()["compiled"] == before)
+        # IFERROR/ISERROR must not hide a reference cycle
+        book.set_formula("D1", "=IFERROR(D2,99)")
+        book.set_formula("D2", "=D1+1")
+        book.set_formula("E1", "=ISERROR(E1)")
+        for address in ("D1", "E1"):
+            try:
+                book.get(address)
+                ok = False
+            except CircularReference:
+                pass
+        test("T10: Formula compiler", ok, f"CA19 = {chain[-1]:.2f}")
+    except Exception as e:
+        test("T10: Formula compiler", False, str(e))
+
+    # Test 11: Native engine against the sheet formulas on random circuits
+    try:
+        summary = run_harness(200, seed=11, verbose=False)
+        first = summary["divergence"]
+        test("T11: Native engine matches sheet formulas", first is None,
+             f"{summary['circuits']} circuits, {summary['speedup']:.0f}x" if first is None
+             else f"first divergence at {first['cell']}: {first['sheet']!r} vs {first['native']!r}")
+    except Exception as e:
+        test("T11: Native engine matches sheet formulas", False, str(e))
+
+    # Test 12: Service drop checker (temperature bands, ampacity, drop limit)
+    try:
+        ramais = load_ramal_table()
+        factors = temperature_factor([25, 26, 28, 33, 40]).tolist()
+        r = check_service_drops(["70 MMX", "13 DX", "53 QX"], [30, 30, 10], [10.0, 10.0, 100.0], 30)
+        coef = table.coef_queda[table.lookup(["70 MMX"])][0] / 100
+        ok = (factors == [1.5, 1.5, 1.3, 1.2, 1.0]
+              and ramais.ampacity[ramais.index["85 QX"]] == 220
+              and np.isclose(r["drop"][0], 10.0 * 30 * coef)
+              and r["ok"].tolist() == [True, False, False]
+              and r["error_ampacity"].tolist() == [False, False, True])
+        test("T12: Service drop checker", ok, f"drops {np.round(r['drop'], 2).tolist()}")
+    except Exception as e:
+        test("T12: Service drop checker", False, str(e))
+
+    # Test 13: Pole mechanics over two concatenated routes
+    try:
+        r = check_poles([0, 10, 4, 0, 0, 30, 0], [300, 300, 300, 300, 700, 700, 2500],
+                        route=[1, 1, 1, 1, 2, 2, 2], min_length=[9, 9, 12, 9, 9, 9, 9])
+        ok = (np.allclose(r["force"][:3], [300, 600 * np.sin(np.radians(5)), 600 * np.sin(np.radians(2))])
+              and r["traction_check"].tolist() == [True, True, False, True, True, True, True]
+              and r["pole"][-1] == -1
+              and r["length"][2] == 12 and r["resistance"][4] == 1000
+              and np.isclose(r["foundation_depth"][4], 11 / 10 + 0.60))
+        test("T13: Pole mechanics", ok, f"forces {np.round(r['force']).tolist()}")
+    except Exception as e:
+        test("T13: Pole mechanics", False, str(e))
+
+    # Test 14: Route planner (span limits, structures, one-query costing)
+    try:
+        routes = [{"segments": [{"length": 100, "angle": 3}, {"length": 50, "angle": 30},
+                                {"length": 30, "angle": 90}]},
+                  {"segments": [{"length": 170, "network": "conventional"}]}]
+        plan = plan_routes(*flatten_routes(routes))
+        bom = [dict(zip(plan["kits"], row)) for row in plan["quantities"]]
+        conn = sqlite3.connect(":memory:")
+        conn.executescript("""
+            CREATE TABLE materiais (sap TEXT, descricao TEXT, unidade TEXT, preco_unitario REAL);
+            CREATE TABLE kits (codigo_kit TEXT, descricao_kit TEXT, codigo_servico TEXT, custo_servico REAL);
+            CREATE TABLE kit_composicao (codigo_kit TEXT, sap TEXT, quantidade REAL);
+            INSERT INTO materiais VALUES ('1', 'CRUZETA', 'UN', 10.0), ('2', 'ISOLADOR', 'UN', 2.5);
+            INSERT INTO kits VALUES ('13CE1A', '', NULL, 5.0), ('13CE2', '', NULL, 0), ('13CE3', '', NULL, 0);
+            INSERT INTO kit_composicao VALUES ('13CE1A', '1', 1), ('13CE1A', '2', 2), ('13CE3', '2', 4);
+        """)
+        costs = cost_plans(plan, conn)
+        ok = (bom[0]["13CE1A"] == 4 and bom[0]["13CE2"] == 1 and bom[0]["13CE3"] == 2
+              and bom[1]["13N1"] == 2 and bom[1]["13N3"] == 2
+              and plan["poles"].tolist() == [7, 4]
+              and np.isclose(costs["total"][0], 4 * (15.0 + 5.0) + 2 * 10.0)
+              and costs["missing"][0] == 1)
+        test("T14: Route planner", ok, f"poles {plan['poles'].tolist()}, cost {costs['total'][0]:.2f}")
+    except Exception as e:
+        test("T14: Route planner", False, str(e))
+
+    # Test 15: Per-phase mode (balanced/single-phase identities, neutral, tree vs chain)
+    try:
+        cables = ["185 MMX", "70 MMX", "53 QX"]
+        args = ([3, 2, 1], [30.0, 20.0, 10.0], 1)
+        ok = True
+        for phases in (3, 1):
+            balanced = compute_qdt(*args, [phases] * 3, cables, [30, 40, 20])
+            per_phase = compute_qdt_unbalanced(*args, [phases] * 3, cables, [30, 40, 20])
+            ok &= np.allclose(per_phase["worst_drop"], balanced["accumulated_drop"])
+        ok &= np.allclose(per_phase["neutral_current"], per_phase["phase_current"][:, 0])
+        loads = np.array([[5.0, 0, 0], [3, 4, 0], [2, 2, 2]])
+        through = loads[::-1].cumsum(axis=0)[::-1]
+        tree = solve_network_unbalanced(RadialNetwork([-1, 0, 1]), loads, cables, [30, 40, 20], power_factor=0.92)
+        chain = compute_qdt_unbalanced(*args, 3, cables, [30, 40, 20], phase_kva=through, power_factor=0.92)
+        ok &= np.allclose(tree["accumulated_phase_drop"], chain["accumulated_phase_drop"])
+        test("T15: Per-phase mode", bool(ok), f"worst {chain['total_drop']:.3f}% on phase "
+             f"{'ABC'[chain['worst_phase'][-1]]}, neutral {chain['neutral_current'][0]:.0f} A")
+    except Exception as e:
+        test("T15: Per-phase mode", False, str(e))
+
+    # Test 16: Short-circuit levels against columns BK/BL/CB of the sheet
+    try:
+        cables = ["185 MMX", "70 MMX", "53 QX"]
+        lengths = [30.0, 40.0, 20.0]
+        idx = table.lookup(cables)
+        upstream = source_impedance(250) + transformer_impedance(75, 3.5)
+        book = Workbook("QDT")
+        book.set_value("BX6", 220.0)
+        book.set_formula("AS8", f"=COMPLEX({upstream.real!r},0)")
+        book.set_formula("CA8", f"=COMPLEX(0,{upstream.imag!r})")
+        book.set_value("CF8", "0")
+        book.set_value("BK14", "0")
+        book.set_value("BL14", "0")
+        for r, i, length in zip(range(15, 18), idx, lengths):
+            book.set_value(f"BI{r}", float(table.r[i]))
+            book.set_value(f"BB{r}", float(table.x[i]))
+            book.set_value(f"AR{r}", length)
+        book.fill("BL15", "=IMPRODUCT(COMPLEX(BI15,BB15),AR15/1000)", 3)
+        book.fill("BK15", "=IMSUM(BK14,BL14)", 3)
+        book.fill("CB15", "=($BX$6/SQRT(3))/IMABS(IMSUM($AS$8,BK15,BL15,$CA$8,$CF$8))", 3)
+        sheet = [book.get(f"CB{r}") / 1000 for r in range(15, 18)]
+        chain = short_circuit_levels(RadialNetwork([-1, 0, 1]), cables, lengths, 75, impedance_pct=3.5,
+                                     source_mva=250)
+        tree = short_circuit_levels(RadialNetwork([-1, 0, 0]), cables, lengths, 75, impedance_pct=3.5,
+                                    source_mva=250, neutral_ratio=0.0)
+        r_path = table.r[idx[0]] * 30 + table.r[idx[2]] * 20
+        ok = (np.allclose(chain["three_phase"], sheet)
+              and np.all(np.diff(chain["three_phase"]) < 0)
+              and np.isclose(tree["impedance"][2],
+                             upstream + ((table.r + 1j * table.x)[idx[[0, 2]]] * [30, 20]).sum() / 1000)
+              and np.isclose(tree["phase_neutral"][2], 220 / np.sqrt(3) / abs(upstream + r_path / 1000) / 1000))
+        test("T16: Short-circuit levels", ok, f"Icc {np.round(chain['three_phase'], 2).tolist()} kA")
+    except Exception as e:
+        test("T16: Short-circuit levels", False, str(e))
+
+    # Test 17: Rule validator over concatenated circuits
+    try:
+        circuits = [
+            {"consumers": [10, 5], "kva": [20.0, 10.0], "fdiv": 1.0, "phases": 3,
+             "cables": ["185 MMX", "70 MMX"], "length": [30, 30]},
+            {"consumers": [20, 30, 5], "kva": [90.0, 10.0, 0.0], "fdiv": 1.0, "phases": 3,
+             "cables": ["70 MMX", "70 MMX", "53 QX"], "length": [200, 30, 30]},
+        ]
+        r = validate_circuits(circuits)
+        found = {(int(c), int(t), r["codes"][k]) for c, t, k in zip(r["circuit"], r["trecho"], r["rule"])}
+        expected = {(1, 0, "Erro 03"), (1, 0, "CARREG"), (1, 0, "QUEDA"), (1, 1, "Erro 02"),
+                    (1, 1, "QUEDA"), (1, 2, "Erro 04"), (1, 2, "QUEDA")}
+        single = compute_qdt(*(circuits[1][k] for k in ("consumers", "kva", "fdiv", "phases", "cables", "length")))
+        queda = r["value"][np.array(r["codes"])[r["rule"]] == "QUEDA"]
+        ok = found == expected and np.allclose(queda, single["accumulated_drop"])
+        test("T17: Rule validator", ok, f"{len(r['rule'])} violations, counts {r['counts'].tolist()}")
+    except Exception as e:
+        test("T17: Rule validator", False, str(e))
+
+    # Test 18: Demand estimator (downstream counts, default areas, sheet FDIV or a supplied table)
+    try:
+        node, category = [0, 0, 1, 2, 2, 2], [0, 0, 0, 0, 1, 0]
+        area = [np.nan, 100, np.nan, np.nan, 200, np.nan]
+        residential = np.array([7.0 * 4 + 10.0, 7.0 * 3, 7.0 * 2])
+        sheet = estimate_demand(node, category, area, fdiv=[1.0, 0.9, 0.8])
+        # A made-up two-point table, only to exercise the per-category interpolation
+        table = dict(load_demand_rules(), diversity=[(np.array([1.0, 5.0]), np.array([1.0, 0.6])),
+                                                     (np.array([1.0]), np.array([1.0]))])
+        r = estimate_demand(node, category, area, rules=table)
+        expected = residential * np.interp([5, 3, 2], [1, 5], [1.0, 0.6]) + 20.0
+        qdt = compute_qdt(r["consumers"], r["kva"], r["fdiv"], 3, "70 MMX", [30, 30, 30])
+        tree = estimate_demand([1, 2, 2], network=RadialNetwork([-1, 0, 0]), fdiv=1.0)
+        try:
+            estimate_demand(node, category, area, rules=dict(table, diversity=None))
+            missing_table = False
+        except ValueError:
+            missing_table = True
+        ok = (r["consumers"].tolist() == [6, 4, 3]
+              and np.allclose(r["kva"], residential + 20.0)
+              and np.allclose(r["demand"], expected)
+              and np.allclose(qdt["load"], r["demand"])
+              and np.allclose(sheet["demand"], (residential + 20.0) * [1.0, 0.9, 0.8])
+              and sheet["fdiv"].tolist() == [1.0, 0.9, 0.8]
+              and tree["consumers"].tolist() == [3, 1, 2] and np.isclose(tree["demand"][0], 21.0)
+              and missing_table and load_demand_rules()["diversity"] is None
+              and np.isclose(diversity_factor(3, 0, table), 0.8))
+        test("T18: Demand estimator", ok, f"demand {np.round(r['demand'], 2).tolist()} kVA")
+    except Exception as e:
+        test("T18: Demand estimator", False, str(e))
+
+    # Test 19: Monte Carlo (degenerate case, reproducibility across pool sizes)
+    try:
+        circuit = {"consumers": [12, 8, 3], "kva": [40.0, 28.0, 12.0], "fdiv": 1.0, "phases": 3,
+                   "cables": ["185 MMX", "70 MMX", "70 MMX"], "length": [40, 40, 40]}
+        fixed = simulate_circuit(circuit, scenarios=50, demand_cv=0.0, temperature=(20.0, 0.0))
+        qdt = compute_qdt(*(circuit[k] for k in ("consumers", "kva", "fdiv", "phases", "cables", "length")))
+        serial = simulate_circuit(circuit, scenarios=3_000, chunk_size=1_000, workers=1, seed=7)
+        pooled = simulate_circuit(circuit, scenarios=3_000, chunk_size=1_000, workers=2, seed=7)
+        ok = (np.allclose(fixed["drop"], qdt["accumulated_drop"], rtol=1e-5)
+              and np.allclose(fixed["deterministic_drop"], qdt["accumulated_drop"])
+              and np.array_equal(serial["drop"], pooled["drop"])
+              and np.all(np.diff(serial["drop"], axis=0) >= 0)
+              and serial["drop"][-1, -1] > serial["deterministic_drop"][-1])
+        test("T19: Monte Carlo load uncertainty", ok,
+             f"P99 {serial['drop'][-1, -1]:.2f}% vs {serial['deterministic_drop'][-1]:.2f}%")
+    except Exception as e:
+        test("T19: Monte Carlo load uncertainty", False, str(e))
+
+    # Test 20: Catalog coverage (reverse index, usage weighting, incremental prices)
+    try:
+        kits = {
+            "K1": {"materials": [{"sap": "A", "description": "CABO"}, {"sap": "B", "description": "POSTE"}]},
+            "K2": {"materials": [{"sap": "B"}, {"sap": "C", "description": "CRUZETA"}]},
+            "K3": {"materials": [{"sap": "C"}]},
+            "K4": {"materials": []},
+        }
+        index = CoverageIndex(kits, {"A": ("CABO", 10.0), "B": ("POSTE", 0.0)}, {"K1": 5, "K3": 2})
+        before = index.report()
+        unlocked = index.update_prices({"B": 4.0, "Z": 1.0})
+        after = index.report()
+        ok = ([(m["sap"], m["status"], m["kits"], m["weighted_kits"], m["unlocks"]) for m in before["missing"]]
+              == [("B", "price 0.0", 2, 6.0, 5.0), ("C", "not in catalog", 2, 3.0, 2.0)]
+              and before["required"] == 3 and before["kits"] == 3 and before["kits_complete"] == 0
+              and index.kits_blocked_by("C") == ["K2", "K3"] and unlocked == 1
+              and [(m["sap"], m["unlocks"]) for m in after["missing"]] == [("C", 3.0)]
+              and after["kits_complete"] == 1 and abs(after["weighted_coverage"] - 5 / 8) < 1e-12)
+
+        # Incremental updates match a rebuild on a large random catalog
+        rng = np.random.default_rng(0)
+        saps = [f"{300000 + i}" for i in range(20_000)]
+        big = {f"KIT{k}": {"materials": [{"sap": s} for s in rng.choice(saps, rng.integers(1, 12), replace=False)]}
+               for k in range(30_000)}
+        catalog = {s: ("", float(rng.choice([0, 0, 5]))) for s in saps[:15_000]}
+        start = time.perf_counter()
+        index = CoverageIndex(big, catalog)
+        index.report()
+        built = time.perf_counter() - start
+        for _ in range(20):
+            batch = {s: float(rng.choice([0, 3])) for s in rng.choice(saps, 50)}
+            index.update_prices(batch)
+            catalog.update({s: ("", p) for s, p in batch.items()})
+        ok = ok and (np.array_equal(index.blocking, CoverageIndex(big, catalog).blocking)
+                     and index.report()["missing"] == CoverageIndex(big, catalog).report()["missing"])
+        test("T20: Catalog coverage", ok, f"{len(index.edge_kit):,} kit materials in {built * 1000:.0f} ms")
+    except Exception as e:
+        test("T20: Catalog coverage", False, str(e))
+
+    # Summary
+    print("\n" + "=" * 60)
+    passed = sum(1 for _, ok in results if ok)
+    total = len(results)
+    print(f"📊 Results: {passed}/{total} tests passed ({passed/total*100:.0f}%)")
+
+    if passed == total:
+        print("🎉 All engineering tests passed!")
+        return True
+    else:
+        print("⚠️ Some tests failed. Review the output above.")
+        return False
+
+
+if __name__ == "__main__":
+    run_tests()
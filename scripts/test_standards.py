@@ -0,0 +1,200 @@
+"""
+CQT Light V3 - Standards Library Tests
+Checks the Padrões PDF pipeline on small generated PDFs.
+"""
+
+import shutil
+import sqlite3
+import tempfile
+import time
+from pathlib import Path
+
+from pypdf import PdfWriter
+from pypdf.generic import DecodedStreamObject, DictionaryObject, NameObject
+
+from pdf_pages import document_text, extract_pages, find_pdfs
+from standards_parameters import extract_parameters, parse_parameters, rebuild_rules
+from standards_search import build_index, kit_standards, material_standards, search
+
+
+def write_pdf(path, pages):
+    """A PDF with one line of Helvetica text per page."""
+    writer = PdfWriter()
+    for text in pages:
+        page = writer.add_blank_page(595, 842)
+        font = writer._add_object(DictionaryObject({
+            NameObject("/Type"): NameObject("/Font"),
+            NameObject("/Subtype"): NameObject("/Type1"),
+            NameObject("/BaseFont"): NameObject("/Helvetica"),
+            NameObject("/Encoding"): NameObject("/WinAnsiEncoding"),
+        }))
+        page[NameObject("/Resources")] = DictionaryObject({
+            NameObject("/Font"): DictionaryObject({NameObject("/F1"): font})
+        })
+        content = DecodedStreamObject()
+        content.set_data(f"BT /F1 12 Tf 72 720 Td ({text}) Tj ET".encode("cp1252"))
+        page[NameObject("/Contents")] = writer._add_object(content)
+    writer.write(str(path))
+    return str(path)
+
+
+def run_tests():
+    print("\n" + "=" * 60)
+    print("🧪 CQT Light V3 - Standards Library Test Suite")
+    print("=" * 60)
+
+    results = []
+
+    def test(name, condition, details=""):
+        results.append((name, condition))
+        status = "✅" if condition else "❌"
+        print(f"{status} {name}{': ' + details if details else ''}")
+
+    work = Path(tempfile.mkdtemp(prefix="cqt_standards_"))
+    library = work / "Padrões"
+    library.mkdir()
+    cache = work / "page_cache.db"
+    texts = {
+        "compacta": [f"REDE COMPACTA pagina {i} VÃO 40 m" for i in range(40)],
+        "convencional": [f"REDE CONVENCIONAL pagina {i} SAP 3092{i:02d}" for i in range(25)],
+    }
+    paths = {name: write_pdf(library / f"{name}.pdf", pages) for name, pages in texts.items()}
+
+    # Test 1: Page cache (parallel first run, cached re-run, shared copies, changed file)
+    try:
+        copy = str(library / "copia.pdf")
+        shutil.copy(paths["compacta"], copy)
+        first, second, changed = {}, {}, {}
+        pages = extract_pages([paths["compacta"], paths["convencional"], copy], cache, workers=2,
+                              batch_pages=8, stats=first)
+        start = time.perf_counter()
+        cached = extract_pages([paths["compacta"], paths["convencional"], copy], cache, stats=second)
+        elapsed = time.perf_counter() - start
+        write_pdf(paths["convencional"], texts["convencional"][:10] + ["REVISADO"])
+        updated = extract_pages([paths["convencional"]], cache, workers=1, stats=changed)
+        ok = (pages[paths["compacta"]] == texts["compacta"]
+              and pages[copy] == texts["compacta"]
+              and first["extracted"] == 65 and second["extracted"] == 0
+              and cached == pages
+              and updated[paths["convencional"]][-1] == "REVISADO" and changed["extracted"] == 11
+              and document_text(["a", "", "b"]) == "a\nb\n")
+        test("T1: Page cache", ok, f"{first['pages']} pages, re-run {elapsed * 1000:.0f} ms")
+    except Exception as e:
+        test("T1: Page cache", False, str(e))
+
+    # Test 2: Full-text index (accent-free match, ranking, page metadata, incremental rebuild)
+    try:
+        index = work / "standards.db"
+        write_pdf(library / "estruturas.pdf", ["TRAÇÃO VÃO VÃO VÃO", "ESTRUTURA N3 SEM VAO"])
+        built, unchanged, pruned = {}, {}, {}
+        build_index(find_pdfs(library), library, index, cache, workers=1, stats=built)
+        hits = search("vao", index, limit=5)
+        page = search("compacta pagina 7", index)
+        traction = search("tracao", index)
+        build_index(find_pdfs(library), library, index, cache, workers=1, stats=unchanged)
+        Path(copy).unlink()
+        build_index(find_pdfs(library), library, index, cache, workers=1, stats=pruned)
+        after = search("compacta pagina 7", index)
+        ok = (built["documents"] == 4 and built["pages"] == 40 + 11 + 40 + 2
+              and hits[0]["path"] == "estruturas.pdf" and hits[0]["page"] == 1
+              and "«VÃO»" in hits[0]["snippet"] and len(hits) == 5
+              and all(a["score"] >= b["score"] for a, b in zip(hits, hits[1:]))
+              and {(h["path"], h["page"]) for h in page} == {("compacta.pdf", 8), ("copia.pdf", 8)}
+              and [(h["title"], h["page"]) for h in traction] == [("estruturas", 1)]
+              and unchanged["indexed"] == 0 and pruned["removed"] == 1
+              and [h["path"] for h in after] == ["compacta.pdf"]
+              and search("  ", index) == [])
+        test("T2: Full-text index", ok, f"{built['pages']} pages, top hit {hits[0]['path']} p. {hits[0]['page']}")
+    except Exception as e:
+        test("T2: Full-text index", False, str(e))
+
+    # Test 3: SAP cross-reference (catalog joins, per-document refresh)
+    try:
+        catalog = work / "catalog.db"
+        conn = sqlite3.connect(catalog)
+        conn.executescript("""
+            CREATE TABLE materiais (sap TEXT PRIMARY KEY, descricao TEXT);
+            CREATE TABLE kit_composicao (codigo_kit TEXT, sap TEXT);
+            INSERT INTO materiais VALUES ('309203', 'ISOLADOR PILAR'), ('309205', 'ALCA PREFORMADA');
+            INSERT INTO kit_composicao VALUES ('13N1', '309203'), ('13N1', '309205'), ('13N1', '999999');
+        """)
+        conn.commit()
+        conn.close()
+        before = material_standards("309203", index, catalog)
+        kit = kit_standards("13N1", index, catalog)
+        write_pdf(library / "estruturas.pdf", ["TRAÇÃO VÃO VÃO VÃO", "ESTRUTURA N3 SAP 309203 e 309203 / 309205"])
+        refreshed = {}
+        build_index(find_pdfs(library), library, index, cache, workers=1, stats=refreshed)
+        after = material_standards(["309203", "309205"], index, catalog)
+        ok = ([(r["path"], r["page"], r["descricao"]) for r in before]
+              == [("convencional.pdf", 4, "ISOLADOR PILAR")]
+              and before[0]["context"] == "REDE CONVENCIONAL pagina 3 SAP 309203"
+              and [(r["sap"], r["page"]) for r in kit] == [("309203", 4), ("309205", 6)]
+              and refreshed["indexed"] == 1
+              and [(r["sap"], r["path"], r["page"]) for r in after]
+              == [("309203", "convencional.pdf", 4), ("309203", "estruturas.pdf", 2),
+                  ("309205", "convencional.pdf", 6), ("309205", "estruturas.pdf", 2)])
+        test("T3: SAP cross-reference", ok, f"{refreshed['references']} references, 13N1 -> {len(kit)} pages")
+    except Exception as e:
+        test("T3: SAP cross-reference", False, str(e))
+
+    # Test 4: Parameter extraction (typed rows, per-document cache, rules rebuild)
+    try:
+        params = work / "parameters.db"
+        mv = write_pdf(library / "Rede MV.pdf", ["VÃO MÁXIMO 45 m", "Tensões 13,8 kV e 34,5 kV, cabo 0,6/1 kV",
+                                                 "TRAFO 75 kVA / 112,5 kVA", "TRAÇÃO 300 daN"])
+        first, second, revised = {}, {}, {}
+        rows = extract_parameters(find_pdfs(library), params, cache, workers=1, stats=first)
+        extract_parameters(find_pdfs(library), params, cache, workers=1, stats=second)
+        write_pdf(mv, ["VÃO MÁXIMO 50 m", "Tensões 13,8 kV, cabo 0,6/1 kV, chave 15 kV", "TRAFO 75 kVA / 112,5 kVA", "TRAÇÃO 300 daN"])
+        rows = extract_parameters(find_pdfs(library), params, cache, workers=1, stats=revised)
+        typed = [(r["parameter"], r["value"], r["unit"], r["page"]) for r in rows if r["document"] == mv]
+        rules = {"medium_voltage_standards": {
+            "net": {"voltage_levels_kv": [13.8, 34.5], "max_span_m": 40, "reference_file": "Rede MV.pdf",
+                    "notes": "pending"},
+            "trafos": {"standard_kva_ratings": [30], "reference_file": "Rede MV.pdf"},
+            "other": {"max_span_m": 80, "reference_file": "ausente.pdf"}}}
+        updated, changes, unconfirmed = rebuild_rules(rows, rules)
+        mv_rules = updated["medium_voltage_standards"]
+        # Plain spans (no VÃO MÁXIMO) never overwrite the curated maximum
+        plain_rows = [{"parameter": "span", "value": v, "unit": "m", "document": "x/vao.pdf", "page": 1,
+                       "context": ""} for v in (120, 35)]
+        _, plain_changes, plain_unconfirmed = rebuild_rules(
+            plain_rows, {"medium_voltage_standards": {"s": {"max_span_m": 80, "reference_file": "vao.pdf"}}})
+        ok = (typed == [("max_span", 50, "m", 1), ("voltage_kv", 13.8, "kV", 2), ("voltage_kv", 15, "kV", 2),
+                        ("transformer_kva", 75, "kVA", 3),
+                        ("transformer_kva", 112.5, "kVA", 3), ("traction_dan", 300, "daN", 4)]
+              and [r[:2] for r in parse_parameters(["VÃO de 35 m", "vao maximo: 60 m", "CABO 0,6/1 kV 15 kV",
+                                                        "TRAFO 1.000 kVA"])]
+              == [("span", 35), ("max_span", 60), ("voltage_kv", 15), ("transformer_kva", 1000)]
+              and first["parsed"] == 4 and second["parsed"] == 0 and revised["parsed"] == 1
+              and mv_rules["net"]["max_span_m"] == 50 and mv_rules["net"]["voltage_levels_kv"] == [13.8, 34.5]
+              and mv_rules["trafos"]["standard_kva_ratings"] == [30, 75, 112.5]
+              and mv_rules["other"] == rules["medium_voltage_standards"]["other"]
+              and mv_rules["net"]["notes"] == "pending" and rules["medium_voltage_standards"]["net"]["max_span_m"] == 40
+              and len(changes) == 2
+              and [u[:3] for u in unconfirmed]
+              == [("net", "voltage_levels_kv", [34.5]), ("trafos", "standard_kva_ratings", [30])]
+              and plain_changes == [] and [u[:3] for u in plain_unconfirmed] == [("s", "max_span_m", [35, 120])])
+        test("T4: Parameter extraction", ok, f"{first['rows']} rows, {len(changes)} rule changes")
+    except Exception as e:
+        test("T4: Parameter extraction", False, str(e))
+
+    shutil.rmtree(work, ignore_errors=True)
+
+    # Summary
+    print("\n" + "=" * 60)
+    passed = sum(1 for _, ok in results if ok)
+    total = len(results)
+    print(f"📊 Results: {passed}/{total} tests passed ({passed/total*100:.0f}%)")
+
+    if passed == total:
+        print("🎉 All standards library tests passed!")
+        return True
+    else:
+        print("⚠️ Some tests failed. Review the output above.")
+        return False
+
+
+if __name__ == "__main__":
+    run_tests()
@@ -0,0 +1,224 @@
+"""
+CQT Light V3 - Batch Transformer Sizing
+Picks the smallest standard transformer for many circuits at once.
+
+A rating is accepted when the circuit demand stays within the loading limit
+(transformer_selection.loading_limit) and the secondary drop, network drop
+plus transformer regulation (impedance % x loading), stays within
+voltage_drop_limits.secondary_network. Ratings come from
+data/rules/calculation_logic.json; impedances from the transformers table of
+data/technical_data.db when present.
+
+Usage:
+    python transformer_sizing.py circuits.json [--output report.csv] [--workers N]
+
+circuits.json is a list of circuits, either already reduced
+    {"id": "C1", "demand_kva": 61.5, "network_drop": 2.8}
+or described trecho by trecho for the QDT engine
+    {"id": "C2", "consumers": [...], "kva": [...], "fdiv": [...],
+     "phases": [...], "cables": [...], "length": [...]}
+"""
+
+import argparse
+import csv
+import json
+import os
+import sqlite3
+import time
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+
+import numpy as np
+
+from qdt_engine import compute_qdt
+
+BASE_DIR = Path(__file__).parent.parent
+DATA_DIR = BASE_DIR / "data"
+RULES_PATH = DATA_DIR / "rules" / "calculation_logic.json"
+TECH_DB_PATH = DATA_DIR / "technical_data.db"
+
+DEFAULT_IMPEDANCE_PCT = 3.5
+QDT_FIELDS = ("consumers", "kva", "fdiv", "phases", "cables", "length")
+
+
+def load_rules(path=RULES_PATH):
+    """Loading limit, secondary drop limit (%) and the standard kVA list."""
+    with open(path, "r", encoding="utf-8") as f:
+        rules = json.load(f)
+    selection = rules["transformer_selection"]
+    return {
+        "loading_limit": selection["loading_limit"],
+        "drop_limit": rules["voltage_drop_limits"]["secondary_network"] * 100,
+        "standard_kva": sorted(selection["standard_kva"]),
+    }
+
+
+def load_impedances(ratings, db_path=TECH_DB_PATH):
+    """Impedance (%) per rating from technical_data.db, defaulting to 3.5%."""
+    impedance = {kva: DEFAULT_IMPEDANCE_PCT for kva in ratings}
+    if Path(db_path).exists():
+        conn = sqlite3.connect(db_path)
+        try:
+            for kva, z in conn.execute("SELECT kva, impedance_pct FROM transformers"):
+                if kva in impedance and z is not None:
+                    impedance[kva] = z
+        except sqlite3.Error as e:
+            print(f"⚠️ Could not read transformers from {db_path}: {e}")
+        finally:
+            conn.close()
+    return np.array([impedance[kva] for kva in ratings])
+
+
+def reduce_circuit(circuit):
+    """Demand (kVA leaving the transformer) and network drop (%) of one circuit."""
+    if "demand_kva" in circuit:
+        return float(circuit["demand_kva"]), float(circuit.get("network_drop", 0.0))
+    result = compute_qdt(**{field: circuit[field] for field in QDT_FIELDS},
+                         small_load_rule=circuit.get("small_load_rule", False))
+    return float(result["load"][0]), float(result["total_drop"])
+
+
+def _reduce_chunk(circuits):
+    return [reduce_circuit(c) for c in circuits]
+
+
+def reduce_circuits(circuits, workers=None, chunk_size=500):
+    """Reduce circuits to (demand, drop) arrays, in a process pool for large batches."""
+    if len(circuits) <= chunk_size or workers == 1:
+        pairs = _reduce_chunk(circuits)
+    else:
+        chunks = [circuits[i:i + chunk_size] for i in range(0, len(circuits), chunk_size)]
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            pairs = [pair for chunk in pool.map(_reduce_chunk, chunks) for pair in chunk]
+    pairs = np.array(pairs, dtype=float).reshape(-1, 2)
+    return pairs[:, 0], pairs[:, 1]
+
+
+def size_transformers(demand, network_drop, ratings, impedance, loading_limit, drop_limit):
+    """
+    Vectorized selection over (circuits x ratings).
+    Returns the chosen rating index per circuit (-1 when no standard rating
+    fits), loading (fraction) and total drop (%) at that rating.
+    """
+    demand = np.asarray(demand, dtype=float)[:, None]
+    network_drop = np.asarray(network_drop, dtype=float)[:, None]
+    ratings = np.asarray(ratings, dtype=float)[None, :]
+    loading = demand / ratings
+    total_drop = network_drop + np.asarray(impedance)[None, :] * loading
+    feasible = (loading <= loading_limit) & (total_drop <= drop_limit)
+
+    choice = np.where(feasible.any(axis=1), feasible.argmax(axis=1), -1)
+    rows = np.arange(len(choice))
+    picked = np.where(choice >= 0, choice, ratings.shape[1] - 1)
+    return choice, loading[rows, picked], total_drop[rows, picked]
+
+
+def sizing_report(ids, demand, network_drop, choice, loading, total_drop, ratings, loading_limit):
+    """Per-circuit report rows."""
+    report = []
+    for i, circuit_id in enumerate(ids):
+        fits = choice[i] >= 0
+        if fits:
+            status = "OK"
+        elif demand[i] > loading_limit * ratings[-1]:
+            status = "Demanda acima do maior padrão"
+        else:
+            status = "Queda de tensão acima do limite"
+        report.append({
+            "id": circuit_id,
+            "demand_kva": round(float(demand[i]), 2),
+            "network_drop_pct": round(float(network_drop[i]), 3),
+            "transformer_kva": ratings[choice[i]] if fits else None,
+            "loading_pct": round(float(loading[i]) * 100, 1) if fits else None,
+            "total_drop_pct": round(float(total_drop[i]), 3) if fits else None,
+            "status": status,
+        })
+    return report
+
+
+def size_circuits(circuits, workers=None):
+    """Full pipeline: reduce circuits, size them, and build the report."""
+    rules = load_rules()
+    ratings = rules["standard_kva"]
+    impedance = load_impedances(ratings)
+    demand, network_drop = reduce_circuits(circuits, workers)
+    choice, loading, total_drop = size_transformers(
+        demand, network_drop, ratings, impedance, rules["loading_limit"], rules["drop_limit"]
+    )
+    ids = [c.get("id", f"C{i + 1}") for i, c in enumerate(circuits)]
+    return sizing_report(ids, demand, network_drop, choice, loading, total_drop, ratings,
+                         rules["loading_limit"])
+
+
+def write_report(report, path):
+    with open(path, "w", newline="", encoding="utf-8") as f:
+        writer = csv.DictWriter(f, fieldnames=list(report[0].keys()))
+        writer.writeheader()
+        writer.writerows(report)
+
+
+def sample_circuits(count, rng):
+    """Synthetic QDT circuits for the demo run."""
+    circuits = []
+    for i in range(count):
+        n = int(rng.integers(3, 12))
+        consumers = np.sort(rng.integers(1, 40, n))[::-1]
+        circuits.append({
+            "id": f"DEMO-{i + 1:05d}",
+            "consumers": consumers.tolist(),
+            "kva": (consumers * rng.uniform(0.8, 2.0)).round(2).tolist(),
+            "fdiv": [1.0] * n,
+            "phases": [3] * n,
+            "cables": rng.choice(["185 MMX", "70 MMX"], n).tolist(),
+            "length": rng.uniform(10, 30, n).round(1).tolist(),
+        })
+    return circuits
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Batch transformer sizing")
+    parser.add_argument("circuits", nargs="?", help="JSON list of circuits (demo data if omitted)")
+    parser.add_argument("--output", help="CSV report path")
+    parser.add_argument("--workers", type=int, default=os.cpu_count())
+    args = parser.parse_args()
+
+    print("=" * 60)
+    print("🔌 CQT Light V3 - Batch Transformer Sizing")
+    print("=" * 60)
+
+    if args.circuits:
+        with open(args.circuits, "r", encoding="utf-8") as f:
+            circuits = json.load(f)
+    else:
+        circuits = sample_circuits(5_000, np.random.default_rng(0))
+        print("⚠️ No input file, sizing 5,000 synthetic circuits")
+
+    start = time.perf_counter()
+    report = size_circuits(circuits, args.workers)
+    elapsed = time.perf_counter() - start
+
+    sized = [r for r in report if r["status"] == "OK"]
+    print(f"✅ {len(report):,} circuits in {elapsed:.2f}s ({len(sized):,} sized)")
+    counts = {}
+    for r in sized:
+        counts[r["transformer_kva"]] = counts.get(r["transformer_kva"], 0) + 1
+    for kva in sorted(counts):
+        print(f"   {kva:>6} kVA: {counts[kva]:,}")
+    failures = {}
+    for r in report:
+        if r["status"] != "OK":
+            failures[r["status"]] = failures.get(r["status"], 0) + 1
+    for status, count in failures.items():
+        print(f"⚠️ {count:,} circuits: {status}")
+
+    if args.output:
+        write_report(report, args.output)
+        print(f"📊 Report written to {args.output}")
+    else:
+        for r in report[:10]:
+            print(f"   {r['id']}: {r['demand_kva']} kVA -> {r['transformer_kva']} kVA "
+                  f"({r['loading_pct']}%, drop {r['total_drop_pct']}%) {r['status']}")
+
+
+if __name__ == "__main__":
+    main()
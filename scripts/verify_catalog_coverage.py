@@ -1,72 +1,61 @@
-import json
-import os
+"""
+CQT Light V3 - Catalog Coverage Check
+Share of the SAPs required by the structure templates that the material
+catalog prices, and the missing items that block the most templates.
+Built on the coverage engine in catalog_coverage.py (one pass over the
+template materials instead of a rescan per missing item).
+
+Usage:
+    python verify_catalog_coverage.py [catalog.json|cqt_light.db] [--templates templates.json]
+"""
+
+import argparse
+import sqlite3
+
+from catalog_coverage import TEMPLATES_PATH, CoverageIndex, default_catalog_path, load_catalog, load_kits
+
+# Heuristic for "common items" among the missing ones
+COMMON_TERMS = ['CABO', 'POSTE', 'CRUZETA', 'ISOLADOR']
+
+
+def verify_coverage(templates_path=TEMPLATES_PATH, catalog_path=None):
+    templates = load_kits(templates_path)
+    catalog_path = catalog_path or default_catalog_path()
+    try:
+        catalog = load_catalog(catalog_path)
+    except (OSError, sqlite3.Error) as e:
+        print(f"Catalog not available ({e}), reporting every SAP as missing")
+        catalog = {}
+
+    result = CoverageIndex(templates, catalog).report()
+    missing = result["missing"]
+
+    print(f"Total Unique SAPs Required by Templates: {result['required']}")
+    print(f"SAPs Found with Valid Price: {result['priced']}")
+    print(f"Coverage: {result['coverage'] * 100:.2f}%")
+    print(f"Templates Fully Priced: {result['kits_complete']} of {result['kits']}")
+
+    print("\n--- Top 20 Missing/Zero-Price Items (by templates blocked) ---")
+    for m in missing[:20]:
+        print(f"{m['sap']} ({m['status']}) - blocks {m['kits']} templates")
 
-def verify_coverage():
-    templates_path = r'c:\myworld\cqt_light\data\standards\structure_templates.json'
-    catalog_path = r'c:\myworld\cqt_light\data\catalog\material_catalog.json'
-    
-    with open(templates_path, 'r', encoding='utf-8') as f:
-        templates = json.load(f)
-        
-    with open(catalog_path, 'r', encoding='utf-8') as f:
-        catalog = json.load(f)
-        
-    required_saps = set()
-    for t_key, t_val in templates.items():
-        for mat in t_val.get('materials', []):
-            if isinstance(mat, dict):
-                required_saps.add(str(mat.get('sap')).strip())
-                
-    total_required = len(required_saps)
-    found_count = 0
-    missing_items = []
-    
-    for sap in required_saps:
-        if sap in catalog:
-            item = catalog[sap]
-            price = item.get('price', 0)
-            if price > 0:
-                found_count += 1
-            else:
-                missing_items.append(f"{sap} (Price 0.0)")
-        else:
-            missing_items.append(f"{sap} (Not in Catalog)")
-            
-    coverage = (found_count / total_required) * 100 if total_required > 0 else 0
-    
-    print(f"Total Unique SAPs Required by Templates: {total_required}")
-    print(f"SAPs Found with Valid Price: {found_count}")
-    print(f"Coverage: {coverage:.2f}%")
-    
-    print("\n--- Top 20 Missing/Zero-Price Items ---")
-    for m in missing_items[:20]:
-        print(m)
-        
-    # Heuristic for "Common Items"
-    common_terms = ['CABO', 'POSTE', 'CRUZETA', 'ISOLADOR']
-    print("\n--- Check for Common Items in Missing List ---")
-    common_missing = [m for m in missing_items if any(term in str(templates).upper() for term in common_terms)] # This is a weak check, better to look up desc in template if possible
-    
-    # Better common check: find description in template for missing SAP
     print("\n--- Missing Common Items (with descriptions from Templates) ---")
-    count_common = 0
-    for m in missing_items:
-        sap_code = m.split(' ')[0]
-        # Find description
-        desc = "Unknown"
-        for t in templates.values():
-            for mat in t.get('materials', []):
-                if str(mat.get('sap')).strip() == sap_code:
-                    desc = mat.get('description', 'Unknown')
-                    break
-            if desc != "Unknown": break
-            
-        if any(term in desc.upper() for term in common_terms):
-            print(f"{m} - {desc}")
-            count_common += 1
-            if count_common > 10:
-                print("... and more")
-                break
+    common = [m for m in missing if any(term in (m['description'] or '').upper() for term in COMMON_TERMS)]
+    for m in common[:11]:
+        print(f"{m['sap']} ({m['status']}) - {m['description']}")
+    if len(common) > 11:
+        print("... and more")
+    return result
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Catalog coverage of the structure templates")
+    parser.add_argument("catalog", nargs="?", default=None,
+                        help="Catalog JSON or cqt_light.db (default: material_catalog.json, else the app database)")
+    parser.add_argument("--templates", default=str(TEMPLATES_PATH))
+    args = parser.parse_args()
+    verify_coverage(args.templates, args.catalog)
+
 
 if __name__ == "__main__":
-    verify_coverage()
+    main()